@@ -0,0 +1,199 @@
+import calendar
+import json
+import os
+from datetime import date
+from baseItem import Item
+from exceptions import BarcodeError, UnknownGtinError
+from itemCategories import CATEGORIES
+from productCatalog import ProductCatalog, get_levels
+from storage import replace_file
+
+# FNC1 separator scanners send between variable-length GS1 element strings
+GROUP_SEPARATOR = "\x1d"
+# Symbology identifiers some scanners prefix, e.g. "]d2" for GS1 DataMatrix
+SYMBOLOGY_PREFIXES = ("]C1", "]d2", "]e0", "]Q3")
+# Lengths of the fixed-length application identifiers used on medical device labels
+FIXED_LENGTHS = {"00": 18, "01": 14, "02": 14, "11": 6, "13": 6, "15": 6, "16": 6, "17": 6}
+# Variable-length application identifiers and their maximum lengths
+VARIABLE_LENGTHS = {"10": 20, "21": 20, "30": 8, "240": 30}
+
+def _parse_bracketed(text: str) -> dict[str, str]:
+    # Human readable form, e.g. "(01)07332747123456(17)290131(10)ABC123"
+    fields = {}
+    for part in text.split("(")[1:]:
+        ai, _, value = part.partition(")")
+        if not ai.isdigit() or not value:
+            raise BarcodeError(f"Malformed element string: ({part}")
+        fields[ai] = value.strip()
+    return fields
+
+def _parse_raw(text: str) -> dict[str, str]:
+    # Scanner output, with a separator after each variable-length value that is not last
+    fields = {}
+    i = 0
+    while i < len(text):
+        if text[i] == GROUP_SEPARATOR:
+            i += 1
+            continue
+        for ai_length in (2, 3):
+            ai = text[i:i + ai_length]
+            if ai in FIXED_LENGTHS or ai in VARIABLE_LENGTHS:
+                break
+        else:
+            raise BarcodeError(f"Unsupported application identifier at: {text[i:i + 4]}")
+        i += len(ai)
+        if ai in FIXED_LENGTHS:
+            value = text[i:i + FIXED_LENGTHS[ai]]
+            if len(value) != FIXED_LENGTHS[ai]:
+                raise BarcodeError(f"({ai}) is too short: {value}")
+        else:
+            end = text.find(GROUP_SEPARATOR, i)
+            value = text[i:end if end != -1 else len(text)]
+            if len(value) > VARIABLE_LENGTHS[ai]:
+                raise BarcodeError(f"({ai}) is too long: {value}")
+        fields[ai] = value
+        i += len(value)
+    return fields
+
+def parse_gs1(text: str) -> dict[str, str]:
+    """Parses a GS1-128 or GS1 DataMatrix string into {application identifier: value}.
+
+    Accepts both the bracketed form printed under barcodes and the raw
+    form scanners send, with FNC1 shown as the group separator character.
+    """
+    text = text.strip()
+    for prefix in SYMBOLOGY_PREFIXES:
+        if text.startswith(prefix):
+            text = text[len(prefix):]
+            break
+    if not text:
+        raise BarcodeError("Empty barcode")
+    return _parse_bracketed(text) if text.startswith("(") else _parse_raw(text)
+
+def parse_gs1_date(value: str) -> date:
+    """Parses a GS1 YYMMDD date, where a day of 00 means the last day of the month."""
+    if len(value) != 6 or not value.isdigit():
+        raise BarcodeError(f"Invalid date: {value}")
+    year, month, day = 2000 + int(value[:2]), int(value[2:4]), int(value[4:])
+    try:
+        if day == 0:
+            day = calendar.monthrange(year, month)[1]
+        return date(year, month, day)
+    except ValueError:
+        raise BarcodeError(f"Invalid date: {value}")
+
+class Product:
+    """A catalogued product: its category, REF and descriptive attributes (without sn)."""
+    __slots__ = ("category", "ref", "attributes")
+
+    def __init__(self, category: str, ref: str, attributes: dict[str, str]):
+        self.category = category
+        self.ref = ref
+        self.attributes = attributes
+
+    def make_item(self, lot: str, expiry: date, qty: int = 1, sn: str = "N/A") -> Item:
+        """Returns an item of this product, e.g. for a scanned lot."""
+        category = CATEGORIES[self.category]
+        args = dict(self.attributes)
+        if "sn" in category.attributes:
+            args["sn"] = sn
+        return category.ItemClass(**args, ref=self.ref, lot=lot, expiry=expiry, qty=qty)
+
+class ProductLookup:
+    """Resolves GTINs and REFs to products.
+
+    The products are those of the product catalog with a REF, so product
+    descriptions live in one file. A GTIN file only links GTINs to them: a
+    JSON object mapping each GTIN to its product's category and REF, e.g.
+    {"07332747123456": {"category": "Implants", "ref": "300304"}}. The app
+    writes it as unknown GTINs are scanned and linked, so it is not shipped.
+    """
+    def __init__(self, products: list[Product] | None = None):
+        self.by_gtin: dict[str, Product] = {}
+        self.by_ref: dict[tuple[str, str], Product] = {}
+        for product in products or []:
+            self.add(product)
+
+    @classmethod
+    def from_catalog(cls, catalog: ProductCatalog) -> "ProductLookup":
+        """Returns a lookup of every product the catalog has a REF for."""
+        products = []
+        for title in CATEGORIES:
+            levels = get_levels(title)
+            # Depth first, with the option values on the way to each node
+            stack = [(catalog.get_root(title), [])]
+            while stack:
+                node, path = stack.pop()
+                if node.ref is not None:
+                    products.append(Product(title, node.ref, dict(zip(levels, path))))
+                for value, child in node.children.items():
+                    stack.append((child, path + [value]))
+        return cls(products)
+
+    def load_gtins(self, gtin_file: str):
+        """Links the GTINs of a GTIN file, doing nothing if it does not exist.
+
+        Raises ValueError for a GTIN whose product is not in the lookup.
+        """
+        if not os.path.exists(gtin_file):
+            return
+        with open(gtin_file, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        for gtin, entry in entries.items():
+            product = self.find_ref(entry["category"], entry["ref"])
+            if product is None:
+                raise ValueError(f"GTIN {gtin} is linked to {entry['category']} REF {entry['ref']}, which is not in the product catalog")
+            self.by_gtin[_normalize_gtin(gtin)] = product
+
+    def save_gtins(self, gtin_file: str):
+        """Writes the linked GTINs to a GTIN file, replacing it atomically."""
+        entries = {gtin: {"category": product.category, "ref": product.ref} for gtin, product in sorted(self.by_gtin.items())}
+        temp_file = gtin_file + ".tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        replace_file(temp_file, gtin_file)
+
+    def add(self, product: Product):
+        self.by_ref[(product.category, product.ref)] = product
+
+    def link_gtin(self, gtin: str, product: Product):
+        """Resolves a GTIN to a product from now on, e.g. once a scan of it is identified."""
+        self.by_gtin[_normalize_gtin(gtin)] = product
+
+    def find_gtin(self, gtin: str) -> Product | None:
+        return self.by_gtin.get(_normalize_gtin(gtin))
+
+    def find_ref(self, category: str, ref: str) -> Product | None:
+        return self.by_ref.get((category, ref))
+
+    def find_refs(self, ref: str) -> list[Product]:
+        """Returns the products with a REF, one per category having it."""
+        return [product for product in (self.find_ref(title, ref) for title in CATEGORIES) if product is not None]
+
+def _normalize_gtin(gtin: str) -> str:
+    # GTIN-8/12/13 are stored as GTIN-14, as (01) encodes them
+    return gtin.strip().zfill(14)
+
+class Scan:
+    """A scanned lot: the product it resolved to and the item it stands for."""
+    def __init__(self, product: Product, item: Item):
+        self.product = product
+        self.item = item
+
+def read_scan(text: str, lookup: ProductLookup) -> Scan:
+    """Parses a scanned barcode and resolves it to an item of qty 1, or the count in (30) if given."""
+    fields = parse_gs1(text)
+    if "01" not in fields:
+        raise BarcodeError("Barcode has no GTIN (01)")
+    product = lookup.find_gtin(fields["01"])
+    if product is None:
+        raise UnknownGtinError(f"Unknown GTIN {fields['01']}")
+    if "17" not in fields:
+        raise BarcodeError(f"Barcode of {product.ref} has no expiry (17)")
+    if "10" not in fields:
+        raise BarcodeError(f"Barcode of {product.ref} has no lot (10)")
+    qty = int(fields["30"]) if fields.get("30", "").isdigit() else 1
+    item = product.make_item(fields["10"], parse_gs1_date(fields["17"]), qty, fields.get("21", "N/A"))
+    return Scan(product, item)
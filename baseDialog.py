@@ -1,20 +1,22 @@
-from datetime import datetime
-from typing import Tuple
+from datetime import date
+from typing import Callable, Tuple
 from PyQt6.QtWidgets import (
-    QDialog, QDialogButtonBox, QComboBox, QFormLayout, QInputDialog, QVBoxLayout, QLabel, QLineEdit, QTableWidget, QTableWidgetItem, QHeaderView, QSpinBox, QMessageBox
+    QCheckBox, QDialog, QDialogButtonBox, QComboBox, QFormLayout, QInputDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QTableWidget, QTableWidgetItem, QHeaderView, QSpinBox, QMessageBox
 )
-from baseItem import Item, EditItem, RemovalItem
+from baseItem import Item, EditItem, RemovalItem, parse_expiry
 from exceptions import AllFieldsRequiredError, InvalidDateError, InvalidQuantityError
+from itemCategories import CATEGORIES
+from productCatalog import CatalogNode, get_catalog, get_levels
 
 def _check_all_fields_filled(fields: dict) -> None:
     # Helper to check all fields are filled
     if not all(value.strip() for value in fields.values()):
         raise AllFieldsRequiredError("All fields are required.")
         
-def _check_expiry_date(expiry: str) -> datetime:
+def _check_expiry_date(expiry: str) -> date:
     # Helper to validate expiry date format
     try:
-        return datetime.strptime(expiry, "%Y-%m-%d")
+        return parse_expiry(expiry)
     except ValueError:
         raise InvalidDateError("Expiry must be YYYY-MM-DD")
     
@@ -39,6 +41,10 @@ class AddDialog(QDialog):
         self.qty_input = QLineEdit()
         self.ref_input = QLineEdit()
         self.lot_input = QLineEdit()
+        # Descriptive attributes whose inputs cascade from the product catalog, and the option selected in each
+        self._cascade_attributes: list[str] = []
+        self._cascade_nodes: list[CatalogNode | None] = []
+        self._catalog_ref = ""
         self._add_dialog_body_widgets()
         self.button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
         self.button_box.accepted.connect(self.accept)
@@ -68,7 +74,7 @@ class AddDialog(QDialog):
 
         return Item(
             brand=brand,
-            expiry=expiry_date.strftime("%Y-%m-%d"),
+            expiry=expiry_date,
             qty=qty,
             ref=ref,
             lot=lot
@@ -79,7 +85,7 @@ class AddDialog(QDialog):
         fields: dict[str, str],
         expiry: str,
         qty: str
-    ) -> Tuple[datetime, int]:
+    ) -> Tuple[date, int]:
         """Static method to validate inputs, raising exceptions as needed."""
         _check_all_fields_filled(fields)
         expiry_date = _check_expiry_date(expiry)
@@ -94,9 +100,74 @@ class AddDialog(QDialog):
         self.layout_.addRow("Expiry (YYYY-MM-DD)", self.expiry_input)
         self.layout_.addRow("Qty", self.qty_input)
 
+    def _add_cascade_widgets(self, title: str, default_brand: str):
+        """Adds the brand and descriptive attribute inputs of a category, cascading from the product catalog.
+
+        Each input is a combo box of the options the catalog has under the
+        selections before it, or free text where it has none.
+        """
+        self._cascade_root = get_catalog().get_root(title)
+        self._cascade_attributes = get_levels(title)
+        self._cascade_nodes = [None] * len(self._cascade_attributes)
+        self._cascade_labels = {field.name: field.header for field in CATEGORIES[title].ItemClass.fields}
+        for attribute in self._cascade_attributes[1:]:
+            setattr(self, self._get_input_name(attribute), None)
+        self._brand_list = list(self._cascade_root.children)
+        self._refresh_brand_items()
+        self.brand_input.setCurrentText(default_brand)
+        self.brand_input.currentTextChanged.connect(lambda: self._set_cascade(0))
+        self.layout_.addRow("Brand", self.brand_input)
+        self._set_cascade(0)
+
+    @staticmethod
+    def _get_input_name(attribute: str) -> str:
+        # e.g. "type_" -> "type_input"
+        return f"{attribute.rstrip('_')}_input"
+
+    def _set_cascade(self, index: int):
+        """Replaces the inputs after a changed one with the options the catalog has under its selection."""
+        parent = self._cascade_root if index == 0 else self._cascade_nodes[index - 1]
+        widget = getattr(self, self._get_input_name(self._cascade_attributes[index]))
+        node = None
+        if parent is not None and isinstance(widget, QComboBox):
+            node = parent.children.get(widget.currentText())
+        self._cascade_nodes[index] = node
+        for row in range(index + 1, len(self._cascade_attributes)):
+            attribute = self._cascade_attributes[row]
+            if node is not None and node.children:
+                widget = QComboBox()
+                widget.addItems(list(node.children))
+                # A single option is not a choice
+                widget.setDisabled(len(node.children) == 1)
+                widget.currentTextChanged.connect(lambda _, row=row: self._set_cascade(row))
+                node = node.children[widget.currentText()]
+            else:
+                node = None
+                self._cascade_nodes[row] = None
+                # Keep what was typed in an input that stays free text, e.g. while a brand is typed
+                if isinstance(getattr(self, self._get_input_name(attribute)), QLineEdit):
+                    continue
+                widget = QLineEdit()
+            self._cascade_nodes[row] = node
+            setattr(self, self._get_input_name(attribute), widget)
+            # Replace the row rather than adding one, which would grow the dialog each time
+            if self.layout_.rowCount() > row:
+                self.layout_.removeRow(row)
+            self.layout_.insertRow(row, self._cascade_labels[attribute], widget)
+
+        # Fill in the REF of a catalogued product, unless one was typed
+        ref = node.ref if node is not None and node.ref else ""
+        if self.ref_input.text().strip() in ("", self._catalog_ref):
+            self.ref_input.setText(ref)
+        self._catalog_ref = ref
+
     def _refresh_brand_items(self):
         # Helper to refresh dropdown with brands + 'Add another brand...'
         self.brand_input.clear()
+        # Without any known brand (e.g. no catalog) the brand is typed in instead
+        self.brand_input.setEditable(not self._brand_list)
+        if not self._brand_list:
+            return
         brands_sorted = sorted(self._brand_list)
         self.brand_input.addItems(brands_sorted + ["Add another brand..."])
 
@@ -112,7 +183,7 @@ class AddDialog(QDialog):
                 # Set current to new brand
                 brands_sorted = sorted(self._brand_list)
                 self.brand_input.setCurrentText(new_brand)
-            else:
+            elif self._brand_list:
                 # Revert to first brand if cancelled
                 brands_sorted = sorted(self._brand_list)
                 self.brand_input.setCurrentText(brands_sorted[0])
@@ -180,7 +251,7 @@ class EditDialog(QDialog):
 
             # Basic validation
             _check_all_fields_filled(new)
-            new["expiry"] = _check_expiry_date(new.get("expiry")).strftime("%Y-%m-%d")
+            new["expiry"] = _check_expiry_date(new.get("expiry"))
             new["qty"] = _check_quantity(new.get("qty"))
 
             new_item = self.ItemClass(**new)
@@ -235,6 +306,28 @@ class RemoveDialog(QDialog):
         layout = QVBoxLayout(self)
         title_label = QLabel(title_label)
         layout.addWidget(title_label)
+
+        # Quantity to take from the earliest expiring lots, shown once a picker is set
+        self.today = date.today().toordinal()
+        self._fefo_picker: Callable[[int, int | None], list[tuple[Item, int]]] | None = None
+        self.fefo_layout = QHBoxLayout()
+        self.fefo_label = QLabel("Remove oldest first:")
+        self.fefo_input = QSpinBox()
+        self.fefo_input.setMinimum(0)
+        self.fefo_input.valueChanged.connect(self._fill_fefo)
+        # Expired lots are left alone unless asked for, so a default pick never takes one
+        self.skip_expired_input = QCheckBox("Skip expired lots")
+        self.skip_expired_input.setChecked(True)
+        self.skip_expired_input.toggled.connect(self._on_skip_expired_toggled)
+        self._set_fefo_maximum()
+        self.fefo_layout.addWidget(self.fefo_label)
+        self.fefo_layout.addWidget(self.fefo_input)
+        self.fefo_layout.addWidget(self.skip_expired_input)
+        self.fefo_layout.addStretch()
+        self.fefo_label.setVisible(False)
+        self.fefo_input.setVisible(False)
+        self.skip_expired_input.setVisible(False)
+        layout.addLayout(self.fefo_layout)
         
         # Table to display items
         self.table = QTableWidget()
@@ -248,7 +341,10 @@ class RemoveDialog(QDialog):
             self.table.insertRow(row)
 
             for i, attribute in enumerate(self.attributes):
-                self.table.setItem(row, i, QTableWidgetItem(str(getattr(item, attribute))))
+                text = str(getattr(item, attribute))
+                if attribute == "expiry" and self._is_expired(item):
+                    text += " (EXPIRED)"
+                self.table.setItem(row, i, QTableWidgetItem(text))
 
             # Add spinbox for remove quantity
             spinbox = QSpinBox()
@@ -277,9 +373,9 @@ class RemoveDialog(QDialog):
                 removals.append(RemovalItem(
                     ref=item.ref,
                     lot=item.lot,
-                    expiry=item.expiry,
+                    expiry=item.expiry_ordinal,
                     remove_qty=remove_qty,
-                    inventory_index=self.inventory.index(item)
+                    inventory_index=row
                 ))
         
         if not removals:
@@ -310,6 +406,45 @@ class RemoveDialog(QDialog):
             self.accept()
         # If No, stay in dialog
 
+    def set_fefo_picker(self, picker: Callable[[int, int | None], list[tuple[Item, int]]]):
+        """Offers removing a quantity from the earliest expiring lots, defaulting to one.
+
+        picker(qty, expiring_after) picks the lots, skipping those expiring on
+        or before the expiring_after ordinal, which is None to include them.
+        """
+        self._fefo_picker = picker
+        self.fefo_label.setVisible(True)
+        self.fefo_input.setVisible(True)
+        self.skip_expired_input.setVisible(True)
+        if self.fefo_input.maximum() > 0:
+            self.fefo_input.setValue(1)
+
+    def _is_expired(self, item: Item) -> bool:
+        return item.expiry_ordinal <= self.today
+
+    def _set_fefo_maximum(self):
+        skip_expired = self.skip_expired_input.isChecked()
+        self.fefo_input.setMaximum(sum(item.qty for item in self.inventory if not (skip_expired and self._is_expired(item))))
+
+    def _on_skip_expired_toggled(self, checked: bool):
+        # A lower maximum clamps the quantity, which refills the lots itself
+        value = self.fefo_input.value()
+        self._set_fefo_maximum()
+        if self.fefo_input.value() == value:
+            self._fill_fefo(value)
+
+    def _fill_fefo(self, qty: int):
+        # Sets the per lot quantities to the lots picked for qty, which can still be adjusted by hand
+        if self._fefo_picker is None:
+            return
+        rows = {id(item): row for row, item in enumerate(self.inventory)}
+        remove_qtys = [0] * len(self.inventory)
+        expiring_after = self.today if self.skip_expired_input.isChecked() else None
+        for item, take in self._fefo_picker(qty, expiring_after):
+            remove_qtys[rows[id(item)]] = take
+        for row, remove_qty in enumerate(remove_qtys):
+            self.table.cellWidget(row, len(self.header_labels)).setValue(remove_qty)
+
     def get_removals(self) -> list[RemovalItem]:
         """Return list of removal operations"""
         return getattr(self, 'removals', [])
\ No newline at end of file
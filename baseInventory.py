@@ -1,13 +1,18 @@
-import csv
-from datetime import datetime
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QTableWidget, QTableWidgetItem,
+    QPushButton, QTableView, QLineEdit,
     QMessageBox, QHeaderView, QDialog
 )
+from PyQt6.QtCore import Qt
 from baseDialog import AddDialog, EditDialog, RemoveDialog
 from baseItem import Item
-from exceptions import AllFieldsRequiredError, InvalidDateError, InvalidQuantityError
+from inventoryStore import InventoryStore
+from inventoryTableModel import InventoryTableModel
+from inventoryProxyModel import InventoryProxyModel
+from sqliteStorage import InventoryDatabase
+from storage import LoadReport
+from instrumentation import instrumentation, timed
+from exceptions import AllFieldsRequiredError, InvalidDateError, InvalidQuantityError, StorageError
 
 class Inventory:
     def __init__(
@@ -22,7 +27,8 @@ class Inventory:
             item_name: str="Item",
             low_quantity: int=2,
             days_from_expiry: int=180,
-            days_from_expiry_warning: int=60
+            days_from_expiry_warning: int=60,
+            database: InventoryDatabase | None=None
         ):
         self.inventory_file = inventory_file
         self.ItemClass = ItemClass
@@ -38,8 +44,17 @@ class Inventory:
         self.days_from_expiry = days_from_expiry
         self.days_from_expiry_warning = days_from_expiry_warning
 
-        self.inventory: list[Item] = []
-        self.selected_row = None
+        self.store = InventoryStore(
+            inventory_file=inventory_file,
+            ItemClass=ItemClass,
+            header_labels=header_labels,
+            attributes=attributes,
+            item_name=item_name,
+            low_quantity=low_quantity,
+            days_from_expiry=days_from_expiry,
+            days_from_expiry_warning=days_from_expiry_warning,
+            database=database
+        )
 
         self.widget = QWidget()
         layout = QVBoxLayout()
@@ -61,108 +76,86 @@ class Inventory:
         btn_layout.addWidget(self.save_btn)
         layout.addLayout(btn_layout)
         
-        self.table = QTableWidget()
-        self.table.setColumnCount(len(header_labels) + 4)  # Additional columns for total qty, recent expiry, recent expiry qty, status
-        self.table.setHorizontalHeaderLabels(header_labels + [
-            "Total Qty", "Most Recent Expiry", "Most Recent Expiry Qty", "Status"
-        ])
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.table.itemSelectionChanged.connect(self.on_selection_changed)
+        # Additional columns for total qty, recent expiry, recent expiry qty, status
+        self.table_model = InventoryTableModel(self.store)
+        self.store.listener = self.table_model
+        # Filtering and sorting happen in the proxy, so the view's rows are not the store's group rows
+        self.proxy_model = InventoryProxyModel()
+        self.proxy_model.setSourceModel(self.table_model)
+
+        filter_layout = QHBoxLayout()
+        self.filter_inputs: list[QLineEdit] = []
+        for column, label in enumerate(self.table_model.header_labels):
+            filter_input = QLineEdit()
+            filter_input.setPlaceholderText(f"Filter {label}")
+            filter_input.setClearButtonEnabled(True)
+            filter_input.textChanged.connect(lambda text, column=column: self.proxy_model.set_filter(column, text))
+            filter_layout.addWidget(filter_input)
+            self.filter_inputs.append(filter_input)
+        layout.addLayout(filter_layout)
+
+        self.table = QTableView()
+        self.table.setModel(self.proxy_model)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        # Clicking a header sorts ascending, then descending, then back to the attribute order
+        header.setSortIndicatorClearable(True)
+        header.setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.table.setSortingEnabled(True)
+        self.table.selectionModel().selectionChanged.connect(self.on_selection_changed)
+        # The selected row can disappear without a selection change being signalled
+        self.proxy_model.rowsRemoved.connect(self.on_selection_changed)
+        self.proxy_model.layoutChanged.connect(self.on_selection_changed)
+        self.proxy_model.modelReset.connect(self.on_selection_changed)
         layout.addWidget(self.table)
         self.widget.setLayout(layout)
 
     def _get_sorted_condensed_inventory(self) -> list[dict]:
-        """Groups items by brand, type, platform, width, and length."""
-        # Create a dictionary to hold grouped items
-        grouped = {}
-        for item in self.inventory:
-            key = tuple()
-            for header in self.header_labels:
-                key += (getattr(item, self.ItemClass.getAttributeNameFromHeader(header)),)
-
-            # Create unique groups based on attributes
-            if key not in grouped:
-                group = {}
-                for attr in self.attributes:
-                    group[attr] = getattr(item, attr)
-                group["total_qty"] = 0
-                group["expiries"] = []
-                grouped[key] = group
+        """Returns the groups of items, sorted by their attributes."""
+        return self.store._get_sorted_condensed_inventory()
 
-            grouped[key]["total_qty"] += item.qty
-            grouped[key]["expiries"].append({"date": item.expiry, "qty": item.qty})
+    def _storage_warning(self, e: StorageError):
+        QMessageBox.warning(self.widget, "Storage Error", str(e))
 
-        # Condense the grouped inventory into a list
-        condensed = []
-        for group in grouped.values():
-            expiries_sorted = sorted(group["expiries"], key=lambda x: datetime.strptime(x["date"], "%Y-%m-%d"), reverse=True)
-            most_recent_expiry = expiries_sorted[0]["date"]
-            most_recent_count = sum(e["qty"] for e in expiries_sorted if e["date"] == most_recent_expiry)
-            
-            condensed_item = {}
-            for attr in self.attributes:
-                condensed_item[attr] = group[attr]
-            condensed_item["total_qty"] = group["total_qty"]
-            condensed_item["most_recent_expiry"] = most_recent_expiry
-            condensed_item["most_recent_expiry_qty"] = most_recent_count
-            condensed.append(condensed_item)
-        
-        # Sort condensed list based on header labels and most recent expiry
-        def key_func(x):
-            result = tuple()
-            for attr in self.attributes:
-                result += (x[attr],)
-            return result + (x["most_recent_expiry"],)
-        sorted_condensed = sorted(
-            condensed,
-            key=key_func
-        )
+    def wait_for_storage(self) -> bool:
+        """Blocks until background storage work (e.g. a compaction) is done, returning whether it succeeded."""
+        try:
+            self.store.wait_for_storage()
+        except StorageError as e:
+            self._storage_warning(e)
+            return False
+        return True
 
-        return sorted_condensed
+    def _exec_dialog(self, dialog: QDialog) -> int:
+        # Dialogs are timed from opening to closing, including the time spent filling them in
+        with instrumentation.measure(f"{type(dialog).__name__}.exec"):
+            return dialog.exec()
 
     def add_item(self):
         dialog: AddDialog = self.AddDialogClass(self.widget)
-        if dialog.exec() == QDialog.DialogCode.Accepted:
+        if self._exec_dialog(dialog) == QDialog.DialogCode.Accepted:
             try:
                 item = dialog.get_data()
             except (AllFieldsRequiredError, InvalidDateError, InvalidQuantityError) as e:
                 QMessageBox.warning(self.widget, "Error", str(e))
                 return
             # If item already exists in inventory, update the qty on that, else add it
-            matching_item_index = None
-            for i, inventory_item in enumerate(self.inventory):
-                if all(
-                            getattr(item, attr) == getattr(inventory_item, attr)
-                            for attr in self.attributes
-                        ) and \
-                        item.ref == inventory_item.ref and \
-                        item.lot == inventory_item.lot and \
-                        item.expiry == inventory_item.expiry:
-                    matching_item_index = i
-                    break
-            if matching_item_index is not None:
-                self.inventory[matching_item_index].qty += item.qty
-            else:
-                self.inventory.append(item)
-            self.update_table()
+            try:
+                self.store.add_item(item)
+            except StorageError as e:
+                self._storage_warning(e)
 
     def edit_item(self):
         """Open dialog to edit selected item(s)"""
-        if self.selected_row is None:
-            QMessageBox.warning(self, "Error", "Please select a row first.")
+        row = self.selected_row
+        if row is None:
+            QMessageBox.warning(self.widget, "Error", "Please select a row first.")
             return
 
-        sorted_condensed_inventory = self._get_sorted_condensed_inventory()
-        selected_item = sorted_condensed_inventory[self.selected_row]
+        selected_item = self.store.get_group(row)
 
         # Get all matching items from inventory
-        matching_items = [
-            item for item in self.inventory
-            if all(
-                getattr(item, self.ItemClass.getAttributeNameFromHeader(header)) == selected_item[self.ItemClass.getAttributeNameFromHeader(header)]
-                for header in self.header_labels
-            )
-        ]
+        matching_items = self.store.get_group_lots(row)
 
         args = {}
         for attr in self.attributes:
@@ -173,112 +166,63 @@ class Inventory:
             **args
         )
 
-        if dialog.exec() == QDialog.DialogCode.Accepted:
+        if self._exec_dialog(dialog) == QDialog.DialogCode.Accepted:
             edits = dialog.get_edits()
-            applied = 0
+            try:
+                applied = self.store.edit_items(matching_items, edits)
+            except StorageError as e:
+                # The edits are applied, only recording them failed
+                self._storage_warning(e)
+                applied = len(edits)
 
-            for original, new in edits:
-                # Find the corresponding matching_item from the dialog's inventory_index
-                matching_item = matching_items[original.inventory_index]
-                # Find the index in the main inventory using original values
-                inventory_index = -1
-                for inv_item in self.inventory:
-                    if (
-                        all(
-                            getattr(inv_item, attr) == getattr(matching_item, attr)
-                            for attr in self.attributes
-                        ) and
-                        inv_item.ref == original.item.ref and
-                        inv_item.lot == original.item.lot and
-                        inv_item.expiry == original.item.expiry
-                    ):
-                        inventory_index = self.inventory.index(inv_item)
-                        break
+            QMessageBox.information(self.widget, "Success", f"{applied} kinds of {self.item_name}s edited successfully.")
 
-                if inventory_index == -1:
-                    continue
+    @timed("load_data")
+    def load_data(self) -> LoadReport:
+        """Replaces the inventory with the lots in storage and returns a load report."""
+        self.wait_for_storage()
+        return self.store.apply_data(*self.store.read_data())
 
-                # Apply edits
-                for attr in self.attributes:
-                    setattr(self.inventory[inventory_index], attr, getattr(new, attr))
-                self.inventory[inventory_index].ref = new.ref
-                self.inventory[inventory_index].lot = new.lot
-                self.inventory[inventory_index].expiry = new.expiry
-                self.inventory[inventory_index].qty = new.qty
-                applied += 1
+    @property
+    def selected_row(self) -> int | None:
+        """The store's group row of the selected table row, or None if no row is selected.
 
-            self.update_table()
-            QMessageBox.information(self.widget, "Success", f"{applied} kinds of {self.item_name}s edited successfully.")
-
-    def load_data(self):
-        # Load items from CSV file
-        try:
-            with open(self.inventory_file, "r") as f:
-                reader = csv.reader(f)
-                for row in reader:
-                    # Skip empty rows
-                    if not row:
-                        continue
-                    # Skip header row if present
-                    if (
-                            row[0].strip().lower() == self.attributes[0].strip().lower() or
-                            (
-                                len(row) > len(self.attributes) and
-                                row[len(self.attributes)].strip().lower() == "expiry"
-                            )
-                    ):
-                        continue
-                    # Skip rows with incorrect number of columns
-                    if len(row) != len(self.attributes) + 4:
-                        continue
-                    args = {}
-                    for i, a in enumerate(self.attributes):
-                        args[a] = row[i]
-                    self.inventory.append(self.ItemClass(
-                        **args,
-                        ref=row[len(self.attributes)],
-                        lot=row[len(self.attributes) + 1],
-                        expiry=row[len(self.attributes) + 2],
-                        qty=int(row[len(self.attributes) + 3])
-                    ))
-        except FileNotFoundError:
-            QMessageBox.information(self.widget, "Info", f"No existing {self.item_name} inventory file found. A new one will be created upon saving.")
-            self.inventory = []
-        except Exception as e:
-            QMessageBox.warning(self.widget, "Load Error", f"Failed to load {self.item_name}s: {e}")
-            QMessageBox.information(self.widget, "Info", f"No existing {self.item_name} inventory file found. A new one will be created upon saving.")
-            self.inventory = []
+        It is mapped from the view when read, as source rows shift whenever a
+        group is added or removed, including groups the filters hide.
+        """
+        selected_indexes = self.table.selectionModel().selectedIndexes()
+        if not selected_indexes:
+            return None
+        return self.proxy_model.mapToSource(selected_indexes[0]).row()
 
     def on_selection_changed(self):
         """Enable/disable remove button based on table selection"""
-        selected_items = self.table.selectedItems()
-        if selected_items:
-            self.selected_row = selected_items[0].row()
-            self.edit_btn.setEnabled(True)
-            self.remove_btn.setEnabled(True)
-        else:
-            self.selected_row = None
-            self.edit_btn.setEnabled(False)
-            self.remove_btn.setEnabled(False)
+        has_selection = self.table.selectionModel().hasSelection()
+        self.edit_btn.setEnabled(has_selection)
+        self.remove_btn.setEnabled(has_selection)
+
+    def show_group(self, row: int):
+        """Selects and scrolls to the row of a group, clearing the filters if they hide it."""
+        index = self.proxy_model.mapFromSource(self.table_model.index(row, 0))
+        if not index.isValid():
+            for filter_input in self.filter_inputs:
+                filter_input.clear()
+            index = self.proxy_model.mapFromSource(self.table_model.index(row, 0))
+        self.table.selectRow(index.row())
+        self.table.scrollTo(index)
 
     def remove_item(self):
         """Open dialog to remove selected item"""
-        if self.selected_row is None:
-            QMessageBox.warning(self, "Error", "Please select a row first.")
+        row = self.selected_row
+        if row is None:
+            QMessageBox.warning(self.widget, "Error", "Please select a row first.")
             return
 
         # Get stats for selected item
-        sorted_condensed_inventory = self._get_sorted_condensed_inventory()
-        selected_item = sorted_condensed_inventory[self.selected_row]
+        selected_item = self.store.get_group(row)
 
         # Get all matching items from inventory
-        matching_items = [
-            item for item in self.inventory
-            if all(
-                getattr(item, self.ItemClass.getAttributeNameFromHeader(header)) == selected_item[self.ItemClass.getAttributeNameFromHeader(header)]
-                for header in self.header_labels
-            )
-        ]
+        matching_items = self.store.get_group_lots(row)
 
         args = {}
         for attr in self.attributes:
@@ -288,93 +232,31 @@ class Inventory:
             parent=self.widget,
             **args
         )
-        
-        if dialog.exec() == QDialog.DialogCode.Accepted:
-            removals = dialog.get_removals()
-            
-            for removal in removals:
-                remove_qty = removal.remove_qty
+        # Default to taking the oldest stock first
+        group_key = self.store.get_group_key(row)
+        dialog.set_fefo_picker(lambda qty, expiring_after: self.store.pick_fefo(group_key, qty, expiring_after))
 
-                matching_item = matching_items[removal.inventory_index]
-                # Find the index in the main inventory
-                inventory_index = -1
-                for inv_item in self.inventory:
-                    if (
-                            all(
-                                getattr(inv_item, attr) == getattr(matching_item, attr)
-                                for attr in self.attributes
-                            ) and
-                            inv_item.ref == matching_item.ref and
-                            inv_item.lot == matching_item.lot and
-                            inv_item.expiry == matching_item.expiry
-                        ):
-                        inventory_index = self.inventory.index(inv_item)
-                        break
-
-                if inventory_index == -1:
-                    continue  # Should not happen
-                if self.inventory[inventory_index].qty > remove_qty:
-                    self.inventory[inventory_index].qty -= remove_qty
-                else:
-                    del self.inventory[inventory_index]
+        if self._exec_dialog(dialog) == QDialog.DialogCode.Accepted:
+            removals = dialog.get_removals()
+            try:
+                self.store.remove_items(matching_items, removals)
+            except StorageError as e:
+                self._storage_warning(e)
             
-            self.update_table()
             QMessageBox.information(self.widget, "Success", f"{len(removals)} {self.item_name}s removed successfully.")
 
+    @timed("save_data")
     def save_data(self, showMessageBox=True):
-        # Save items to CSV file
+        # Save items to CSV file, replacing it atomically so a failed write cannot truncate it
+        self.wait_for_storage()
         try:
-            with open(self.inventory_file, "w", newline="") as f:
-                writer = csv.writer(f)
-                # Write header
-                writer.writerow(self.attributes + ["REF", "LOT", "Expiry", "Qty"])
-                for item in self.inventory:
-                    writer.writerow(
-                        [getattr(item, attr) for attr in self.attributes] +
-                        [
-                            item.ref,
-                            item.lot,
-                            item.expiry,
-                            item.qty
-                        ]
-                    )
+            self.store.save()
             if showMessageBox:
-                QMessageBox.information(self.widget, "Saved", f"{self.item_name.capitalize()}s saved to {self.inventory_file}.")
+                QMessageBox.information(self.widget, "Saved", f"{self.item_name.capitalize()}s saved to {self.store.storage.location}.")
         except Exception as e:
             QMessageBox.warning(self.widget, "Save Error", f"Failed to save {self.item_name}s: {e}")
 
+    @timed("update_table")
     def update_table(self):
-        self.table.setRowCount(0)
-        now = datetime.now()
-        sorted_condensed_inventory = self._get_sorted_condensed_inventory()
-
-        for item in sorted_condensed_inventory:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            for i, header in enumerate(self.header_labels):
-                attr = self.ItemClass.getAttributeNameFromHeader(header)
-                self.table.setItem(row, i, QTableWidgetItem(str(item[attr])))
-            self.table.setItem(row, len(self.header_labels), QTableWidgetItem(str(item["total_qty"])))
-            self.table.setItem(row, len(self.header_labels) + 1, QTableWidgetItem(item["most_recent_expiry"]))
-            self.table.setItem(row, len(self.header_labels) + 2, QTableWidgetItem(str(item["most_recent_expiry_qty"])))
-
-            try:
-                expiry_date = datetime.strptime(item["most_recent_expiry"], "%Y-%m-%d")
-            except Exception:
-                expiry_date = None
-            status_emoji = ""
-            status = ""
-            if item["total_qty"] <= self.low_quantity:
-                status_emoji = "⚠"
-                status = "Low Stock"
-            if expiry_date and (expiry_date - now).days < self.days_from_expiry + self.days_from_expiry_warning:
-                if expiry_date < now:
-                    status_emoji = "☠️"
-                    status = ", ".join([status, "Expired"])
-                elif (expiry_date - now).days < self.days_from_expiry:
-                    status_emoji = "❌"
-                    status = ", ".join([status, "Expiring Soon"])
-                else:
-                    status_emoji = "❗"
-                    status = ", ".join([status, "Expiry Warning"])
-            self.table.setItem(row, len(self.header_labels) + 3, QTableWidgetItem(f"{status_emoji} {status}"))
\ No newline at end of file
+        """Refreshes every row of the table, e.g. after the date has changed."""
+        self.table_model.refresh()
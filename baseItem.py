@@ -1,11 +1,49 @@
+from datetime import date, datetime
+from itemSchema import BASE_FIELDS, Field
+
+def parse_expiry(expiry: str) -> date:
+    """Parses a "YYYY-MM-DD" expiry string, raising ValueError if it is invalid."""
+    try:
+        return date.fromisoformat(expiry)
+    except ValueError:
+        # Also accept dates without zero padding, e.g. 2027-6-1
+        return datetime.strptime(expiry, "%Y-%m-%d").date()
+
 class BaseItem:
+    # Items use __slots__ so that years of lot history stay compact in memory
+    __slots__ = ("ref", "lot", "expiry_ordinal")
+
     def __init__(self, ref, lot, expiry):
         self.ref = ref
         self.lot = lot
         self.expiry = expiry
 
+    @property
+    def expiry(self) -> str:
+        """The expiry as a "YYYY-MM-DD" string, only produced for display and saving."""
+        return date.fromordinal(self.expiry_ordinal).isoformat()
+
+    @expiry.setter
+    def expiry(self, expiry: str | date | int):
+        # Expiry is stored as a day ordinal so sorting and status checks are int compares
+        if isinstance(expiry, int):
+            self.expiry_ordinal = expiry
+        elif isinstance(expiry, date):
+            self.expiry_ordinal = expiry.toordinal()
+        else:
+            self.expiry_ordinal = parse_expiry(expiry).toordinal()
+
 class Item(BaseItem):
     """Generic item class to be inherited from."""
+    __slots__ = ("brand", "qty")
+    # Columns of the item category, extended by each subclass
+    fields: tuple[Field, ...] = BASE_FIELDS
+    _fields_by_header = {field.header: field for field in BASE_FIELDS}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._fields_by_header = {field.header: field for field in cls.fields}
+
     def __init__(self, brand, ref, lot, expiry, qty: int):
         super().__init__(ref, lot, expiry)
         self.brand = brand
@@ -14,39 +52,27 @@ class Item(BaseItem):
     @classmethod
     def getAttributeFromHeader(cls, header: str):
         """Returns the attribute of the item based on the header passed in."""
-        if header == "Brand":
-            return cls.brand
-        elif header == "REF":
-            return cls.ref
-        elif header == "LOT":
-            return cls.lot
-        elif header == "Expiry":
-            return cls.expiry
-        elif header == "Qty in Stock":
-            return cls.qty
+        name = cls.getAttributeNameFromHeader(header)
+        return getattr(cls, name) if name else None
 
     @classmethod
     def getAttributeNameFromHeader(cls, header: str):
         """Returns the attribute name of the item based on the header passed in."""
-        if header == "Brand":
-            return "brand"
-        elif header == "REF":
-            return "ref"
-        elif header == "LOT":
-            return "lot"
-        elif header == "Expiry":
-            return "expiry"
-        elif header == "Qty in Stock":
-            return "qty"
+        field = cls._fields_by_header.get(header)
+        return field.name if field else None
 
 class EditItem:
     """Class to be used by the EditDialog class when editing an item in an inventory."""
+    __slots__ = ("item", "inventory_index")
+
     def __init__(self, item: Item, inventory_index: int):
         self.item = item
         self.inventory_index = inventory_index
 
 class RemovalItem(BaseItem):
     """Class to be used by the RemoveDialog class when removing quantity from an item in an inventory."""
+    __slots__ = ("remove_qty", "inventory_index")
+
     def __init__(self, ref, lot, expiry, remove_qty: int, inventory_index: int):
         super().__init__(ref, lot, expiry)
         self.remove_qty = remove_qty
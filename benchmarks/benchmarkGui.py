@@ -0,0 +1,186 @@
+"""Measures GUI latencies under Qt's offscreen platform, so they can be checked on a headless machine.
+
+Usage: python benchmarks/benchmarkGui.py [--sizes 1000 10000 ...] [--categories Implants ...]
+                                         [--repeat N] [--json FILE]
+
+Scripts opening each Add/Edit/Remove dialog, changing every selection of
+the Add dialogs' cascading combo boxes and refreshing tables of
+increasing size, and reports p50/p95 latencies in milliseconds.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QApplication, QComboBox
+from baseInventory import Inventory
+from boneGrafts import BoneGraftInventory
+from coverScrews import CoverScrewInventory
+from healingAbutments import HealingAbutmentInventory
+from implants import ImplantInventory
+from membranes import MembraneInventory
+from temporaryAbutments import TemporaryAbutmentInventory
+from syntheticData import write_inventory_file
+
+INVENTORY_CLASSES: dict[str, type[Inventory]] = {
+    "Implants": ImplantInventory,
+    "Healing Abutments": HealingAbutmentInventory,
+    "Cover Screws": CoverScrewInventory,
+    "Temporary Abutments": TemporaryAbutmentInventory,
+    "Bone Grafts": BoneGraftInventory,
+    "Membranes": MembraneInventory,
+}
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_REPEAT = 20
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """Returns the nearest-rank percentile of the samples, e.g. fraction=0.95 for p95."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def _timed(app: QApplication, function) -> float:
+    # Runs function and the events it posts, returning the elapsed seconds
+    start = time.perf_counter()
+    function()
+    app.processEvents()
+    return time.perf_counter() - start
+
+def _open_dialog(app: QApplication, create_dialog) -> float:
+    # Times building a dialog and showing it until its first paint
+    dialog = None
+    def open_():
+        nonlocal dialog
+        dialog = create_dialog()
+        dialog.show()
+    seconds = _timed(app, open_)
+    dialog.close()
+    dialog.deleteLater()
+    app.processEvents()
+    return seconds
+
+def _change_cascades(app: QApplication, dialog, attributes: list[str]) -> list[float]:
+    # Selects every entry of each cascading combo box in turn, timing each change. The
+    # innermost boxes go first, while the outer ones still select the options they depend on
+    samples = []
+    for attribute in reversed(attributes):
+        for index in range(64):
+            # Earlier changes may have replaced the combo box, so look it up each time
+            widget = getattr(dialog, f"{attribute.rstrip('_')}_input", None)
+            if not isinstance(widget, QComboBox) or index >= widget.count():
+                break
+            # Adding a brand opens a blocking input dialog
+            if widget.itemText(index) == "Add another brand...":
+                continue
+            samples.append(_timed(app, lambda: widget.setCurrentIndex(index)))
+    return samples
+
+def _get_dialog_args(inventory: Inventory, row: int) -> tuple[list, dict]:
+    # The lots and keyword arguments Inventory passes to its Edit/Remove dialogs for a row
+    group = inventory.store.get_group(row)
+    return inventory.store.get_group_lots(row), {attr: group[attr] for attr in inventory.attributes}
+
+def benchmark_category(app: QApplication, title: str, sizes: list[int], repeat: int, directory: str) -> dict[str, list[float]]:
+    """Returns {measurement: samples in seconds} for a category."""
+    InventoryClass = INVENTORY_CLASSES[title]
+    samples: dict[str, list[float]] = {}
+    rng = random.Random(0)
+    for size in sizes:
+        inventory_file = os.path.join(directory, f"{title.replace(' ', '_').lower()}_{size}.csv")
+        write_inventory_file(title, inventory_file, size)
+        inventory = InventoryClass(inventory_file=inventory_file)
+        inventory.load_data()
+        inventory.widget.resize(1600, 800)
+        inventory.widget.show()
+        app.processEvents()
+        # Repaint synchronously, as the table would be after a change
+        samples[f"update_table {size}"] = [
+            _timed(app, lambda: (inventory.update_table(), inventory.table.viewport().repaint()))
+            for _ in range(repeat)
+        ]
+        # Alternate the order, so that every sample re-sorts
+        samples[f"sort {size}"] = [
+            _timed(app, lambda: inventory.table.sortByColumn(
+                rng.randrange(inventory.table_model.columnCount()),
+                Qt.SortOrder.AscendingOrder if i % 2 else Qt.SortOrder.DescendingOrder
+            ))
+            for i in range(repeat)
+        ]
+        inventory.table.sortByColumn(-1, Qt.SortOrder.AscendingOrder)
+        samples[f"filter {size}"] = [
+            _timed(app, lambda: inventory.filter_inputs[0].setText(text))
+            for text in (["n", "no", "nob", ""] * repeat)[:repeat]
+        ]
+        rows = [rng.randrange(inventory.store.get_group_count()) for _ in range(repeat)]
+        for name, DialogClass in (("edit dialog", inventory.EditDialogClass), ("remove dialog", inventory.RemoveDialogClass)):
+            samples[f"{name} {size}"] = [
+                _open_dialog(app, lambda: DialogClass(
+                    _get_dialog_args(inventory, row)[0],
+                    parent=inventory.widget,
+                    **_get_dialog_args(inventory, row)[1]
+                ))
+                for row in rows
+            ]
+        inventory.widget.close()
+        inventory.store.storage.close()
+
+    # Add dialogs do not depend on the inventory size
+    inventory = InventoryClass(inventory_file=os.path.join(directory, "empty.csv"))
+    samples["add dialog"] = [
+        _open_dialog(app, lambda: inventory.AddDialogClass(inventory.widget)) for _ in range(repeat)
+    ]
+    cascade_samples = []
+    for _ in range(repeat):
+        dialog = inventory.AddDialogClass(inventory.widget)
+        dialog.show()
+        app.processEvents()
+        cascade_samples += _change_cascades(app, dialog, inventory.attributes)
+        dialog.close()
+        dialog.deleteLater()
+    if cascade_samples:
+        samples["add cascade change"] = cascade_samples
+    return samples
+
+def print_results(results: dict[str, dict[str, list[float]]]):
+    print(f"{'Category':<20} {'Measurement':<28} {'Samples':>8} {'p50 ms':>9} {'p95 ms':>9}")
+    for title, measurements in results.items():
+        for name, samples in measurements.items():
+            print(
+                f"{title:<20} {name:<28} {len(samples):>8} "
+                f"{percentile(samples, 0.5) * 1000:>9.2f} {percentile(samples, 0.95) * 1000:>9.2f}"
+            )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure GUI latencies under the offscreen platform.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="lot counts of the refreshed tables")
+    parser.add_argument("--categories", nargs="+", default=list(INVENTORY_CLASSES), choices=list(INVENTORY_CLASSES), metavar="CATEGORY")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="samples per measurement")
+    parser.add_argument("--json", help="also write the p50/p95 latencies to this file")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    directory = tempfile.mkdtemp(prefix="inventory-gui-benchmark-")
+    try:
+        results = {
+            title: benchmark_category(app, title, args.sizes, args.repeat, directory)
+            for title in args.categories
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print_results(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                title: {
+                    name: {"p50": percentile(samples, 0.5), "p95": percentile(samples, 0.95), "samples": len(samples)}
+                    for name, samples in measurements.items()
+                }
+                for title, measurements in results.items()
+            }, f, indent=2)
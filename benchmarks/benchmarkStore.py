@@ -0,0 +1,180 @@
+"""Times the inventory engine on synthetic inventories and compares the results with stored baselines.
+
+Usage: python benchmarks/benchmarkStore.py [--sizes 1000 10000 ...] [--categories Implants ...]
+                                           [--no-memory] [--save-baseline] [--baseline FILE]
+
+Each operation is run once without tracemalloc for its time and, unless
+--no-memory is given, once more with it for its peak memory.
+
+The baseline file records the machine and Python version it was measured
+on. Absolute times are only compared on the same machine; elsewhere each
+operation's scaling (its time per lot relative to the smallest size run) is
+compared instead, which does not depend on the machine's speed.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from baseItem import RemovalItem
+from itemCategories import CATEGORIES
+from syntheticData import write_inventory_file
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+# add_item and remove_items commit (and fsync) each action, so they are timed on a sample
+ACTION_COUNT = 1000
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+def _run_operations(title: str, size: int, directory: str, measure_memory: bool) -> dict[str, dict]:
+    # Runs every operation on a fresh copy of the inventory, returning {operation: result}
+    generated_file = os.path.join(directory, f"{title.replace(' ', '_').lower()}_{size}.csv")
+    if not os.path.exists(generated_file):
+        write_inventory_file(title, generated_file, size)
+    # Every run starts from a copy of the generated file, as saving rewrites it
+    run_directory = tempfile.mkdtemp(dir=directory)
+    inventory_file = os.path.join(run_directory, os.path.basename(generated_file))
+    shutil.copyfile(generated_file, inventory_file)
+    store = CATEGORIES[title].create_store(inventory_file)
+    rng = random.Random(size)
+    results = {}
+
+    def measure(operation: str, count: int, function):
+        if measure_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        function()
+        seconds = time.perf_counter() - start
+        result = {"seconds": seconds, "count": count, "per_second": count / seconds if seconds else None}
+        if measure_memory:
+            result["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+        results[operation] = result
+
+    measure("load", size, store.load)
+    measure("condense", store.get_group_count(), store._get_sorted_condensed_inventory)
+
+    # Merge copies of existing lots, the common case when restocking
+    lots = rng.sample(list(store.inventory.values()), min(ACTION_COUNT, size))
+    copies = [
+        store.ItemClass(
+            **{name: getattr(lot, name) for name in store.attributes},
+            ref=lot.ref, lot=lot.lot, expiry=lot.expiry_ordinal, qty=1
+        )
+        for lot in lots
+    ]
+    def add_items():
+        for copy in copies:
+            store.add_item(copy)
+    measure("add_merge", len(copies), add_items)
+
+    rows = [rng.randrange(store.get_group_count()) for _ in range(min(ACTION_COUNT, size))]
+    def remove_items():
+        for row in rows:
+            if row >= store.get_group_count():
+                row = store.get_group_count() - 1
+            group_lots = store.get_group_lots(row)
+            lot = group_lots[0]
+            store.remove_items(group_lots, [RemovalItem(lot.ref, lot.lot, lot.expiry_ordinal, 1, 0)])
+    measure("remove", len(rows), remove_items)
+
+    store.wait_for_storage()
+    measure("save", len(store.inventory), store.save)
+    store.storage.close()
+    return results
+
+def run_benchmarks(titles: list[str], sizes: list[int], measure_memory: bool = True) -> dict:
+    """Returns {category: {size: {operation: result}}} for every category and size."""
+    results = {}
+    directory = tempfile.mkdtemp(prefix="inventory-benchmark-")
+    try:
+        for title in titles:
+            results[title] = {}
+            for size in sizes:
+                result = _run_operations(title, size, directory, measure_memory=False)
+                if measure_memory:
+                    for operation, memory in _run_operations(title, size, directory, measure_memory=True).items():
+                        result[operation]["peak_mb"] = memory["peak_mb"]
+                results[title][str(size)] = result
+                print(f"{title} {size} lots done", file=sys.stderr)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+def get_machine() -> dict[str, str]:
+    """Describes the machine and Python version the benchmarks run on."""
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": str(os.cpu_count()),
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+    }
+
+def get_scaling(sizes: dict[str, dict], size: str, reference_size: str, operation: str) -> float | None:
+    """Returns an operation's time per counted item at a size relative to a reference size, or None if unknown."""
+    reference = sizes.get(reference_size, {}).get(operation)
+    result = sizes.get(size, {}).get(operation)
+    if not reference or not result or not reference["seconds"] or not result["count"]:
+        return None
+    return (result["seconds"] / result["count"]) / (reference["seconds"] / reference["count"])
+
+def print_results(results: dict, baseline: dict):
+    """Prints a table of results with their scaling, compared with the baseline's.
+
+    The change in time is only shown when the baseline was measured on this
+    machine, as absolute times from another machine say nothing about the code.
+    """
+    same_machine = baseline.get("machine") == get_machine()
+    base_results = baseline.get("results", {})
+    if base_results and not same_machine:
+        machine = ", ".join(baseline.get("machine", {}).values()) or "an unknown machine"
+        print(f"Baseline measured on {machine}, comparing scaling only", file=sys.stderr)
+    print(f"{'Category':<20} {'Lots':>8} {'Operation':<10} {'Seconds':>10} {'Per second':>12} {'Peak MB':>9} {'Scaling':>8} {'Base':>8} {'vs baseline':>12}")
+    for title, sizes in results.items():
+        base_sizes = base_results.get(title, {})
+        # The smallest size run is the reference for both, so their scalings are comparable
+        reference_size = min(sizes, key=int)
+        for size, operations in sizes.items():
+            for operation, result in operations.items():
+                scaling = get_scaling(sizes, size, reference_size, operation)
+                base_scaling = get_scaling(base_sizes, size, reference_size, operation)
+                base = base_sizes.get(size, {}).get(operation)
+                change = ""
+                if same_machine and base and base["seconds"]:
+                    change = f"{(result['seconds'] / base['seconds'] - 1) * 100:+.1f}%"
+                per_second = f"{result['per_second']:.0f}" if result["per_second"] else "-"
+                peak_mb = f"{result['peak_mb']:.1f}" if "peak_mb" in result else "-"
+                scaling = f"{scaling:.2f}x" if scaling is not None else "-"
+                base_scaling = f"{base_scaling:.2f}x" if base_scaling is not None else "-"
+                print(f"{title:<20} {size:>8} {operation:<10} {result['seconds']:>10.4f} {per_second:>12} {peak_mb:>9} {scaling:>8} {base_scaling:>8} {change:>12}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the inventory engine on synthetic inventories.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="lot counts, e.g. 1000 1000000")
+    parser.add_argument("--categories", nargs="+", default=list(CATEGORIES), choices=list(CATEGORIES), metavar="CATEGORY")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline file to compare with or save to")
+    parser.add_argument("--save-baseline", action="store_true", help="merge these results into the baseline file")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+    results = run_benchmarks(args.categories, args.sizes, measure_memory=not args.no_memory)
+    print_results(results, baseline)
+    if args.save_baseline:
+        # Results from another machine cannot be mixed with these, so they are replaced
+        if baseline.get("machine") != get_machine():
+            baseline = {"machine": get_machine(), "results": {}}
+        for title, sizes in results.items():
+            baseline["results"].setdefault(title, {}).update(sizes)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
@@ -0,0 +1,115 @@
+"""Generates realistic synthetic inventories for benchmarking.
+
+Usage: python benchmarks/syntheticData.py <category title> <lot count> <output csv> [seed]
+"""
+import itertools
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from baseItem import Item
+from itemCategories import CATEGORIES, Category
+from itemSchema import ItemSchema
+from storage import get_csv_row, replace_file, write_csv_rows
+
+# Values each descriptive attribute takes, per category, modelled on the Add dialogs
+VOCABULARIES: dict[str, dict[str, list[str]]] = {
+    "Implants": {
+        "brand": ["Nobel", "Straumann"],
+        "type_": ["NobelActive TiUltra", "NobelParallel TiUltra", "NobelReplace CC TiUltra", "BLX", "BLT", "TLX"],
+        "platform": ["3.0", "NP", "RP", "WP"],
+        "width": ["3.0", "3.5", "3.75", "4.3", "5.0", "5.5"],
+        "length": ["7.0", "8.5", "10.0", "11.5", "13", "15", "18"],
+    },
+    "Healing Abutments": {
+        "brand": ["Nobel", "Straumann"],
+        "type_": ["Single-unit", "Multi-unit"],
+        "platform": ["3.0", "NP", "RP", "WP"],
+        "width": ["3.6", "4.5", "5", "6"],
+        "height": ["3", "5", "7"],
+    },
+    "Cover Screws": {
+        "brand": ["Nobel", "Straumann"],
+        "platform": ["3.0", "NP", "RP", "WP"],
+    },
+    "Temporary Abutments": {
+        "brand": ["Nobel", "Straumann"],
+        "engagement": ["Snap Engaging", "Snap Non-engaging", "Screw Engaging"],
+        "platform": ["NP", "RP", "WP"],
+        "collar_height": ["1.5 mm", "3 mm"],
+        "height": ["10 mm", "12 mm"],
+    },
+    "Bone Grafts": {
+        "brand": ["creos", "Bio-Oss", "Puros"],
+        "type_": ["Allograft", "Xenograft", "Synthetic"],
+        "particulate": ["Cortical", "Cancellous", "Corticocancellous", "Demineralized cortical"],
+        "granule_size": ["0.125-0.850 mm", "0.25-1.00 mm", "1.00-2.00 mm"],
+        "amount": ["0.25 cc", "0.5 cc", "1.0 cc", "2.0 cc"],
+    },
+    "Membranes": {
+        "brand": ["Osteogenics", "Geistlich", "creos"],
+        "biologic_type": ["Synthetic", "Xenograft", "Allograft"],
+        "membrane_type": ["Ti-reinforced PTFE", "PTFE", "Collagen"],
+        "shape": ["ANL", "BL", "Rectangular", "Round"],
+        "size": ["12 x 24 mm", "15 x 20 mm", "20 x 30 mm", "30 x 40 mm"],
+        "thickness": ["150 um", "250 um", "N/A"],
+    },
+}
+
+def get_products(title: str) -> list[tuple[tuple[str, ...], str]]:
+    """Returns every (descriptive values, REF) product of a category, in a stable order."""
+    category = CATEGORIES[title]
+    vocabulary = VOCABULARIES[title]
+    names = [name for name in category.attributes if name != "sn"]
+    prefix = "".join(word[0] for word in title.split()).upper()
+    return [
+        (values, f"{prefix}{index:05d}")
+        for index, values in enumerate(itertools.product(*(vocabulary[name] for name in names)))
+    ]
+
+def _make_item(category: Category, values: tuple[str, ...], ref: str, lot: str, expiry: date, qty: int, sn: str) -> Item:
+    args = dict(zip((name for name in category.attributes if name != "sn"), values))
+    if "sn" in category.attributes:
+        args["sn"] = sn
+    return category.ItemClass(**args, ref=ref, lot=lot, expiry=expiry, qty=qty)
+
+def generate_items(title: str, count: int, seed: int = 0) -> list[Item]:
+    """Generates count distinct lots of a category.
+
+    Popular products get most of the lots, expiries range from a year ago
+    to five years ahead and most lots hold only a few items, as in a real
+    practice's stock.
+    """
+    category = CATEGORIES[title]
+    products = get_products(title)
+    rng = random.Random(seed)
+    # Zipf-like popularity, so a few groups are large and most are small
+    weights = [1 / (rank + 1) for rank in range(len(products))]
+    rng.shuffle(weights)
+    today = date.today()
+    items = []
+    for i, (values, ref) in enumerate(rng.choices(products, weights, k=count)):
+        expiry = today + timedelta(days=rng.randint(-365, 5 * 365))
+        qty = min(int(rng.expovariate(1 / 3)) + 1, 50)
+        # Serial numbers are only tracked for some grafts and membranes
+        sn = f"{rng.randrange(10 ** 9):09d}" if rng.random() < 0.5 else "N/A"
+        # The index keeps every lot number distinct
+        items.append(_make_item(category, values, ref, f"{i:08d}", expiry, qty, sn))
+    return items
+
+def write_inventory_file(title: str, inventory_file: str, count: int, seed: int = 0):
+    """Writes a synthetic inventory file of a category with count lots."""
+    category = CATEGORIES[title]
+    schema = ItemSchema(category.ItemClass.fields, category.header_labels, category.attributes)
+    rows = (get_csv_row(schema, item) for item in generate_items(title, count, seed))
+    replace_file(write_csv_rows(inventory_file, schema, rows), inventory_file)
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (4, 5) or sys.argv[1] not in CATEGORIES:
+        print(__doc__)
+        print(f"Categories: {', '.join(CATEGORIES)}")
+        sys.exit(1)
+    write_inventory_file(sys.argv[1], sys.argv[3], int(sys.argv[2]), int(sys.argv[4]) if len(sys.argv) == 5 else 0)
@@ -3,36 +3,8 @@ from PyQt6.QtWidgets import (
 )
 from baseDialog import AddDialog, EditDialog, RemoveDialog
 from baseInventory import Inventory
-from baseItem import Item
-
-class BoneGraft(Item):
-    def __init__(self, brand, type_, particulate, granule_size, amount, sn, ref, lot, expiry, qty):
-        super().__init__(brand,ref, lot, expiry, qty)
-        self.type_ = type_
-        self.particulate = particulate
-        self.granule_size = granule_size
-        self.amount = amount
-        self.sn = sn
-
-    @classmethod
-    def getAttributeFromHeader(cls, header):
-        return super().getAttributeFromHeader(header) or {
-            "Type": cls.type_,
-            "Particulate": cls.particulate,
-            "Granule Size": cls.granule_size,
-            "Amount": cls.amount,
-            "SN": cls.sn
-        }.get(header, None)
-    
-    @classmethod
-    def getAttributeNameFromHeader(cls, header):
-        return super().getAttributeNameFromHeader(header) or {
-            "Type": "type_",
-            "Particulate": "particulate",
-            "Granule Size": "granule_size",
-            "Amount": "amount",
-            "SN": "sn"
-        }.get(header, None)
+from sqliteStorage import InventoryDatabase
+from itemCategories import BoneGraft, BONE_GRAFTS
 
 class AddBoneGraftDialog(AddDialog):
     def __init__(self, parent=None, title="Add Bone Graft"):
@@ -83,192 +55,25 @@ class AddBoneGraftDialog(AddDialog):
             sn=sn,
             ref=ref,
             lot=lot,
-            expiry=expiry_date.strftime("%Y-%m-%d"),
+            expiry=expiry_date,
             qty=qty
         )
     
     def _add_dialog_body_widgets(self):
-        self._brand_list = ["creos"]
-        self._refresh_brand_items()
-        self.brand_input.setCurrentText("creos")
-        self.brand_input.currentTextChanged.connect(self._set_dynamic_type_widget)
-        self.type_input = None
-        self.particulate_input = None
-        self.granule_size_input = None
-        self.amount_input = None
         self.sn_input = QLineEdit()
-        
-        # Add widgets to layout
-        self.layout_.addRow("Brand", self.brand_input)
-        self._set_dynamic_type_widget() # Adds type, platform, width, height widgets
+        self._add_cascade_widgets("Bone Grafts", "creos")
         self.layout_.addRow("SN", self.sn_input)
         self.layout_.addRow("REF", self.ref_input)
         self.layout_.addRow("LOT", self.lot_input)
         self.layout_.addRow("Expiry (YYYY-MM-DD)", self.expiry_input)
         self.layout_.addRow("Qty", self.qty_input)
 
-    def _set_dynamic_type_widget(self):
-        self.type_input.deleteLater() if self.type_input else None
-        # Add new widgets based on selection
-        match self.brand_input.currentText():
-            case "creos":
-                self.type_input = QComboBox()
-                self.type_input.addItems([
-                    "Allograft",
-                    "Xenograft"
-                ])
-                self.type_input.setCurrentText("Allograft")
-                self.type_input.currentTextChanged.connect(self._set_dynamic_particulate_widget)
-                self.type_input.currentTextChanged.connect(self._set_dynamic_sn_widget)
-            case _:
-                self.type_input = QLineEdit()
-        # Remove any existing row at this position before inserting to avoid
-        # accumulating rows (which causes the dialog to grow each time)
-        if self.layout_.rowCount() > 1:
-            self.layout_.removeRow(1)
-        self.layout_.insertRow(1, "Type", self.type_input)
-        self._set_dynamic_particulate_widget()
-        self._set_dynamic_sn_widget
-    
-    def _set_dynamic_particulate_widget(self):
-        self.particulate_input.deleteLater() if self.particulate_input else None
-        if isinstance(self.type_input, QComboBox):
-            match self.type_input.currentText():
-                case "Allograft":
-                    self.particulate_input = QComboBox()
-                    self.particulate_input.addItems([
-                        "Corticocancellous",
-                        "Demineralized cortical",
-                        "Min/demin cortical",
-                        "Mineralized cancellous",
-                        "Mineralized cortical"
-                    ])
-                    self.particulate_input.setCurrentText("Corticocancellous")
-                    self.particulate_input.currentTextChanged.connect(self._set_dynamic_granule_size_widget)
-                case "Xenograft":
-                    self.particulate_input = QComboBox()
-                    self.particulate_input.addItems(["N/A"])
-                    self.particulate_input.setCurrentText("N/A")
-                    self.particulate_input.setDisabled(True)
-                    self.particulate_input.currentTextChanged.connect(self._set_dynamic_granule_size_widget)
-                case _:
-                    self.particulate_input = QLineEdit()
-        else:
-            self.particulate_input = QLineEdit()
-        # Ensure we don't duplicate the platform row
-        if self.layout_.rowCount() > 2:
-            self.layout_.removeRow(2)
-        self.layout_.insertRow(2, "Platform", self.particulate_input)
-        self._set_dynamic_granule_size_widget()
-    
-    def _set_dynamic_granule_size_widget(self):
-        self.granule_size_input.deleteLater() if self.granule_size_input else None
-        # Add new widgets based on selection
-        if isinstance(self.type_input, QComboBox):
-            match self.type_input.currentText():
-                case "Allograft":
-                    if isinstance(self.particulate_input, QComboBox):
-                        match self.particulate_input.currentText():
-                            case "Corticocancellous":
-                                self.granule_size_input = QComboBox()
-                                self.granule_size_input.addItems([
-                                    "0.25-1.00 mm",
-                                    "0.50-1.00 mm"
-                                ])
-                                self.granule_size_input.setCurrentText("0.25-1.00 mm")
-                                self.granule_size_input.currentTextChanged.connect(self._set_dynamic_amount_widget)
-                            case "Demineralized cortical":
-                                self.granule_size_input = QComboBox()
-                                self.granule_size_input.addItems([
-                                    "0.125-0.850 mm",
-                                    "0.50-1.00 mm"
-                                ])
-                                self.granule_size_input.setCurrentText("0.125-0.850 mm")
-                                self.granule_size_input.currentTextChanged.connect(self._set_dynamic_amount_widget)
-                            case "Min/demin cortical":
-                                self.granule_size_input = QComboBox()
-                                self.granule_size_input.addItems([
-                                    "0.25-1.00 mm"
-                                ])
-                                self.granule_size_input.setCurrentText("0.25-1.00 mm")
-                                self.granule_size_input.currentTextChanged.connect(self._set_dynamic_amount_widget)
-                            case "Mineralized cancellous":
-                                self.granule_size_input = QComboBox()
-                                self.granule_size_input.addItems([
-                                    "0.25-1.00 mm",
-                                    "0.50-1.00 mm"
-                                ])
-                                self.granule_size_input.setCurrentText("0.25-1.00 mm")
-                                self.granule_size_input.currentTextChanged.connect(self._set_dynamic_amount_widget)
-                            case "Mineralized cortical":
-                                self.granule_size_input = QComboBox()
-                                self.granule_size_input.addItems([
-                                    "0.125-0.850 mm",
-                                    "0.25-1.00 mm",
-                                    "0.50-1.00 mm"
-                                ])
-                                self.granule_size_input.setCurrentText("0.125-0.850 mm")
-                                self.granule_size_input.currentTextChanged.connect(self._set_dynamic_amount_widget)
-                            case _:
-                                self.granule_size_input = QLineEdit()
-                    else:
-                        self.amount_input = QLineEdit()
-                case "Xenograft":
-                    self.granule_size_input = QComboBox()
-                    self.granule_size_input.addItems([
-                        "0.2-1.0 mm",
-                        "1.0-2.0 mm"
-                    ])
-                    self.granule_size_input.setCurrentText("0.2-1.0 mm")
-                    self.granule_size_input.currentTextChanged.connect(self._set_dynamic_amount_widget)
-                case _:
-                    self.granule_size_input = QLineEdit()
-        else:
-            self.granule_size_input = QLineEdit()
-        # Ensure single width row only
-        if self.layout_.rowCount() > 3:
-            self.layout_.removeRow(3)
-        self.layout_.insertRow(3, "Width", self.granule_size_input)
-        self._set_dynamic_amount_widget()
+    def _set_cascade(self, index: int):
+        super()._set_cascade(index)
+        # Whether there is a serial number depends on the type, the input after the brand
+        if index <= 1:
+            self._set_dynamic_sn_widget()
 
-    def _set_dynamic_amount_widget(self):
-        self.amount_input.deleteLater() if self.amount_input else None
-        # Add new widgets based on selection
-        if isinstance(self.type_input, QComboBox):
-            match self.type_input.currentText():
-                case "Allograft":
-                    if isinstance(self.particulate_input, QComboBox):
-                        match self.particulate_input.currentText():
-                            case (
-                                "Corticocancellous" |
-                                "Demineralized cortical" |
-                                "Mineralized cancellous" |
-                                "Mineralized cortical"
-                            ):
-                                self.amount_input = QComboBox()
-                                self.amount_input.addItems(["0.25 cc", "0.5 cc", "1 cc", "2 cc"])
-                                self.amount_input.setCurrentText("0.25 cc")
-                            case "Min/demin cortical":
-                                self.amount_input = QComboBox()
-                                self.amount_input.addItems(["0.5 cc", "1 cc", "2 cc"])
-                                self.amount_input.setCurrentText("0.5 cc")
-                            case _:
-                                self.amount_input = QLineEdit()
-                    else:
-                        self.amount_input = QLineEdit()
-                case "Xenograft":
-                    self.amount_input = QComboBox()
-                    self.amount_input.addItems(["0.25 g", "0.5 g", "1 g", "2 g"])
-                    self.amount_input.setCurrentText("0.25 g")
-                case _:
-                    self.amount_input = QLineEdit()
-        else:
-            self.amount_input = QLineEdit()
-        # Ensure we don't add multiple height rows
-        if self.layout_.rowCount() > 4:
-            self.layout_.removeRow(4)
-        self.layout_.insertRow(4, "Height", self.amount_input)
-    
     def _set_dynamic_sn_widget(self):
         if isinstance(self.type_input, QComboBox):
             match self.type_input.currentText():
@@ -334,7 +139,8 @@ class BoneGraftInventory(Inventory):
             inventory_file: str,
             low_quantity: int=2,
             days_from_expiry: int=180,
-            days_from_expiry_warning: int=60
+            days_from_expiry_warning: int=60,
+            database: InventoryDatabase | None=None
             ):
         super().__init__(
             inventory_file=inventory_file,
@@ -342,14 +148,11 @@ class BoneGraftInventory(Inventory):
             AddDialogClass=AddBoneGraftDialog,
             EditDialogClass=EditBoneGraftDialog,
             RemoveDialogClass=RemoveBoneGraftDialog,
-            header_labels=[
-                "Brand", "Type", "Particulate", "Granule Size", "Amount"
-            ],
-            attributes=[
-                "brand", "type_", "particulate", "granule_size", "amount", "sn"
-            ],
-            item_name="bone graft",
+            header_labels=BONE_GRAFTS.header_labels,
+            attributes=BONE_GRAFTS.attributes,
+            item_name=BONE_GRAFTS.item_name,
             low_quantity=low_quantity,
             days_from_expiry=days_from_expiry,
-            days_from_expiry_warning=days_from_expiry_warning
+            days_from_expiry_warning=days_from_expiry_warning,
+            database=database
         )
\ No newline at end of file
@@ -0,0 +1,122 @@
+from datetime import date
+from PyQt6.QtWidgets import (
+    QCheckBox, QComboBox, QDialog, QDialogButtonBox, QHBoxLayout, QHeaderView, QLabel, QMessageBox,
+    QPushButton, QSpinBox, QTableWidget, QTableWidgetItem, QVBoxLayout
+)
+from exceptions import InsufficientStockError
+from inventoryStore import CaseLine, InventoryStore, resolve_case
+
+class CaseDialog(QDialog):
+    """Builds the list of items a case (e.g. one surgery) uses, across every inventory.
+
+    The lots are picked earliest expiry first when the case is confirmed,
+    skipping expired lots unless asked not to, and the whole case is refused
+    if any line is short.
+    """
+    header_labels = ["Category", "Item", "Qty"]
+
+    def __init__(self, stores: dict[str, InventoryStore], parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Consume Case")
+        self.setModal(True)
+        self.resize(800, 450)
+        self.stores = {title: store for title, store in stores.items() if store.loaded}
+        self.lines: list[CaseLine] = []
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Add the items used in the case, then press Consume."))
+
+        line_layout = QHBoxLayout()
+        self.category_input = QComboBox()
+        self.category_input.addItems(list(self.stores))
+        self.category_input.currentTextChanged.connect(self._set_group_items)
+        line_layout.addWidget(self.category_input)
+        self.group_input = QComboBox()
+        line_layout.addWidget(self.group_input, 1)
+        self.qty_input = QSpinBox()
+        self.qty_input.setRange(1, 999)
+        line_layout.addWidget(self.qty_input)
+        add_btn = QPushButton("Add")
+        add_btn.clicked.connect(self.add_line)
+        line_layout.addWidget(add_btn)
+        layout.addLayout(line_layout)
+
+        self.table = QTableWidget(0, len(self.header_labels))
+        self.table.setHorizontalHeaderLabels(self.header_labels)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        layout.addWidget(self.table)
+        remove_btn = QPushButton("Remove Line")
+        remove_btn.clicked.connect(self.remove_line)
+        layout.addWidget(remove_btn)
+        self.skip_expired_input = QCheckBox("Skip expired lots")
+        self.skip_expired_input.setChecked(True)
+        layout.addWidget(self.skip_expired_input)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        button_box.button(QDialogButtonBox.StandardButton.Ok).setText("Consume")
+        button_box.accepted.connect(self.on_ok_clicked)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+        self._set_group_items(self.category_input.currentText())
+
+    def _set_group_items(self, title: str):
+        # Lists the groups of the chosen category with their stock, keeping each group's key as its data
+        self.group_input.clear()
+        store = self.stores.get(title)
+        if store is None:
+            return
+        for row in range(store.get_group_count()):
+            group = store.get_group(row)
+            description = " ".join(str(group[name]) for name in store.schema.group_attributes)
+            self.group_input.addItem(f"{description} ({group['total_qty']} in stock)", store.get_group_key(row))
+
+    def add_line(self):
+        if self.group_input.currentIndex() < 0:
+            return
+        line = CaseLine(self.category_input.currentText(), self.group_input.currentData(), self.qty_input.value())
+        self.lines.append(line)
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        values = [line.category, " ".join(line.group_key), str(line.qty)]
+        for column, value in enumerate(values):
+            self.table.setItem(row, column, QTableWidgetItem(value))
+
+    def remove_line(self):
+        rows = sorted({index.row() for index in self.table.selectedIndexes()}, reverse=True)
+        for row in rows:
+            self.table.removeRow(row)
+            del self.lines[row]
+
+    def on_ok_clicked(self):
+        """Picks the lots of every line and asks for confirmation, refusing the case if any line is short."""
+        if not self.lines:
+            QMessageBox.information(self, "No Items", "Please add at least one item to the case.")
+            return
+        try:
+            picks = resolve_case(self.stores, self.lines, self.get_skip_expired())
+        except InsufficientStockError as e:
+            QMessageBox.warning(self, "Insufficient Stock", f"The case cannot be consumed, nothing was removed.\n\n{e}")
+            return
+
+        today = date.today().toordinal()
+        confirmation_text = "The following lots will be used, oldest first:\n\n"
+        for title, category_picks in picks.items():
+            for item, take in category_picks:
+                expired = " (EXPIRED)" if item.expiry_ordinal <= today else ""
+                confirmation_text += f"{title} - REF: {item.ref}, LOT: {item.lot}, Expiry: {item.expiry}{expired}, Qty: {take}\n"
+        confirmation_text += "\nDo you want to consume the case?"
+        reply = QMessageBox.question(
+            self,
+            "Confirm Case",
+            confirmation_text,
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            self.accept()
+
+    def get_lines(self) -> list[CaseLine]:
+        return self.lines
+
+    def get_skip_expired(self) -> bool:
+        return self.skip_expired_input.isChecked()
@@ -1,22 +1,8 @@
-from PyQt6.QtWidgets import (
-    QComboBox, QLineEdit
-)
+from PyQt6.QtWidgets import QComboBox
 from baseDialog import AddDialog, EditDialog, RemoveDialog
 from baseInventory import Inventory
-from baseItem import Item
-
-class CoverScrew(Item):
-    def __init__(self, brand, platform, ref, lot, expiry, qty):
-        super().__init__(brand, ref, lot, expiry, qty)
-        self.platform = platform
-    
-    @classmethod
-    def getAttributeFromHeader(cls, header):
-        return super().getAttributeFromHeader(header) if header != "Platform" else cls.platform
-
-    @classmethod
-    def getAttributeNameFromHeader(cls, header):
-        return super().getAttributeNameFromHeader(header) if header != "Platform" else "platform"
+from sqliteStorage import InventoryDatabase
+from itemCategories import CoverScrew, COVER_SCREWS
 
 class AddCoverScrewDialog(AddDialog):
     def __init__(self, parent=None, title="Add Cover Screw"):
@@ -55,42 +41,17 @@ class AddCoverScrewDialog(AddDialog):
             platform=platform,
             ref=ref,
             lot=lot,
-            expiry=expiry_date.strftime("%Y-%m-%d"),
+            expiry=expiry_date,
             qty=qty
         )
     
     def _add_dialog_body_widgets(self):
-        self._brand_list = ["Nobel", "Straumann"]
-        self._refresh_brand_items()
-        self.brand_input.setCurrentText("Nobel")
-        self.brand_input.currentTextChanged.connect(self._set_dynamic_platform_widget)
-        self.platform_input = None
-        
-        # Add widgets to layout
-        self.layout_.addRow("Brand", self.brand_input)
-        self._set_dynamic_platform_widget()
+        self._add_cascade_widgets("Cover Screws", "Nobel")
         self.layout_.addRow("REF", self.ref_input)
         self.layout_.addRow("LOT", self.lot_input)
         self.layout_.addRow("Expiry (YYYY-MM-DD)", self.expiry_input)
         self.layout_.addRow("Qty", self.qty_input)
 
-    def _set_dynamic_platform_widget(self):
-        self.platform_input.deleteLater() if self.platform_input else None
-        if isinstance(self.brand_input, QComboBox):
-            match self.brand_input.currentText():
-                case "Nobel":
-                    self.platform_input = QComboBox()
-                    self.platform_input.addItems(["3.0", "NP", "RP", "WP"])
-                    self.platform_input.setCurrentText("3.0")
-                case _:
-                    self.platform_input = QLineEdit()
-        else:
-            self.platform_input = QLineEdit()
-        # Ensure we don't duplicate the platform row
-        if self.layout_.rowCount() > 1:
-            self.layout_.removeRow(1)
-        self.layout_.insertRow(1, "Platform", self.platform_input)
-
 class EditCoverScrewDialog(EditDialog):
     def __init__(
             self,
@@ -136,7 +97,8 @@ class CoverScrewInventory(Inventory):
             inventory_file: str,
             low_quantity: int=2,
             days_from_expiry: int=180,
-            days_from_expiry_warning: int=60
+            days_from_expiry_warning: int=60,
+            database: InventoryDatabase | None=None
         ):
         super().__init__(
             inventory_file=inventory_file,
@@ -144,14 +106,11 @@ class CoverScrewInventory(Inventory):
             AddDialogClass=AddCoverScrewDialog,
             EditDialogClass=EditCoverScrewDialog,
             RemoveDialogClass=RemoveCoverScrewDialog,
-            header_labels=[
-                "Brand", "Platform"
-            ],
-            attributes=[
-                "brand", "platform"
-            ],
-            item_name="cover screw",
+            header_labels=COVER_SCREWS.header_labels,
+            attributes=COVER_SCREWS.attributes,
+            item_name=COVER_SCREWS.item_name,
             low_quantity=low_quantity,
             days_from_expiry=days_from_expiry,
-            days_from_expiry_warning=days_from_expiry_warning
+            days_from_expiry_warning=days_from_expiry_warning,
+            database=database
         )
\ No newline at end of file
@@ -0,0 +1,63 @@
+from PyQt6.QtWidgets import (
+    QDialog, QDialogButtonBox, QHeaderView, QLabel, QPushButton,
+    QTableWidget, QTableWidgetItem, QVBoxLayout
+)
+from instrumentation import Instrumentation
+
+class DiagnosticsDialog(QDialog):
+    """Shows the timings recorded by an Instrumentation, one row per operation."""
+    header_labels = ["Operation", "Count", "Mean ms", "p50 ms", "p95 ms", "Max ms", "Recent Histogram"]
+
+    def __init__(self, instrumentation: Instrumentation, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Diagnostics")
+        self.resize(1000, 400)
+        self.instrumentation = instrumentation
+        layout = QVBoxLayout(self)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+        self.table = QTableWidget(0, len(self.header_labels))
+        self.table.setHorizontalHeaderLabels(self.header_labels)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self.refresh)
+        self.button_box.addButton(refresh_btn, QDialogButtonBox.ButtonRole.ActionRole)
+        reset_btn = QPushButton("Reset")
+        reset_btn.clicked.connect(self.reset)
+        self.button_box.addButton(reset_btn, QDialogButtonBox.ButtonRole.ResetRole)
+        self.button_box.rejected.connect(self.reject)
+        layout.addWidget(self.button_box)
+        self.refresh()
+
+    def refresh(self):
+        """Reloads the table from the recorded timings."""
+        if self.instrumentation.enabled:
+            self.status_label.setText("Recording timings.")
+        else:
+            self.status_label.setText("Timings are not being recorded. Enable Tools > Record Timings to start.")
+        snapshot = self.instrumentation.get_snapshot()
+        self.table.setRowCount(len(snapshot))
+        for row, (name, summary) in enumerate(snapshot.items()):
+            # Only the buckets that have samples, to keep the column readable
+            histogram = ", ".join(f"{label}: {count}" for label, count in summary["histogram"].items() if count)
+            values = [
+                name,
+                str(summary["count"]),
+                f"{summary['mean_ms']:.1f}",
+                f"{summary['p50_ms']:.1f}",
+                f"{summary['p95_ms']:.1f}",
+                f"{summary['max_ms']:.1f}",
+                histogram
+            ]
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+
+    def reset(self):
+        self.instrumentation.reset()
+        self.refresh()
@@ -11,4 +11,16 @@ class ItemNotFoundError(Exception):
     pass
 
 class FileReadError(Exception):
+    pass
+
+class StorageError(Exception):
+    pass
+
+class InsufficientStockError(Exception):
+    pass
+
+class BarcodeError(Exception):
+    pass
+
+class UnknownGtinError(ItemNotFoundError):
     pass
\ No newline at end of file
@@ -0,0 +1,70 @@
+from datetime import date
+from PyQt6.QtWidgets import (
+    QCheckBox, QDialog, QDialogButtonBox, QHBoxLayout, QHeaderView, QLabel,
+    QSpinBox, QTableWidget, QTableWidgetItem, QVBoxLayout
+)
+from inventoryStore import InventoryStore, get_lots_by_expiry
+
+class ExpiringStockDialog(QDialog):
+    """Lists the lots of every inventory that expire within a number of days, soonest first."""
+    header_labels = ["Category", "Item", "REF", "LOT", "Expiry", "Qty", "Days Left"]
+
+    def __init__(self, stores: dict[str, InventoryStore], days_from_expiry: int = 180, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Expiring Stock")
+        self.resize(1000, 500)
+        self.stores = stores
+        layout = QVBoxLayout(self)
+
+        options_layout = QHBoxLayout()
+        options_layout.addWidget(QLabel("Expiring within"))
+        self.days_input = QSpinBox()
+        self.days_input.setRange(0, 3650)
+        self.days_input.setSuffix(" days")
+        self.days_input.setValue(days_from_expiry)
+        self.days_input.valueChanged.connect(self.refresh)
+        options_layout.addWidget(self.days_input)
+        self.expired_input = QCheckBox("Include expired")
+        self.expired_input.setChecked(True)
+        self.expired_input.toggled.connect(self.refresh)
+        options_layout.addWidget(self.expired_input)
+        options_layout.addStretch()
+        layout.addLayout(options_layout)
+
+        self.table = QTableWidget(0, len(self.header_labels))
+        self.table.setHorizontalHeaderLabels(self.header_labels)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        self.button_box.rejected.connect(self.reject)
+        layout.addWidget(self.button_box)
+        self.refresh()
+
+    def refresh(self):
+        """Queries the inventories' expiry indexes again with the chosen options."""
+        today = date.today().toordinal()
+        first = None if self.expired_input.isChecked() else today + 1
+        lots = get_lots_by_expiry(self.stores, first, today + self.days_input.value())
+        self.table.setRowCount(len(lots))
+        expired = 0
+        for row, (title, item) in enumerate(lots):
+            store = self.stores[title]
+            days_left = item.expiry_ordinal - today
+            if days_left <= 0:
+                expired += 1
+            values = [
+                title,
+                " ".join(str(value) for value in store.schema.get_group_key(item)),
+                item.ref,
+                item.lot,
+                item.expiry,
+                str(item.qty),
+                str(days_left) if days_left > 0 else "Expired"
+            ]
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+        self.summary_label.setText(f"{len(lots)} lots, {expired} expired.")
@@ -0,0 +1,35 @@
+import bisect
+from typing import Iterable, Iterator
+
+class ExpiryIndex:
+    """Keys (e.g. of lots or groups) sorted by an expiry ordinal, for range queries without scanning.
+
+    Entries are (expiry, key) pairs kept in order with bisect. Lookups are
+    logarithmic; adding or removing a key shifts the list once.
+    """
+    def __init__(self):
+        self._entries: list[tuple[int, tuple]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, expiry: int, key: tuple):
+        bisect.insort(self._entries, (expiry, key))
+
+    def remove(self, expiry: int, key: tuple):
+        entry = (expiry, key)
+        i = bisect.bisect_left(self._entries, entry)
+        if i < len(self._entries) and self._entries[i] == entry:
+            del self._entries[i]
+
+    def rebuild(self, entries: Iterable[tuple[int, tuple]]):
+        """Replaces the index with (expiry, key) entries, e.g. after a load."""
+        self._entries = sorted(entries)
+
+    def iter_keys(self, first: int | None = None, last: int | None = None) -> Iterator[tuple]:
+        """Yields the keys expiring from day ordinal first to last (both inclusive), soonest first."""
+        # A 1-tuple sorts before every entry with the same expiry
+        start = 0 if first is None else bisect.bisect_left(self._entries, (first,))
+        stop = len(self._entries) if last is None else bisect.bisect_left(self._entries, (last + 1,))
+        for i in range(start, stop):
+            yield self._entries[i][1]
@@ -0,0 +1,122 @@
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Set to 1 to record timings from startup; they can also be switched on from the Tools menu
+PROFILE_ENV_VAR = "INVENTORY_MANAGER_PROFILE"
+# Overrides where the timings are written on exit
+PROFILE_FILE_ENV_VAR = "INVENTORY_MANAGER_PROFILE_FILE"
+# Recent samples kept per operation for the histogram and percentiles
+WINDOW_SIZE = 1000
+# Upper bounds of the histogram buckets, in milliseconds; the last bucket is unbounded
+BUCKET_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+class OperationTimings:
+    """Durations of one operation: totals since recording started, and a rolling window of recent samples."""
+    def __init__(self, window_size: int = WINDOW_SIZE):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.recent: deque[float] = deque(maxlen=window_size)
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.recent.append(seconds)
+
+    def get_histogram(self) -> list[int]:
+        """Returns the number of recent samples in each bucket of BUCKET_BOUNDS_MS, plus one for slower ones."""
+        counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        for seconds in self.recent:
+            counts[bisect.bisect_left(BUCKET_BOUNDS_MS, seconds * 1000)] += 1
+        return counts
+
+    def get_percentile(self, fraction: float) -> float:
+        """Returns the nearest-rank percentile of the recent samples in seconds, e.g. fraction=0.95 for p95."""
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ms": self.total_seconds * 1000,
+            "mean_ms": self.total_seconds / self.count * 1000 if self.count else 0.0,
+            "max_ms": self.max_seconds * 1000,
+            "p50_ms": self.get_percentile(0.5) * 1000,
+            "p95_ms": self.get_percentile(0.95) * 1000,
+            "histogram": dict(zip(get_bucket_labels(), self.get_histogram())),
+        }
+
+def get_bucket_labels() -> list[str]:
+    """Returns a label per histogram bucket, e.g. "<=5 ms"."""
+    return [f"<={bound} ms" for bound in BUCKET_BOUNDS_MS] + [f">{BUCKET_BOUNDS_MS[-1]} ms"]
+
+class Instrumentation:
+    """Opt-in recorder of how long and how often operations run.
+
+    While disabled, timed functions only pay for one attribute check. Loads
+    run on worker threads, so samples are recorded under a lock.
+    """
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._operations: dict[str, OperationTimings] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            timings = self._operations.get(name)
+            if timings is None:
+                timings = self._operations[name] = OperationTimings()
+            timings.add(seconds)
+
+    @contextmanager
+    def measure(self, name: str):
+        """Records how long the body of a with statement takes, if enabled."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def get_snapshot(self) -> dict[str, dict]:
+        """Returns {operation: summary} of everything recorded, sorted by operation."""
+        with self._lock:
+            return {name: self._operations[name].to_dict() for name in sorted(self._operations)}
+
+    def reset(self):
+        with self._lock:
+            self._operations.clear()
+
+    def dump(self, path: str):
+        """Writes the recorded timings to a JSON file."""
+        with open(path, "w") as f:
+            json.dump({"bucket_bounds_ms": BUCKET_BOUNDS_MS, "operations": self.get_snapshot()}, f, indent=2)
+
+def timed(name: str):
+    """Decorates a method so its calls are recorded as "<name> (<item name>)" while instrumentation is enabled."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(self, *args, **kwargs):
+            if not instrumentation.enabled:
+                return function(self, *args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(self, *args, **kwargs)
+            finally:
+                instrumentation.record(f"{name} ({self.item_name})", time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+# Shared by the whole application
+instrumentation = Instrumentation(enabled=os.environ.get(PROFILE_ENV_VAR, "") not in ("", "0"))
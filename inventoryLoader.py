@@ -0,0 +1,45 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from baseInventory import Inventory
+
+class InventoryLoader(QObject):
+    """Reads inventories on a pool of worker threads, one task per inventory.
+
+    Reading only parses storage; the results are applied to the inventories
+    on the GUI thread, as each one finishes.
+    """
+    # Emitted on the GUI thread with the inventory's title and its load report
+    inventory_loaded = pyqtSignal(str, object)
+    # Emitted from the worker thread (or the GUI thread if the read already finished), always queued
+    _read_finished = pyqtSignal(str, object)
+
+    def __init__(self, parent=None, max_workers: int | None = None):
+        super().__init__(parent)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inventory-load")
+        self._inventories: dict[str, Inventory] = {}
+        self._read_finished.connect(self._on_read_finished, Qt.ConnectionType.QueuedConnection)
+
+    def load(self, title: str, inventory: Inventory):
+        """Starts loading an inventory, which stays disabled until it is loaded."""
+        # A compaction may still be writing the file about to be read
+        inventory.wait_for_storage()
+        inventory.widget.setEnabled(False)
+        self._inventories[title] = inventory
+        future = self._executor.submit(inventory.store.read_data)
+        future.add_done_callback(lambda future: self._read_finished.emit(title, future))
+
+    def is_loading(self, title: str) -> bool:
+        return title in self._inventories
+
+    def _on_read_finished(self, title: str, future: Future):
+        if future.cancelled():
+            return
+        inventory = self._inventories.pop(title)
+        report = inventory.store.apply_data(*future.result())
+        inventory.update_table()
+        inventory.widget.setEnabled(True)
+        self.inventory_loaded.emit(title, report)
+
+    def shutdown(self):
+        """Drops the loads that have not started, without waiting for the running ones."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,15 +1,32 @@
 import os
 import sys
 from PyQt6.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QMessageBox, QTabWidget
+    QApplication, QWidget, QVBoxLayout, QMessageBox, QTabWidget,
+    QLabel, QProgressBar, QMenuBar, QHBoxLayout, QLineEdit, QComboBox,
+    QFileDialog, QDialog, QTableWidget, QTableWidgetItem, QHeaderView, QInputDialog
 )
+from barcodeScanning import ProductLookup, parse_gs1, read_scan
 from baseInventory import Inventory
+from caseDialog import CaseDialog
+from diagnosticsDialog import DiagnosticsDialog
+from expiringStockDialog import ExpiringStockDialog
+from instrumentation import PROFILE_FILE_ENV_VAR, instrumentation
+from inventoryLoader import InventoryLoader
+from packingList import get_import_changes, read_packing_list
+from packingListDialog import PackingListDialog
+from productCatalog import CATALOG_FILE, get_catalog
 from implants import ImplantInventory
 from healingAbutments import HealingAbutmentInventory
 from coverScrews import CoverScrewInventory
 from temporaryAbutments import TemporaryAbutmentInventory
 from boneGrafts import BoneGraftInventory
 from membranes import MembraneInventory
+from sqliteStorage import InventoryDatabase
+from searchIndex import SearchIndex
+from statusScheduler import StatusScheduler
+from inventoryStore import consume_case, save_stores
+from storage import LoadReport, SaveTransaction
+from exceptions import BarcodeError, InsufficientStockError, ItemNotFoundError, StorageError, UnknownGtinError
 
 THIS_FILE_PATH = os.path.dirname(os.path.abspath(__file__))
 
@@ -19,6 +36,18 @@ COVER_SCREWS_FILE = os.path.join(THIS_FILE_PATH, "Inventory", "cover_screws.csv"
 TEMPORARY_ABUTMENTS_FILE = os.path.join(THIS_FILE_PATH, "Inventory", "temporary_abutments.csv")
 BONE_GRAFTS_FILE = os.path.join(THIS_FILE_PATH, "Inventory", "bone_grafts.csv")
 MEMBRANES_FILE = os.path.join(THIS_FILE_PATH, "Inventory", "membranes.csv")
+# Lists the renames of an in-progress "Save All", so an interrupted save can be completed
+SAVE_MANIFEST_FILE = os.path.join(THIS_FILE_PATH, "Inventory", ".save_manifest.json")
+# "csv" keeps each inventory in its CSV file, "sqlite" keeps them all in DATABASE_FILE,
+# importing the CSV files the first time and rewriting them on every save
+STORAGE_BACKEND = "csv"
+DATABASE_FILE = os.path.join(THIS_FILE_PATH, "Inventory", "inventory.db")
+# Most search hits listed at once
+SEARCH_RESULT_LIMIT = 200
+# Links the GTINs of scanned barcodes to the REFs of catalogued products, written as they are scanned
+GTIN_FILE = os.path.join(THIS_FILE_PATH, "Inventory", "gtins.json")
+# Where recorded timings are written on exit, unless overridden by the environment
+PROFILE_FILE = os.environ.get(PROFILE_FILE_ENV_VAR, os.path.join(THIS_FILE_PATH, "Inventory", "timings.json"))
 IMPLANTS_LOW_QUANTITY = 1
 HEALING_ABUTMENTS_LOW_QUANTITY = 2
 COVER_SCREWS_LOW_QUANTITY = 2
@@ -34,56 +63,313 @@ class InventoryManager(QWidget):
         self.setWindowTitle("Inventory Manager")
         self.setGeometry(200, 200, 1600, 800)
 
+        # Finish any save that was interrupted before loading the files it touched
+        try:
+            SaveTransaction.recover(SAVE_MANIFEST_FILE)
+        except Exception as e:
+            QMessageBox.warning(self, "Recovery Error", f"Failed to complete the last interrupted save: {e}")
+        self.database = InventoryDatabase(DATABASE_FILE) if STORAGE_BACKEND == "sqlite" else None
+        # Scanned GTINs and packing list REFs resolve to the products of the catalog
+        try:
+            self.product_lookup = ProductLookup.from_catalog(get_catalog())
+        except Exception as e:
+            QMessageBox.warning(self, "Product Catalog Error", f"Failed to read {CATALOG_FILE}, Add dialogs will only offer free text and scanning is unavailable: {e}")
+            self.product_lookup = ProductLookup()
+        try:
+            self.product_lookup.load_gtins(GTIN_FILE)
+        except Exception as e:
+            QMessageBox.warning(self, "GTIN Error", f"Failed to read {GTIN_FILE}, scanned GTINs will be asked for again: {e}")
+
         self.inventories: dict[str, Inventory] = {
             "Implants": ImplantInventory(
                 inventory_file=IMPLANTS_FILE,
                 low_quantity=IMPLANTS_LOW_QUANTITY,
                 days_from_expiry=DAYS_FROM_EXPIRY,
-                days_from_expiry_warning=DAYS_FROM_EXPIRY_WARNING
+                days_from_expiry_warning=DAYS_FROM_EXPIRY_WARNING,
+                database=self.database
             ),
             "Healing Abutments": HealingAbutmentInventory(
                 inventory_file=HEALING_ABUTMENTS_FILE,
                 low_quantity=HEALING_ABUTMENTS_LOW_QUANTITY,
                 days_from_expiry=DAYS_FROM_EXPIRY,
-                days_from_expiry_warning=DAYS_FROM_EXPIRY_WARNING
+                days_from_expiry_warning=DAYS_FROM_EXPIRY_WARNING,
+                database=self.database
             ),
             "Cover Screws": CoverScrewInventory(
                 inventory_file=COVER_SCREWS_FILE,
                 low_quantity=COVER_SCREWS_LOW_QUANTITY,
                 days_from_expiry=DAYS_FROM_EXPIRY,
-                days_from_expiry_warning=DAYS_FROM_EXPIRY_WARNING
+                days_from_expiry_warning=DAYS_FROM_EXPIRY_WARNING,
+                database=self.database
             ),
             "Temporary Abutments": TemporaryAbutmentInventory(
                 inventory_file=TEMPORARY_ABUTMENTS_FILE,
                 low_quantity=TEMPORARY_ABUTMENTS_LOW_QUANTITY,
                 days_from_expiry=DAYS_FROM_EXPIRY,
-                days_from_expiry_warning=DAYS_FROM_EXPIRY_WARNING
+                days_from_expiry_warning=DAYS_FROM_EXPIRY_WARNING,
+                database=self.database
             ),
             "Bone Grafts": BoneGraftInventory(
                 inventory_file=BONE_GRAFTS_FILE,
                 low_quantity=BONE_GRAFTS_LOW_QUANTITY,
                 days_from_expiry=DAYS_FROM_EXPIRY,
-                days_from_expiry_warning=DAYS_FROM_EXPIRY_WARNING
+                days_from_expiry_warning=DAYS_FROM_EXPIRY_WARNING,
+                database=self.database
             ),
             "Membranes": MembraneInventory(
                 inventory_file=MEMBRANES_FILE,
                 low_quantity=MEMBRANES_LOW_QUANTITY,
                 days_from_expiry=DAYS_FROM_EXPIRY,
-                days_from_expiry_warning=DAYS_FROM_EXPIRY_WARNING
+                days_from_expiry_warning=DAYS_FROM_EXPIRY_WARNING,
+                database=self.database
             )
         }
 
         layout = QVBoxLayout()
-        tabs = QTabWidget()
+        menu_bar = QMenuBar()
+        tools_menu = menu_bar.addMenu("Tools")
+        tools_menu.addAction("Consume Case...").triggered.connect(self.consume_case)
+        tools_menu.addAction("Import Packing List...").triggered.connect(self.import_packing_list)
+        tools_menu.addAction("Expiring Stock...").triggered.connect(self.show_expiring_stock)
+        tools_menu.addSeparator()
+        self.record_timings_action = tools_menu.addAction("Record Timings")
+        self.record_timings_action.setCheckable(True)
+        self.record_timings_action.setChecked(instrumentation.enabled)
+        self.record_timings_action.toggled.connect(self.set_recording_timings)
+        tools_menu.addAction("Diagnostics...").triggered.connect(self.show_diagnostics)
+        layout.setMenuBar(menu_bar)
+
+        # Barcode scanners type the code and press Enter, so each scan is applied without a dialog
+        scan_layout = QHBoxLayout()
+        self.scan_mode_input = QComboBox()
+        self.scan_mode_input.addItems(["Receive", "Consume"])
+        scan_layout.addWidget(self.scan_mode_input)
+        self.scan_input = QLineEdit()
+        self.scan_input.setPlaceholderText("Scan a GS1 barcode...")
+        self.scan_input.returnPressed.connect(self.on_scan)
+        scan_layout.addWidget(self.scan_input)
+        self.scan_status = QLabel()
+        scan_layout.addWidget(self.scan_status, 1)
+        layout.addLayout(scan_layout)
+
+        # Searches every inventory as you type
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search REF, LOT, SN or description in all inventories...")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.textChanged.connect(self.on_search_changed)
+        layout.addWidget(self.search_input)
+        self.search_status = QLabel()
+        self.search_status.setVisible(False)
+        layout.addWidget(self.search_status)
+        self.search_results = QTableWidget(0, 7)
+        self.search_results.setHorizontalHeaderLabels(["Category", "Item", "REF", "LOT", "SN", "Expiry", "Qty"])
+        self.search_results.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.search_results.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.search_results.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.search_results.setMaximumHeight(250)
+        self.search_results.setVisible(False)
+        self.search_results.cellDoubleClicked.connect(self.on_search_result_activated)
+        layout.addWidget(self.search_results)
+        self._search_hits = []
+
+        self.tabs = QTabWidget()
         for title, inventory in self.inventories.items():
             inventory.save_btn.clicked.disconnect()
             inventory.save_btn.clicked.connect(self.save_all_data)
-            inventory.load_data()
-            tabs.addTab(inventory.widget, title)
-            inventory.update_table()
-        layout.addWidget(tabs)
+            self.tabs.addTab(inventory.widget, title)
+        layout.addWidget(self.tabs)
+        self.load_progress = QProgressBar()
+        self.load_progress.setFormat("Loading inventories... %v/%m")
+        self.load_progress.setVisible(False)
+        layout.addWidget(self.load_progress)
+        # Lists the problems found while loading, instead of a message box per inventory
+        self.load_status = QLabel()
+        self.load_status.setWordWrap(True)
+        self.load_status.setVisible(False)
+        layout.addWidget(self.load_status)
         self.setLayout(layout)
 
+        # Inventories are read in the background, so the window shows up right away
+        self.search_index = SearchIndex({title: inventory.store for title, inventory in self.inventories.items()})
+        self.loader = InventoryLoader(self, max_workers=len(self.inventories))
+        self.loader.inventory_loaded.connect(self.on_inventory_loaded)
+        self.load_data_in_background()
+        # Keeps the expiry statuses current when the app stays open past midnight
+        self.status_scheduler = StatusScheduler([inventory.store for inventory in self.inventories.values()], self)
+        self.status_scheduler.start()
+
+    def load_data_in_background(self):
+        """Reloads every inventory on worker threads, the visible tab first."""
+        self._load_problems: dict[str, str] = {}
+        self.load_status.setVisible(False)
+        current = self.tabs.tabText(self.tabs.currentIndex())
+        titles = sorted(self.inventories, key=lambda title: title != current)
+        titles = [title for title in titles if not self.loader.is_loading(title)]
+        self.load_progress.setRange(0, len(titles))
+        self.load_progress.setValue(0)
+        self.load_progress.setVisible(bool(titles))
+        for title in titles:
+            self.loader.load(title, self.inventories[title])
+
+    def on_inventory_loaded(self, title: str, report: LoadReport):
+        self.load_progress.setValue(self.load_progress.value() + 1)
+        if self.load_progress.value() >= self.load_progress.maximum():
+            self.load_progress.setVisible(False)
+        problem = self.inventories[title].store.get_load_problem(report)
+        if problem is not None:
+            self._load_problems[title] = problem
+            self.load_status.setText("\n".join(
+                f"{title}: {problem}" for title, problem in self._load_problems.items()
+            ))
+            self.load_status.setVisible(True)
+
+    def on_search_changed(self, query: str):
+        """Lists the lots of every inventory matching each word of the query."""
+        if not query.strip():
+            self.search_status.setVisible(False)
+            self.search_results.setVisible(False)
+            self._search_hits = []
+            return
+        self._search_hits, total = self.search_index.search(query, SEARCH_RESULT_LIMIT)
+        if total > len(self._search_hits):
+            self.search_status.setText(f"{total} lots found, showing the first {len(self._search_hits)}. Double-click one to show it.")
+        else:
+            self.search_status.setText(f"{total} lots found. Double-click one to show it.")
+        self.search_results.setRowCount(len(self._search_hits))
+        for row, (title, item) in enumerate(self._search_hits):
+            store = self.inventories[title].store
+            values = [
+                title,
+                " ".join(str(value) for value in store.schema.get_group_key(item)),
+                item.ref,
+                item.lot,
+                getattr(item, "sn", ""),
+                item.expiry,
+                str(item.qty)
+            ]
+            for column, value in enumerate(values):
+                self.search_results.setItem(row, column, QTableWidgetItem(value))
+        self.search_status.setVisible(True)
+        self.search_results.setVisible(True)
+
+    def on_search_result_activated(self, row: int, column: int):
+        """Shows the group of a search hit in its inventory's tab."""
+        title, item = self._search_hits[row]
+        inventory = self.inventories[title]
+        self.tabs.setCurrentWidget(inventory.widget)
+        group_row = inventory.store.get_group_row(inventory.store.schema.get_group_key(item))
+        if group_row is not None:
+            inventory.show_group(group_row)
+
+    def on_scan(self):
+        """Receives or consumes the lot of the scanned barcode, reporting the result next to the scan box."""
+        text = self.scan_input.text()
+        self.scan_input.clear()
+        if not text.strip():
+            return
+        try:
+            try:
+                scan = read_scan(text, self.product_lookup)
+            except UnknownGtinError:
+                if not self._link_scanned_gtin(text):
+                    raise
+                scan = read_scan(text, self.product_lookup)
+            inventory = self.inventories[scan.product.category]
+            if not inventory.store.loaded:
+                raise ItemNotFoundError(f"{scan.product.category} are still loading, scan again in a moment")
+            item = scan.item
+            self.tabs.setCurrentWidget(inventory.widget)
+            if self.scan_mode_input.currentText() == "Receive":
+                # Merges into the matching lot through the store's lot key index
+                left = inventory.store.add_item(item).qty
+                verb = "Received"
+            else:
+                left = inventory.store.remove_lot(item, item.qty)
+                verb = "Consumed"
+        except (BarcodeError, ItemNotFoundError, InsufficientStockError) as e:
+            self.scan_status.setText(f"⚠ {e}")
+            return
+        except StorageError as e:
+            # The scan is applied, only recording it failed
+            QMessageBox.warning(self, "Storage Error", str(e))
+            return
+        self.scan_status.setText(
+            f"{verb} {item.qty} {inventory.item_name} REF {item.ref}, LOT {item.lot}: {left} of this lot in stock"
+        )
+
+    def _link_scanned_gtin(self, text: str) -> bool:
+        """Asks for the REF of a scanned GTIN that is not linked yet and links them, returning whether it did."""
+        gtin = parse_gs1(text)["01"]
+        ref, ok = QInputDialog.getText(self, "Unknown GTIN", f"GTIN {gtin} has not been scanned before.\n\nEnter the REF on its label:")
+        ref = ref.strip()
+        if not ok or not ref:
+            return False
+        products = self.product_lookup.find_refs(ref)
+        if not products:
+            raise ItemNotFoundError(f"REF {ref} is not in the product catalog, add it to {CATALOG_FILE}")
+        if len(products) > 1:
+            titles = [product.category for product in products]
+            title, ok = QInputDialog.getItem(self, "Unknown GTIN", f"REF {ref} is in several categories, which is it?", titles, 0, False)
+            if not ok:
+                return False
+            products = [products[titles.index(title)]]
+        self.product_lookup.link_gtin(gtin, products[0])
+        try:
+            self.product_lookup.save_gtins(GTIN_FILE)
+        except OSError as e:
+            QMessageBox.warning(self, "GTIN Error", f"Failed to save {GTIN_FILE}, GTIN {gtin} is only linked until the app is closed: {e}")
+        return True
+
+    def consume_case(self):
+        """Removes everything a case uses from its inventories in one transaction."""
+        stores = {title: inventory.store for title, inventory in self.inventories.items()}
+        dialog = CaseDialog(stores, self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        try:
+            picks = consume_case(stores, dialog.get_lines(), dialog.get_skip_expired())
+        except InsufficientStockError as e:
+            # Stock changed since the case was confirmed
+            QMessageBox.warning(self, "Insufficient Stock", f"The case cannot be consumed, nothing was removed.\n\n{e}")
+            return
+        except StorageError as e:
+            # The case is consumed, only recording it failed
+            QMessageBox.warning(self, "Storage Error", str(e))
+            return
+        QMessageBox.information(self, "Success", f"Case consumed from {sum(len(lots) for lots in picks.values())} lots.")
+
+    def import_packing_list(self):
+        """Adds the items of a supplier's packing list to their inventories, after previewing the changes."""
+        packing_list_file, _ = QFileDialog.getOpenFileName(
+            self, "Import Packing List", "", "Packing lists (*.csv *.tsv *.txt);;All files (*)"
+        )
+        if not packing_list_file:
+            return
+        try:
+            packing_list = read_packing_list(packing_list_file, self.product_lookup)
+        except Exception as e:
+            QMessageBox.warning(self, "Import Error", f"Failed to read {packing_list_file}: {e}")
+            return
+        loading = [title for title in packing_list.items if not self.inventories[title].store.loaded]
+        if loading:
+            QMessageBox.warning(self, "Import Error", f"{', '.join(loading)} are still loading, try again in a moment.")
+            return
+        stores = {title: inventory.store for title, inventory in self.inventories.items()}
+        dialog = PackingListDialog(packing_list, get_import_changes(stores, packing_list), self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        failed = []
+        for title, items in packing_list.items.items():
+            # Each inventory's table is reset once, rather than updated per item
+            try:
+                stores[title].add_items(items)
+            except StorageError as e:
+                failed.append(str(e))
+        if failed:
+            QMessageBox.warning(self, "Storage Error", "\n".join(failed))
+            return
+        QMessageBox.information(self, "Imported", f"{packing_list.item_count} rows imported successfully.")
+
     def closeEvent(self, event):
         reply = QMessageBox.question(
             self,
@@ -91,23 +377,61 @@ class InventoryManager(QWidget):
             "Do you want to save the inventory to file before exiting?",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No | QMessageBox.StandardButton.Cancel
         )
+        if reply == QMessageBox.StandardButton.Cancel:
+            event.ignore()
+            return
         if reply == QMessageBox.StandardButton.Yes:
             self.save_all_data()
-            event.accept()
-        elif reply == QMessageBox.StandardButton.No:
-            event.accept()
-        else:
-            event.ignore()
+        self.loader.shutdown()
+        self.status_scheduler.stop()
+        # Unsaved changes are already recorded in storage (e.g. the journals) and kept for the next start
+        for inventory in self.inventories.values():
+            inventory.wait_for_storage()
+            inventory.store.storage.close()
+        if self.database is not None:
+            self.database.close()
+        self.dump_timings()
+        event.accept()
+
+    def set_recording_timings(self, enabled: bool):
+        instrumentation.enabled = enabled
+
+    def show_expiring_stock(self):
+        dialog = ExpiringStockDialog(
+            {title: inventory.store for title, inventory in self.inventories.items()},
+            days_from_expiry=DAYS_FROM_EXPIRY,
+            parent=self
+        )
+        dialog.exec()
+
+    def show_diagnostics(self):
+        dialog = DiagnosticsDialog(instrumentation, self)
+        dialog.exec()
+
+    def dump_timings(self):
+        """Writes the recorded timings to PROFILE_FILE, if any were recorded."""
+        if not instrumentation.get_snapshot():
+            return
+        try:
+            instrumentation.dump(PROFILE_FILE)
+        except OSError as e:
+            print(f"Failed to write timings to {PROFILE_FILE}: {e}", file=sys.stderr)
 
     def save_all_data(self):
-        """Save all three product files."""
+        """Save every changed inventory, replacing all of their files or none of them."""
         for inventory in self.inventories.values():
-            inventory.save_data(showMessageBox=False)
+            inventory.wait_for_storage()
+        try:
+            with instrumentation.measure("save_all_data"):
+                save_stores([inventory.store for inventory in self.inventories.values()], SAVE_MANIFEST_FILE)
+        except Exception as e:
+            QMessageBox.warning(self, "Save Error", f"Failed to save inventories: {e}")
+            return
         QMessageBox.information(self, "Saved", "All inventories saved successfully.")
 
-    def load_data(self):
-        for inventory in self.inventories.values():
-            inventory.load_data()
+    def load_data(self) -> dict[str, LoadReport]:
+        """Reloads every inventory from file, returning the load report of each."""
+        return {title: inventory.load_data() for title, inventory in self.inventories.items()}
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
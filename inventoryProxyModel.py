@@ -0,0 +1,222 @@
+from PyQt6.QtCore import QAbstractProxyModel, QModelIndex, QObject, Qt
+from inventoryTableModel import InventoryTableModel
+
+class InventoryProxyModel(QAbstractProxyModel):
+    """Filters and sorts the rows of an InventoryTableModel without rebuilding it.
+
+    Keeps the list of source rows shown, in display order. Sorting and
+    filtering re-order that list using the source model's cached sort keys,
+    and a single group change moves or hides only that group's row, so both
+    stay interactive at tens of thousands of groups.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Source row of each shown row, and the shown row of each source row (-1 if filtered out)
+        self._rows: list[int] = []
+        self._positions: list[int] | None = None
+        self._sort_column = -1
+        self._sort_order = Qt.SortOrder.AscendingOrder
+        # Column -> lower case text its cells must contain
+        self._filters: dict[int, str] = {}
+
+    def setSourceModel(self, model: InventoryTableModel):
+        self.beginResetModel()
+        super().setSourceModel(model)
+        model.modelAboutToBeReset.connect(self.beginResetModel)
+        model.modelReset.connect(self._on_source_reset)
+        model.rowsInserted.connect(self._on_rows_inserted)
+        model.rowsAboutToBeRemoved.connect(self._on_rows_about_to_be_removed)
+        model.rowsRemoved.connect(self._on_rows_removed)
+        model.dataChanged.connect(self._on_data_changed)
+        self._update_rows()
+        self.endResetModel()
+
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not (0 <= row < len(self._rows)) or not (0 <= column < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=None):
+        # Without an index this is QObject.parent
+        if index is None:
+            return QObject.parent(self)
+        return QModelIndex()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() or self.sourceModel() is None else self.sourceModel().columnCount()
+
+    def hasChildren(self, parent=QModelIndex()):
+        return not parent.isValid() and bool(self._rows)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Vertical:
+            return str(section + 1) if role == Qt.ItemDataRole.DisplayRole else None
+        return self.sourceModel().headerData(section, orientation, role)
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid():
+            return QModelIndex()
+        return self.sourceModel().index(self._rows[proxy_index.row()], proxy_index.column())
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        position = self._get_positions()[source_index.row()]
+        return self.index(position, source_index.column()) if position >= 0 else QModelIndex()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """Sorts by a column, or back to the source (attribute) order for column -1."""
+        self._sort_column = column
+        self._sort_order = order
+        self._relayout()
+
+    def set_filter(self, column: int, text: str):
+        """Shows only the rows whose cell in a column contains the text, ignoring case; an empty text clears the filter."""
+        text = text.strip().lower()
+        if self._filters.get(column, "") == text:
+            return
+        if text:
+            self._filters[column] = text
+        else:
+            self._filters.pop(column, None)
+        self._relayout()
+
+    def _get_positions(self) -> list[int]:
+        if self._positions is None:
+            positions = [-1] * self.sourceModel().rowCount()
+            for position, row in enumerate(self._rows):
+                positions[row] = position
+            self._positions = positions
+        return self._positions
+
+    def _accepts(self, row: int) -> bool:
+        model = self.sourceModel()
+        return all(text in model.get_text(row, column).lower() for column, text in self._filters.items())
+
+    def _comes_before(self, row: int, other_row: int) -> bool:
+        # Ties, and every row when unsorted, keep the source order
+        if self._sort_column < 0:
+            return row < other_row
+        model = self.sourceModel()
+        key = model.get_sort_key(row, self._sort_column)
+        other_key = model.get_sort_key(other_row, self._sort_column)
+        if key == other_key:
+            return row < other_row
+        if self._sort_order == Qt.SortOrder.DescendingOrder:
+            return key > other_key
+        return key < other_key
+
+    def _find_position(self, row: int) -> int:
+        # Binary search for where a source row belongs among the shown rows
+        low, high = 0, len(self._rows)
+        while low < high:
+            middle = (low + high) // 2
+            if self._comes_before(self._rows[middle], row):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _update_rows(self):
+        model = self.sourceModel()
+        rows = list(range(model.rowCount()))
+        # Whole columns at a time, which is much faster than a call per cell
+        for column, text in self._filters.items():
+            texts = model.get_texts(column)
+            rows = [row for row in rows if text in texts[row].lower()]
+        if self._sort_column >= 0:
+            # The sort is stable, so ties keep the source order in both directions
+            keys = model.get_sort_keys(self._sort_column)
+            rows.sort(key=keys.__getitem__, reverse=self._sort_order == Qt.SortOrder.DescendingOrder)
+        self._rows = rows
+        self._positions = None
+
+    def _relayout(self):
+        # Re-filters and re-sorts every row, keeping the selection on the same groups
+        self.layoutAboutToBeChanged.emit()
+        old_indexes = self.persistentIndexList()
+        old_rows = [self._rows[index.row()] for index in old_indexes]
+        self._update_rows()
+        positions = self._get_positions()
+        new_indexes = [
+            self.index(positions[row], index.column()) if positions[row] >= 0 else QModelIndex()
+            for row, index in zip(old_rows, old_indexes)
+        ]
+        self.changePersistentIndexList(old_indexes, new_indexes)
+        self.layoutChanged.emit()
+
+    def _insert_row(self, row: int):
+        position = self._find_position(row)
+        self.beginInsertRows(QModelIndex(), position, position)
+        self._rows.insert(position, row)
+        self._positions = None
+        self.endInsertRows()
+
+    def _remove_row(self, position: int):
+        self.beginRemoveRows(QModelIndex(), position, position)
+        del self._rows[position]
+        self._positions = None
+        self.endRemoveRows()
+
+    def _on_source_reset(self):
+        self._update_rows()
+        self.endResetModel()
+
+    def _on_rows_inserted(self, parent, first, last):
+        count = last - first + 1
+        self._rows = [row + count if row >= first else row for row in self._rows]
+        self._positions = None
+        for row in range(first, last + 1):
+            if self._accepts(row):
+                self._insert_row(row)
+
+    def _on_rows_about_to_be_removed(self, parent, first, last):
+        for row in range(last, first - 1, -1):
+            position = self._get_positions()[row]
+            if position >= 0:
+                self._remove_row(position)
+
+    def _on_rows_removed(self, parent, first, last):
+        count = last - first + 1
+        self._rows = [row - count if row > last else row for row in self._rows]
+        self._positions = None
+
+    def _on_data_changed(self, top_left, bottom_right, roles=()):
+        first, last = top_left.row(), bottom_right.row()
+        columns = range(top_left.column(), bottom_right.column() + 1)
+        if self._sort_column in columns or any(column in columns for column in self._filters):
+            if first != last:
+                self._relayout()
+            else:
+                self._place_row(first)
+        if first == last:
+            position = self._get_positions()[first]
+            if position >= 0:
+                self.dataChanged.emit(self.index(position, columns[0]), self.index(position, columns[-1]), roles)
+        elif self._rows:
+            self.dataChanged.emit(self.index(0, columns[0]), self.index(len(self._rows) - 1, columns[-1]), roles)
+
+    def _place_row(self, row: int):
+        # Shows, hides or moves a single changed row
+        position = self._get_positions()[row]
+        if position < 0:
+            if self._accepts(row):
+                self._insert_row(row)
+            return
+        if not self._accepts(row):
+            self._remove_row(position)
+            return
+        del self._rows[position]
+        new_position = self._find_position(row)
+        self._rows.insert(position, row)
+        if new_position == position:
+            return
+        # Moving (rather than removing and inserting) keeps the row selected
+        self.beginMoveRows(QModelIndex(), position, position, QModelIndex(), new_position if new_position < position else new_position + 1)
+        del self._rows[position]
+        self._rows.insert(new_position, row)
+        self._positions = None
+        self.endMoveRows()
@@ -0,0 +1,723 @@
+import bisect
+import heapq
+from datetime import date
+from itertools import islice
+from baseItem import EditItem, Item, RemovalItem
+from exceptions import InsufficientStockError, ItemNotFoundError, StorageError
+from expiryIndex import ExpiryIndex
+from instrumentation import timed
+from itemSchema import ItemSchema
+from sqliteStorage import InventoryDatabase, SqliteStorage
+from storage import CsvStorage, InventoryStorage, LoadReport, SaveTransaction, replace_file
+
+class StoreListener:
+    """Receives the changes of an InventoryStore's groups, e.g. to keep a table in step.
+
+    Rows are the positions of groups in display order.
+    """
+    def begin_reset(self):
+        pass
+
+    def end_reset(self):
+        pass
+
+    def begin_insert_group(self, row: int):
+        pass
+
+    def end_insert_group(self):
+        pass
+
+    def begin_remove_group(self, row: int):
+        pass
+
+    def end_remove_group(self):
+        pass
+
+    def group_changed(self, row: int):
+        pass
+
+class LotListener:
+    """Receives the lots added to and removed from InventoryStores, e.g. to keep a search index in step.
+
+    Edits arrive as a removal of the old lot and an addition of the new one.
+    Loads are not reported lot by lot; lots_reset is called once they finish.
+    """
+    def lot_added(self, store: "InventoryStore", key: tuple, item: Item):
+        pass
+
+    def lot_removed(self, store: "InventoryStore", key: tuple, item: Item):
+        pass
+
+    def lots_reset(self, store: "InventoryStore"):
+        pass
+
+class InventoryStore:
+    """The lots of one category of items, grouped for display, without any GUI.
+
+    Keeps the condensed groups up to date as lots change, evaluates their
+    status and persists every change through an InventoryStorage. Scripts
+    and benchmarks can use it directly; Inventory wraps it in widgets.
+    """
+    def __init__(
+            self,
+            inventory_file: str,
+            ItemClass: type[Item],
+            header_labels: list[str],
+            attributes: list[str],
+            item_name: str="Item",
+            low_quantity: int=2,
+            days_from_expiry: int=180,
+            days_from_expiry_warning: int=60,
+            database: InventoryDatabase | None=None
+        ):
+        self.inventory_file = inventory_file
+        self.ItemClass = ItemClass
+        self.header_labels = header_labels
+        self.attributes = attributes
+        self.item_name = item_name.lower()
+        self.low_quantity = low_quantity
+        self.days_from_expiry = days_from_expiry
+        self.days_from_expiry_warning = days_from_expiry_warning
+
+        # Lots keyed on (attributes..., ref, lot, expiry), kept in insertion order
+        self.inventory: dict[tuple, Item] = {}
+        self.schema = ItemSchema(ItemClass.fields, header_labels, attributes)
+        # Condensed table rows, maintained in place as lots change
+        self._groups: dict[tuple, dict] = {}
+        self._group_lots: dict[tuple, dict[tuple, Item]] = {}
+        self._group_order: list[tuple] = []
+        # Lot keys by expiry, only sorted when first queried so loading does not pay for it
+        self._expiry_index = ExpiryIndex()
+        self._expiry_index_built = True
+        # Group keys by most recent expiry, to find the groups whose status changes with the
+        # date. It and the groups' cached statuses are rebuilt once after a load instead of per lot
+        self.group_expiry_index = ExpiryIndex()
+        self._indexing = True
+        # Min-heaps of (expiry, lot key) per group for first-expiry-first-out picking, built
+        # on a group's first pick. Removed lots are left in them and skipped when popped
+        self._fefo_heaps: dict[tuple, list[tuple[int, tuple]]] = {}
+        # The date (as an ordinal) the cached statuses were evaluated for
+        self.today = date.today().toordinal()
+        # Whether the inventory has changed since it was last loaded or saved
+        self.dirty = False
+        # Whether the lots have been loaded from storage yet
+        self.loaded = False
+        # Every change is recorded as it is made, so it survives a crash or an unsaved exit
+        if database is not None:
+            self.storage: InventoryStorage = SqliteStorage(database, inventory_file, self.schema, ItemClass)
+        else:
+            self.storage = CsvStorage(inventory_file, self.schema, ItemClass)
+        self._recording = True
+        self._storage_error: Exception | None = None
+        self.listener = StoreListener()
+        self.lot_listeners: list[LotListener] = []
+
+    @timed("_get_sorted_condensed_inventory")
+    def _get_sorted_condensed_inventory(self) -> list[dict]:
+        """Returns the groups of items, sorted by their attributes."""
+        return [self._groups[group_key] for group_key in self._group_order]
+
+    def get_group_count(self) -> int:
+        """Returns the number of groups (table rows) in the inventory."""
+        return len(self._group_order)
+
+    def get_group(self, row: int) -> dict:
+        """Returns the group shown in a row of the table."""
+        return self._groups[self._group_order[row]]
+
+    def _insert_item(self, item: Item) -> Item:
+        """Adds an item to the inventory, merging its qty into the matching lot if present."""
+        key = self.schema.get_lot_key(item)
+        existing_item = self.inventory.get(key)
+        if existing_item is not None:
+            self._adjust_qty(existing_item, item.qty)
+            return existing_item
+        self.inventory[key] = item
+        self._record_change("set", item)
+        if self._expiry_index_built:
+            self._expiry_index.add(item.expiry_ordinal, key)
+        if self._indexing:
+            for lot_listener in self.lot_listeners:
+                lot_listener.lot_added(self, key, item)
+
+        group_key = self.schema.get_group_key(item)
+        lots = self._group_lots.get(group_key)
+        if lots is None:
+            group = dict(zip(self.attributes, self.schema.get_attributes(item)))
+            group["total_qty"] = item.qty
+            group["most_recent_expiry"] = item.expiry_ordinal
+            group["most_recent_expiry_qty"] = item.qty
+            self._groups[group_key] = group
+            if self._indexing:
+                self.group_expiry_index.add(item.expiry_ordinal, group_key)
+                self._update_status(group)
+            self._group_lots[group_key] = {key: item}
+            # Group keys are the leading attributes, so this is also the display order
+            row = bisect.bisect_left(self._group_order, group_key)
+            self.listener.begin_insert_group(row)
+            self._group_order.insert(row, group_key)
+            self.listener.end_insert_group()
+            return item
+        lots[key] = item
+        heap = self._fefo_heaps.get(group_key)
+        if heap is not None:
+            heapq.heappush(heap, (item.expiry_ordinal, key))
+
+        group = self._groups[group_key]
+        group["total_qty"] += item.qty
+        if item.expiry_ordinal > group["most_recent_expiry"]:
+            self._set_most_recent_expiry(group_key, group, item.expiry_ordinal)
+            group["most_recent_expiry_qty"] = item.qty
+        elif item.expiry_ordinal == group["most_recent_expiry"]:
+            group["most_recent_expiry_qty"] += item.qty
+        if self._indexing:
+            self._update_status(group)
+        self.listener.group_changed(bisect.bisect_left(self._group_order, group_key))
+        return item
+
+    def _pop_item(self, item: Item) -> Item | None:
+        """Removes the lot matching the item from the inventory and returns it."""
+        key = self.schema.get_lot_key(item)
+        item = self.inventory.pop(key, None)
+        if item is None:
+            return None
+        self._record_change("del", item)
+        if self._expiry_index_built:
+            self._expiry_index.remove(item.expiry_ordinal, key)
+        if self._indexing:
+            for lot_listener in self.lot_listeners:
+                lot_listener.lot_removed(self, key, item)
+
+        group_key = self.schema.get_group_key(item)
+        lots = self._group_lots[group_key]
+        del lots[key]
+        row = bisect.bisect_left(self._group_order, group_key)
+        if not lots:
+            self.listener.begin_remove_group(row)
+            if self._indexing:
+                self.group_expiry_index.remove(self._groups[group_key]["most_recent_expiry"], group_key)
+            del self._groups[group_key]
+            del self._group_lots[group_key]
+            self._fefo_heaps.pop(group_key, None)
+            del self._group_order[row]
+            self.listener.end_remove_group()
+            return item
+
+        group = self._groups[group_key]
+        group["total_qty"] -= item.qty
+        if item.expiry_ordinal == group["most_recent_expiry"]:
+            # Only a lot at the most recent expiry can move it, so rescan just this group
+            most_recent_expiry = max(lot.expiry_ordinal for lot in lots.values())
+            self._set_most_recent_expiry(group_key, group, most_recent_expiry)
+            group["most_recent_expiry_qty"] = sum(
+                lot.qty for lot in lots.values() if lot.expiry_ordinal == most_recent_expiry
+            )
+        if self._indexing:
+            self._update_status(group)
+        self.listener.group_changed(row)
+        return item
+
+    def _adjust_qty(self, item: Item, qty: int):
+        """Changes the qty of a lot already in the inventory."""
+        item.qty += qty
+        self._record_change("set", item)
+        group_key = self.schema.get_group_key(item)
+        group = self._groups[group_key]
+        group["total_qty"] += qty
+        if item.expiry_ordinal == group["most_recent_expiry"]:
+            group["most_recent_expiry_qty"] += qty
+        if self._indexing:
+            self._update_status(group)
+        self.listener.group_changed(bisect.bisect_left(self._group_order, group_key))
+
+    def _set_most_recent_expiry(self, group_key: tuple, group: dict, expiry: int):
+        # Keeps the group's entry in the group expiry index in step
+        if self._indexing and expiry != group["most_recent_expiry"]:
+            self.group_expiry_index.remove(group["most_recent_expiry"], group_key)
+            self.group_expiry_index.add(expiry, group_key)
+        group["most_recent_expiry"] = expiry
+
+    def _update_status(self, group: dict) -> bool:
+        """Re-evaluates the cached status of a group for self.today, returning whether it changed."""
+        status = self.get_status(group, self.today)
+        if group.get("status") == status:
+            return False
+        group["status"] = status
+        return True
+
+    def update_today(self, today: int) -> int:
+        """Re-evaluates the cached statuses for a new date, repainting only the groups that changed.
+
+        Returns the number of groups whose status changed. Moving forward, a
+        group can only change if its most recent expiry crossed one of the
+        expiry thresholds, which the group expiry index finds directly.
+        """
+        if today == self.today:
+            return 0
+        previous = self.today
+        self.today = today
+        if today < previous:
+            # The clock was set back, so re-evaluate everything
+            group_keys = self._group_order
+        else:
+            group_keys = set()
+            for days_left in (0, self.days_from_expiry, self.days_from_expiry + self.days_from_expiry_warning):
+                # Groups with expiry - days_left in (previous, today] crossed this threshold
+                group_keys.update(self.group_expiry_index.iter_keys(previous + days_left + 1, today + days_left))
+        changed = 0
+        for group_key in group_keys:
+            if self._update_status(self._groups[group_key]):
+                changed += 1
+                self.listener.group_changed(bisect.bisect_left(self._group_order, group_key))
+        return changed
+
+    def _record_change(self, op: str, item: Item):
+        """Marks the inventory as changed and records the new state of the lot in storage."""
+        self.dirty = True
+        if not self._recording:
+            return
+        try:
+            self.storage.record(op, item)
+        except Exception as e:
+            # Raised once the whole action is applied, see commit_changes
+            self._storage_error = e
+
+    def commit_changes(self):
+        """Makes the changes of the last action durable, raising StorageError if they could not be recorded."""
+        try:
+            if self._storage_error is not None:
+                raise self._storage_error
+            if self.storage.commit(self.inventory.values()):
+                self.dirty = False
+        except Exception as e:
+            raise StorageError(f"Failed to record {self.item_name} changes, save them before exiting: {e}") from e
+        finally:
+            self._storage_error = None
+
+    def wait_for_storage(self):
+        """Blocks until background storage work (e.g. a compaction) is done, raising StorageError if it failed."""
+        try:
+            self.storage.wait()
+        except Exception as e:
+            # Changes that did not reach the inventory file are still replayed on load
+            self.dirty = True
+            raise StorageError(f"Failed to write the {self.item_name} inventory file, its changes are kept in the journal: {e}") from e
+
+    def _replay_changes(self, report: LoadReport, changes: list[tuple[str, Item]]):
+        """Applies the stored changes not yet in the loaded lots, e.g. journal entries."""
+        for op, item in changes:
+            existing_item = self.inventory.get(self.schema.get_lot_key(item))
+            if op == "del":
+                if existing_item is not None:
+                    self._pop_item(existing_item)
+            elif existing_item is None:
+                self._insert_item(item)
+            else:
+                self._adjust_qty(existing_item, item.qty - existing_item.qty)
+            report.replayed += 1
+
+    def _clear_items(self):
+        """Removes every lot from the inventory."""
+        self.inventory = {}
+        self._groups = {}
+        self._group_lots = {}
+        self._group_order = []
+        self._fefo_heaps = {}
+        self._expiry_index = ExpiryIndex()
+        self._expiry_index_built = False
+        self.group_expiry_index = ExpiryIndex()
+
+    def _rebuild_indexes(self):
+        """Rebuilds the group expiry index and cached statuses after loading, and turns on keeping them up to date."""
+        self.group_expiry_index.rebuild(
+            (group["most_recent_expiry"], group_key) for group_key, group in self._groups.items()
+        )
+        self.today = date.today().toordinal()
+        for group in self._groups.values():
+            self._update_status(group)
+        self._indexing = True
+        for lot_listener in self.lot_listeners:
+            lot_listener.lots_reset(self)
+
+    def get_group_key(self, row: int) -> tuple:
+        """Returns the key of the group shown in a row of the table, which stays valid as rows shift."""
+        return self._group_order[row]
+
+    def get_group_row(self, group_key: tuple) -> int | None:
+        """Returns the row of the table showing a group, or None if the group is gone."""
+        row = bisect.bisect_left(self._group_order, group_key)
+        if row < len(self._group_order) and self._group_order[row] == group_key:
+            return row
+        return None
+
+    def get_group_lots(self, row: int) -> list[Item]:
+        """Returns the lots of the group shown in a row of the table."""
+        return list(self._group_lots[self._group_order[row]].values())
+
+    def add_item(self, item: Item) -> Item:
+        """Adds an item, merging its qty into the matching lot if present, and commits the change."""
+        item = self._insert_item(item)
+        self.commit_changes()
+        return item
+
+    def add_items(self, items: list[Item]):
+        """Adds many items, e.g. an imported packing list, merging them into matching lots, and commits them once.
+
+        The listener sees a single reset instead of a change per item.
+        """
+        self.listener.begin_reset()
+        try:
+            for item in items:
+                self._insert_item(item)
+        finally:
+            self.listener.end_reset()
+        self.commit_changes()
+
+    def edit_items(self, lots: list[Item], edits: list[tuple[EditItem, Item]]) -> int:
+        """Applies (original, new) edits to lots of a group, commits them and returns how many were applied."""
+        applied = 0
+        # Take every lot whose key changes out of the inventory first, so that an
+        # edit onto another edited lot's key cannot merge into stale values
+        popped = []
+        for original, new in edits:
+            inv_item = self.inventory.get(self.schema.get_lot_key(lots[original.inventory_index]))
+            if inv_item is None:
+                continue
+            if self.schema.get_lot_key(new) == self.schema.get_lot_key(inv_item):
+                # Only the qty changes, which repaints the group's row and keeps it selected
+                self._adjust_qty(inv_item, new.qty - inv_item.qty)
+                applied += 1
+            else:
+                self._pop_item(inv_item)
+                popped.append((inv_item, new))
+
+        for inv_item, new in popped:
+            # Apply edits, merging into an existing lot if the key now matches one
+            for attr in self.attributes:
+                setattr(inv_item, attr, getattr(new, attr))
+            inv_item.ref = new.ref
+            inv_item.lot = new.lot
+            inv_item.expiry_ordinal = new.expiry_ordinal
+            inv_item.qty = new.qty
+            self._insert_item(inv_item)
+            applied += 1
+        self.commit_changes()
+        return applied
+
+    def remove_items(self, lots: list[Item], removals: list[RemovalItem]):
+        """Takes the removal qtys out of lots of a group, dropping emptied lots, and commits the change."""
+        for removal in removals:
+            remove_qty = removal.remove_qty
+
+            inv_item = self.inventory.get(self.schema.get_lot_key(lots[removal.inventory_index]))
+            if inv_item is None:
+                continue  # Should not happen
+            if inv_item.qty > remove_qty:
+                self._adjust_qty(inv_item, -remove_qty)
+            else:
+                self._pop_item(inv_item)
+        self.commit_changes()
+
+    def remove_lot(self, item: Item, qty: int) -> int:
+        """Takes qty from the lot matching the item, e.g. a scanned one, commits the change and returns the qty left in the lot.
+
+        Raises ItemNotFoundError if there is no such lot and InsufficientStockError if it holds less than qty.
+        """
+        inv_item = self.inventory.get(self.schema.get_lot_key(item))
+        if inv_item is None:
+            raise ItemNotFoundError(f"No {self.item_name} with REF {item.ref}, LOT {item.lot} and expiry {item.expiry} in stock.")
+        if inv_item.qty < qty:
+            raise InsufficientStockError(f"Only {inv_item.qty} of LOT {item.lot} in stock, {qty} needed.")
+        if inv_item.qty > qty:
+            self._adjust_qty(inv_item, -qty)
+            left = inv_item.qty
+        else:
+            self._pop_item(inv_item)
+            left = 0
+        self.commit_changes()
+        return left
+
+    def _get_fefo_heap(self, group_key: tuple) -> list[tuple[int, tuple]]:
+        # Builds the group's heap, or rebuilds it once removed lots make up most of it
+        lots = self._group_lots[group_key]
+        heap = self._fefo_heaps.get(group_key)
+        if heap is None or len(heap) > 2 * len(lots) + 8:
+            heap = [(lot.expiry_ordinal, key) for key, lot in lots.items()]
+            heapq.heapify(heap)
+            self._fefo_heaps[group_key] = heap
+        return heap
+
+    def pick_fefo(self, group_key: tuple, qty: int, expiring_after: int | None = None) -> list[tuple[Item, int]]:
+        """Returns (lot, qty to take) pairs covering qty from a group, earliest expiry first, without removing them.
+
+        Lots expiring on or before the expiring_after ordinal, e.g. today's
+        to leave expired lots alone, are skipped. Raises InsufficientStockError
+        if the group holds less than qty in the lots that can be picked.
+        """
+        lots = self._group_lots.get(group_key)
+        in_stock = self._groups[group_key]["total_qty"] if lots is not None else 0
+        if in_stock < qty:
+            raise InsufficientStockError(f"Only {in_stock} {self.item_name}s in stock, {qty} needed.")
+        heap = self._get_fefo_heap(group_key) if qty > 0 else []
+        picks = []
+        popped = []
+        popped_keys = set()
+        remaining = qty
+        # Only the lots picked or skipped are popped, and put back afterwards
+        while remaining > 0 and heap:
+            entry = heapq.heappop(heap)
+            key = entry[1]
+            # Skip lots removed since the heap was built, and second entries of re-added ones
+            if key not in lots or key in popped_keys:
+                continue
+            popped.append(entry)
+            popped_keys.add(key)
+            item = lots[key]
+            if expiring_after is not None and item.expiry_ordinal <= expiring_after:
+                continue
+            take = min(item.qty, remaining)
+            picks.append((item, take))
+            remaining -= take
+        for entry in popped:
+            heapq.heappush(heap, entry)
+        if remaining > 0:
+            raise InsufficientStockError(f"Only {qty - remaining} unexpired {self.item_name}s in stock, {qty} needed.")
+        return picks
+
+    def remove_fefo(self, group_key: tuple, qty: int) -> list[tuple[Item, int]]:
+        """Takes qty from a group, earliest expiry first, commits the change and returns what was taken from which lot."""
+        picks = self.pick_fefo(group_key, qty)
+        self._take_picks(picks)
+        self.commit_changes()
+        return picks
+
+    def _take_picks(self, picks: list[tuple[Item, int]]):
+        # Takes picked qtys out of their lots, dropping emptied lots, without committing
+        for item, take in picks:
+            if item.qty > take:
+                self._adjust_qty(item, -take)
+            else:
+                self._pop_item(item)
+
+    def load(self) -> LoadReport:
+        """Replaces the inventory with the lots in storage and returns a load report."""
+        self.wait_for_storage()
+        return self.apply_data(*self.read_data())
+
+    @timed("read_data")
+    def read_data(self) -> tuple[LoadReport, list[list[Item]], list[tuple[str, Item]]]:
+        """Reads the stored lots and changes without touching the table, so it can run on a worker thread."""
+        report = LoadReport(self.inventory_file)
+        batches = []
+        changes = []
+        try:
+            try:
+                batches = list(self.storage.load(report))
+            except FileNotFoundError as e:
+                # The journal may still hold lots added before the first save
+                report.error = e
+            changes = list(self.storage.read_changes())
+        except Exception as e:
+            batches = []
+            changes = []
+            report.error = e
+        return report, batches, changes
+
+    @timed("apply_data")
+    def apply_data(self, report: LoadReport, batches: list[list[Item]], changes: list[tuple[str, Item]]) -> LoadReport:
+        """Replaces the inventory with lots read by read_data and returns the load report."""
+        self.listener.begin_reset()
+        self._recording = False
+        self._indexing = False
+        try:
+            self._clear_items()
+            for batch in batches:
+                for item in batch:
+                    # Rows of a lot that is already loaded are merged into it
+                    if self._insert_item(item) is not item:
+                        report.merged += 1
+            self._replay_changes(report, changes)
+        except Exception as e:
+            self._clear_items()
+            report.replayed = 0
+            report.error = e
+        finally:
+            # Replayed changes are not in the inventory file yet
+            self.dirty = report.replayed > 0
+            self._recording = True
+            self._rebuild_indexes()
+            self.loaded = True
+            self.listener.end_reset()
+        return report
+
+    def get_load_problem(self, report: LoadReport) -> str | None:
+        """Describes what went wrong loading the inventory, if anything."""
+        if isinstance(report.error, FileNotFoundError):
+            if not report.replayed:
+                return f"No existing {self.item_name} inventory file found. A new one will be created upon saving."
+        elif report.error is not None:
+            return f"Failed to load {self.item_name}s: {report.error}"
+        elif report.rejected:
+            return self._format_rejected_rows(report)
+        return None
+
+    def _format_rejected_rows(self, report: LoadReport, max_rows: int = 10) -> str:
+        # Lists the first rejected rows of a load report for display
+        lines = [f"Skipped {len(report.rejected)} invalid rows in {report.inventory_file}:"]
+        for line_number, reason in report.rejected[:max_rows]:
+            lines.append(f"  Line {line_number}: {reason}")
+        if len(report.rejected) > max_rows:
+            lines.append(f"  ...and {len(report.rejected) - max_rows} more")
+        return "\n".join(lines)
+
+    def save(self):
+        """Writes the whole inventory to storage, replacing its file atomically so a failed write cannot truncate it."""
+        self.wait_for_storage()
+        temp_file = self.write_temp_file()
+        if temp_file is not None:
+            replace_file(temp_file, self.inventory_file)
+        self.storage.saved()
+        self.dirty = False
+
+    def write_temp_file(self) -> str | None:
+        """Writes the inventory to a temporary file next to its file and returns its path, or None if the storage saved it directly."""
+        return self.storage.write_temp_file(self.inventory.values())
+
+    @property
+    def expiry_index(self) -> ExpiryIndex:
+        """The lot keys sorted by expiry, built on first use and then kept up to date."""
+        if not self._expiry_index_built:
+            self._expiry_index.rebuild((key[-1], key) for key in self.inventory)
+            self._expiry_index_built = True
+        return self._expiry_index
+
+    def get_lots_expiring_between(self, first: int | None = None, last: int | None = None) -> list[Item]:
+        """Returns the lots expiring from day ordinal first to last (both inclusive, None for unbounded), soonest first."""
+        return [self.inventory[key] for key in self.expiry_index.iter_keys(first, last)]
+
+    def get_expired_lots(self, today: int) -> list[Item]:
+        """Returns the lots that have expired by today's date as an ordinal, soonest first."""
+        # Matches get_status, where a lot expiring today counts as expired
+        return self.get_lots_expiring_between(last=today)
+
+    def get_next_expiring_lots(self, count: int, today: int) -> list[Item]:
+        """Returns the count lots that expire next after today's date as an ordinal."""
+        return [self.inventory[key] for key in islice(self.expiry_index.iter_keys(first=today + 1), count)]
+
+    def get_status(self, group: dict, today: int) -> str:
+        """Returns the status column text of a group, given today's date as an ordinal."""
+        status_emoji = ""
+        status = ""
+        if group["total_qty"] <= self.low_quantity:
+            status_emoji = "⚠"
+            status = "Low Stock"
+        days_left = group["most_recent_expiry"] - today
+        if days_left <= self.days_from_expiry + self.days_from_expiry_warning:
+            if days_left <= 0:
+                status_emoji = "☠️"
+                status = ", ".join([status, "Expired"])
+            elif days_left <= self.days_from_expiry:
+                status_emoji = "❌"
+                status = ", ".join([status, "Expiring Soon"])
+            else:
+                status_emoji = "❗"
+                status = ", ".join([status, "Expiry Warning"])
+        return f"{status_emoji} {status}"
+
+def save_stores(stores: list[InventoryStore], manifest_file: str) -> list[InventoryStore]:
+    """Saves every changed store, replacing all of their files or none of them, and returns the stores saved."""
+    # Stores that were never loaded have nothing to save
+    changed = [store for store in stores if store.loaded and store.dirty]
+    transaction = SaveTransaction(manifest_file)
+    try:
+        for store in changed:
+            temp_file = store.write_temp_file()
+            if temp_file is not None:
+                transaction.add(temp_file, store.inventory_file)
+        transaction.commit()
+    except Exception:
+        transaction.abort()
+        raise
+    for store in changed:
+        store.storage.saved()
+        store.dirty = False
+    return changed
+
+def get_lots_by_expiry(
+        stores: dict[str, InventoryStore],
+        first: int | None = None,
+        last: int | None = None,
+        count: int | None = None
+    ) -> list[tuple[str, Item]]:
+    """Returns (title, lot) of every loaded store's lots expiring from day ordinal first to last, soonest first.
+
+    The stores' expiry indexes are merged lazily, so asking for the first
+    count lots only walks that many entries.
+    """
+    def iter_lots(title: str, store: InventoryStore):
+        for key in store.expiry_index.iter_keys(first, last):
+            yield title, store.inventory[key]
+    merged = heapq.merge(
+        *(iter_lots(title, store) for title, store in stores.items() if store.loaded),
+        key=lambda entry: entry[1].expiry_ordinal
+    )
+    return list(islice(merged, count))
+
+class CaseLine:
+    """A line of a case: qty items of one group of a category, e.g. one implant of a size."""
+    __slots__ = ("category", "group_key", "qty")
+
+    def __init__(self, category: str, group_key: tuple, qty: int):
+        self.category = category
+        self.group_key = group_key
+        self.qty = qty
+
+def resolve_case(
+        stores: dict[str, InventoryStore],
+        lines: list[CaseLine],
+        skip_expired: bool = True
+    ) -> dict[str, list[tuple[Item, int]]]:
+    """Picks the lots every line of a case takes from, earliest expiry first, without changing any store.
+
+    Returns {category: [(lot, qty to take)]}. Lines of the same group are
+    picked together, so they cannot both count the same stock. Lots expired
+    by each store's today are left alone unless skip_expired is False. Raises
+    InsufficientStockError naming the first line that cannot be covered.
+    """
+    totals: dict[tuple[str, tuple], int] = {}
+    for line in lines:
+        totals[(line.category, line.group_key)] = totals.get((line.category, line.group_key), 0) + line.qty
+    picks: dict[str, list[tuple[Item, int]]] = {}
+    for (category, group_key), qty in totals.items():
+        try:
+            store = stores[category]
+            group_picks = store.pick_fefo(group_key, qty, store.today if skip_expired else None)
+        except InsufficientStockError as e:
+            raise InsufficientStockError(f"{category} {' '.join(group_key)}: {e}") from e
+        picks.setdefault(category, []).extend(group_picks)
+    return picks
+
+def consume_case(
+        stores: dict[str, InventoryStore],
+        lines: list[CaseLine],
+        skip_expired: bool = True
+    ) -> dict[str, list[tuple[Item, int]]]:
+    """Takes every line of a case out of the stores, or nothing at all if any line is short.
+
+    Every lot is picked before any is changed, so a shortage leaves all the
+    stores untouched. Returns what was taken, as resolve_case does. A
+    StorageError from recording the change is raised once every store has
+    been committed, the removals themselves stay applied.
+    """
+    picks = resolve_case(stores, lines, skip_expired)
+    for category, category_picks in picks.items():
+        stores[category]._take_picks(category_picks)
+    error = None
+    for category in picks:
+        try:
+            stores[category].commit_changes()
+        except StorageError as e:
+            error = error or e
+    if error is not None:
+        raise error
+    return picks
@@ -0,0 +1,161 @@
+import re
+from datetime import date
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+# Runs of digits, with an optional fraction, compared by value when sorting, e.g. "3.5" before "10.0 mm"
+NUMBER_PATTERN = re.compile(r"(\d+)(?:\.(\d+))?")
+
+def _get_natural_key(text: str) -> str:
+    # Pads every number so that plain string comparison orders them by value
+    return NUMBER_PATTERN.sub(lambda m: f"{int(m[1]):012d}.{(m[2] or '').ljust(6, '0')}", text.lower())
+
+class InventoryTableModel(QAbstractTableModel):
+    """Table model over the condensed groups of an InventoryStore.
+
+    Cells are only formatted when the view asks for them. As the store's
+    listener it is told about single group changes, so that one lot edit
+    repaints one row.
+    """
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.header_labels = store.header_labels + [
+            "Total Qty", "Most Recent Expiry", "Most Recent Expiry Qty", "Status"
+        ]
+        self._attributes = store.schema.group_attributes
+        # The group value shown in each column
+        self._fields = self._attributes + ["total_qty", "most_recent_expiry", "most_recent_expiry_qty", "status"]
+        self._resetting = False
+        # Attribute value -> sort key and expiry ordinal -> text, shared by every row showing that value
+        self._sort_keys: dict[str, str] = {}
+        self._expiry_texts: dict[int, str] = {}
+        # Column -> sort key and text of every row, built when first sorted or filtered on and then kept in step
+        self._column_keys: dict[int, list] = {}
+        self._column_texts: dict[int, list[str]] = {}
+        self._inserted_row = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.store.get_group_count()
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.header_labels)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return self.get_text(index.row(), index.column())
+
+    def _format(self, field: str, value) -> str:
+        if field == "most_recent_expiry":
+            text = self._expiry_texts.get(value)
+            if text is None:
+                text = self._expiry_texts[value] = date.fromordinal(value).isoformat()
+            return text
+        # The status is cached by the store, which re-evaluates it when the group or the date changes
+        return str(value)
+
+    def _get_sort_key(self, field: str, value) -> str | int:
+        # Numbers for the qty and expiry columns, natural order text otherwise
+        if field not in self._attributes:
+            return value
+        value = str(value)
+        key = self._sort_keys.get(value)
+        if key is None:
+            key = self._sort_keys[value] = _get_natural_key(value)
+        return key
+
+    def get_text(self, row: int, column: int) -> str:
+        """Returns the text of a cell."""
+        field = self._fields[column]
+        return self._format(field, self.store.get_group(row)[field])
+
+    def get_texts(self, column: int) -> list[str]:
+        """Returns the text of every cell of a column, in row order."""
+        texts = self._column_texts.get(column)
+        if texts is None:
+            field = self._fields[column]
+            texts = self._column_texts[column] = [
+                self._format(field, group[field]) for group in self.store._get_sorted_condensed_inventory()
+            ]
+        return texts
+
+    def get_sort_key(self, row: int, column: int) -> str | int:
+        """Returns the value a cell is sorted by."""
+        field = self._fields[column]
+        return self._get_sort_key(field, self.store.get_group(row)[field])
+
+    def get_sort_keys(self, column: int) -> list[str | int]:
+        """Returns the sort key of every cell of a column, in row order."""
+        keys = self._column_keys.get(column)
+        if keys is None:
+            field = self._fields[column]
+            keys = self._column_keys[column] = [
+                self._get_sort_key(field, group[field]) for group in self.store._get_sorted_condensed_inventory()
+            ]
+        return keys
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.header_labels[section]
+        return str(section + 1)
+
+    def begin_reset(self):
+        """Starts a bulk change, during which single group notifications are skipped."""
+        self._resetting = True
+        self.beginResetModel()
+
+    def end_reset(self):
+        self._resetting = False
+        self._column_keys.clear()
+        self._column_texts.clear()
+        self.endResetModel()
+
+    def begin_insert_group(self, row: int):
+        if not self._resetting:
+            self._inserted_row = row
+            self.beginInsertRows(QModelIndex(), row, row)
+
+    def end_insert_group(self):
+        if not self._resetting:
+            row = self._inserted_row
+            for column, keys in self._column_keys.items():
+                keys.insert(row, self.get_sort_key(row, column))
+            for column, texts in self._column_texts.items():
+                texts.insert(row, self.get_text(row, column))
+            self.endInsertRows()
+
+    def begin_remove_group(self, row: int):
+        if not self._resetting:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            for values in (*self._column_keys.values(), *self._column_texts.values()):
+                del values[row]
+
+    def end_remove_group(self):
+        if not self._resetting:
+            self.endRemoveRows()
+
+    def group_changed(self, row: int):
+        """Repaints the qty, expiry and status cells of a single row."""
+        if not self._resetting:
+            # Only these columns change, the attributes are what makes the group
+            for column, keys in self._column_keys.items():
+                if column >= len(self._attributes):
+                    keys[row] = self.get_sort_key(row, column)
+            for column, texts in self._column_texts.items():
+                if column >= len(self._attributes):
+                    texts[row] = self.get_text(row, column)
+            self.dataChanged.emit(
+                self.index(row, len(self._attributes)),
+                self.index(row, len(self.header_labels) - 1)
+            )
+
+    def refresh(self):
+        """Repaints every row, re-evaluating the statuses if the date has changed."""
+        self.store.update_today(date.today().toordinal())
+        if self.rowCount() > 0:
+            self.dataChanged.emit(
+                self.index(0, 0),
+                self.index(self.rowCount() - 1, len(self.header_labels) - 1)
+            )
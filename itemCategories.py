@@ -0,0 +1,165 @@
+from baseItem import Item
+from inventoryStore import InventoryStore
+from itemSchema import BASE_FIELDS, Field
+
+class Category:
+    """A kind of item: its class, the columns its groups are shown with and the attributes keying its lots."""
+    def __init__(self, ItemClass: type[Item], header_labels: list[str], attributes: list[str], item_name: str):
+        self.ItemClass = ItemClass
+        self.header_labels = header_labels
+        self.attributes = attributes
+        self.item_name = item_name
+
+    def create_store(self, inventory_file: str, **kwargs) -> InventoryStore:
+        """Creates a store for the category, e.g. for a script; kwargs are passed to InventoryStore."""
+        return InventoryStore(
+            inventory_file=inventory_file,
+            ItemClass=self.ItemClass,
+            header_labels=self.header_labels,
+            attributes=self.attributes,
+            item_name=self.item_name,
+            **kwargs
+        )
+
+class Implant(Item):
+    __slots__ = ("type_", "platform", "width", "length")
+    fields = BASE_FIELDS + (
+        Field("Type", "type_"),
+        Field("Platform", "platform"),
+        Field("Width", "width"),
+        Field("Length", "length")
+    )
+
+    def __init__(self, brand, type_, platform, width, length, ref, lot, expiry, qty):
+        super().__init__(brand, ref, lot, expiry, qty)
+        self.type_ = type_
+        self.platform = platform
+        self.width = width
+        self.length = length
+
+class HealingAbutment(Item):
+    __slots__ = ("type_", "platform", "width", "height")
+    fields = BASE_FIELDS + (
+        Field("Type", "type_"),
+        Field("Platform", "platform"),
+        Field("Width", "width"),
+        Field("Height", "height")
+    )
+
+    def __init__(self, brand, type_, platform, width, height, ref, lot, expiry, qty):
+        super().__init__(brand, ref, lot, expiry, qty)
+        self.type_ = type_
+        self.platform = platform
+        self.width = width
+        self.height = height
+
+class CoverScrew(Item):
+    __slots__ = ("platform",)
+    fields = BASE_FIELDS + (
+        Field("Platform", "platform"),
+    )
+
+    def __init__(self, brand, platform, ref, lot, expiry, qty):
+        super().__init__(brand, ref, lot, expiry, qty)
+        self.platform = platform
+
+class TemporaryAbutment(Item):
+    __slots__ = ("engagement", "platform", "collar_height", "height")
+    fields = BASE_FIELDS + (
+        Field("Engagement", "engagement"),
+        Field("Platform", "platform"),
+        Field("Collar Height", "collar_height"),
+        Field("Height", "height")
+    )
+
+    def __init__(self, brand, engagement, platform, collar_height, height, ref, lot, expiry, qty):
+        super().__init__(brand, ref, lot, expiry, qty)
+        self.engagement = engagement
+        self.platform = platform
+        self.collar_height = collar_height
+        self.height = height
+
+class BoneGraft(Item):
+    __slots__ = ("type_", "particulate", "granule_size", "amount", "sn")
+    fields = BASE_FIELDS + (
+        Field("Type", "type_"),
+        Field("Particulate", "particulate"),
+        Field("Granule Size", "granule_size"),
+        Field("Amount", "amount"),
+        Field("SN", "sn")
+    )
+
+    def __init__(self, brand, type_, particulate, granule_size, amount, sn, ref, lot, expiry, qty):
+        super().__init__(brand,ref, lot, expiry, qty)
+        self.type_ = type_
+        self.particulate = particulate
+        self.granule_size = granule_size
+        self.amount = amount
+        self.sn = sn
+
+class Membrane(Item):
+    __slots__ = ("biologic_type", "membrane_type", "shape", "size", "thickness", "sn")
+    fields = BASE_FIELDS + (
+        Field("Biologic Type", "biologic_type"),
+        Field("Membrane Type", "membrane_type"),
+        Field("Shape", "shape"),
+        Field("Size", "size"),
+        Field("Thickness", "thickness"),
+        Field("SN", "sn")
+    )
+
+    def __init__(self, brand, biologic_type, membrane_type, shape, size, thickness, sn, ref, lot, expiry, qty):
+        super().__init__(brand,ref, lot, expiry, qty)
+        self.biologic_type = biologic_type
+        self.membrane_type = membrane_type
+        self.shape = shape
+        self.size = size
+        self.thickness = thickness
+        self.sn = sn
+
+IMPLANTS = Category(
+    ItemClass=Implant,
+    header_labels=["Brand", "Type", "Platform", "Width", "Length"],
+    attributes=["brand", "type_", "platform", "width", "length"],
+    item_name="implant"
+)
+HEALING_ABUTMENTS = Category(
+    ItemClass=HealingAbutment,
+    header_labels=["Brand", "Type", "Platform", "Width", "Height"],
+    attributes=["brand", "type_", "platform", "width", "height"],
+    item_name="healing abutment"
+)
+COVER_SCREWS = Category(
+    ItemClass=CoverScrew,
+    header_labels=["Brand", "Platform"],
+    attributes=["brand", "platform"],
+    item_name="cover screw"
+)
+TEMPORARY_ABUTMENTS = Category(
+    ItemClass=TemporaryAbutment,
+    header_labels=["Brand", "Engagement", "Platform", "Collar Height", "Height"],
+    attributes=["brand", "engagement", "platform", "collar_height", "height"],
+    item_name="temporary abutment"
+)
+BONE_GRAFTS = Category(
+    ItemClass=BoneGraft,
+    header_labels=["Brand", "Type", "Particulate", "Granule Size", "Amount"],
+    attributes=["brand", "type_", "particulate", "granule_size", "amount", "sn"],
+    item_name="bone graft"
+)
+MEMBRANES = Category(
+    ItemClass=Membrane,
+    header_labels=["Brand", "Biologic Type", "Membrane Type", "Shape", "Size", "Thickness"],
+    attributes=["brand", "biologic_type", "membrane_type", "shape", "size", "thickness", "sn"],
+    item_name="membrane"
+)
+
+# Every category, by the title of its tab
+CATEGORIES = {
+    "Implants": IMPLANTS,
+    "Healing Abutments": HEALING_ABUTMENTS,
+    "Cover Screws": COVER_SCREWS,
+    "Temporary Abutments": TEMPORARY_ABUTMENTS,
+    "Bone Grafts": BONE_GRAFTS,
+    "Membranes": MEMBRANES
+}
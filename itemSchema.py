@@ -0,0 +1,46 @@
+from operator import attrgetter
+from typing import Callable
+
+class Field:
+    """A column of an item category: its header label and attribute name."""
+    __slots__ = ("header", "name")
+
+    def __init__(self, header: str, name: str):
+        self.header = header
+        self.name = name
+
+def _tuple_getter(names: list[str]) -> Callable[[object], tuple]:
+    # attrgetter only returns a tuple for two or more names
+    if len(names) == 1:
+        getter = attrgetter(names[0])
+        return lambda obj: (getter(obj),)
+    if not names:
+        return lambda obj: ()
+    return attrgetter(*names)
+
+class ItemSchema:
+    """Compiled description of how an inventory groups and keys its items.
+
+    Built once per inventory so hot loops use precompiled getters instead of
+    resolving attribute names from headers for every item.
+    """
+    def __init__(self, fields: tuple[Field, ...], header_labels: list[str], attributes: list[str]):
+        self.fields = fields
+        self.fields_by_header = {field.header: field for field in fields}
+        self.fields_by_name = {field.name: field for field in fields}
+        self.header_labels = header_labels
+        self.attributes = attributes
+        # Attributes of the columns shown in the main table, which define the groups
+        self.group_attributes = [self.fields_by_header[header].name for header in header_labels]
+        self.get_group_key = _tuple_getter(self.group_attributes)
+        self.get_attributes = _tuple_getter(attributes)
+        self.get_lot_key = _tuple_getter(attributes + ["ref", "lot", "expiry_ordinal"])
+
+# Fields shared by every item category
+BASE_FIELDS = (
+    Field("Brand", "brand"),
+    Field("REF", "ref"),
+    Field("LOT", "lot"),
+    Field("Expiry", "expiry"),
+    Field("Qty in Stock", "qty"),
+)
@@ -3,39 +3,8 @@ from PyQt6.QtWidgets import (
 )
 from baseDialog import AddDialog, EditDialog, RemoveDialog
 from baseInventory import Inventory
-from baseItem import Item
-
-class Membrane(Item):
-    def __init__(self, brand, biologic_type, membrane_type, shape, size, thickness, sn, ref, lot, expiry, qty):
-        super().__init__(brand,ref, lot, expiry, qty)
-        self.biologic_type = biologic_type
-        self.membrane_type = membrane_type
-        self.shape = shape
-        self.size = size
-        self.thickness = thickness
-        self.sn = sn
-    
-    @classmethod
-    def getAttributeFromHeader(cls, header: str):
-        return super().getAttributeFromHeader(header) or {
-            "Biologic Type": cls.biologic_type,
-            "Membrane Type": cls.membrane_type,
-            "Shape": cls.shape,
-            "Size": cls.size,
-            "Thickness": cls.thickness,
-            "SN": cls.sn
-        }.get(header, None)
-
-    @classmethod
-    def getAttributeNameFromHeader(cls, header):
-        return super().getAttributeNameFromHeader(header) or {
-            "Biologic Type": "biologic_type",
-            "Membrane Type": "membrane_type",
-            "Shape": "shape",
-            "Size": "size",
-            "Thickness": "thickness",
-            "SN": "sn"
-        }.get(header, None)
+from sqliteStorage import InventoryDatabase
+from itemCategories import Membrane, MEMBRANES
 
 class AddMembraneDialog(AddDialog):
     def __init__(self, parent=None, title="Add Membrane"):
@@ -89,318 +58,24 @@ class AddMembraneDialog(AddDialog):
             sn=sn,
             ref=ref,
             lot=lot,
-            expiry=expiry_date.strftime("%Y-%m-%d"),
+            expiry=expiry_date,
             qty=qty
         )
     
     def _add_dialog_body_widgets(self):
-        self._brand_list = ["creos", "Osteogenics"]
-        self._refresh_brand_items()
-        self.brand_input.setCurrentText("Osteogenics")
-        self.brand_input.currentTextChanged.connect(self._set_dynamic_biologic_type_widget)
-        self.biologic_type_input = None
-        self.membrane_type_input = None
-        self.shape_input = None
-        self.size_input = None
-        self.thickness_input = None
         self.sn_input = QLineEdit()
-        
-        # Add widgets to layout
-        self.layout_.addRow("Brand", self.brand_input)
-        self._set_dynamic_biologic_type_widget()
+        self._add_cascade_widgets("Membranes", "Osteogenics")
         self.layout_.addRow("SN", self.sn_input)
         self.layout_.addRow("REF", self.ref_input)
         self.layout_.addRow("LOT", self.lot_input)
         self.layout_.addRow("Expiry (YYYY-MM-DD)", self.expiry_input)
         self.layout_.addRow("Qty", self.qty_input)
 
-    def _set_dynamic_biologic_type_widget(self):
-        self.biologic_type_input.deleteLater() if self.biologic_type_input else None
-        # Add new widgets based on selection
-        match self.brand_input.currentText():
-            case "creos":
-                self.biologic_type_input = QComboBox()
-                self.biologic_type_input.addItems([
-                    "Allograft",
-                    "Xenograft"
-                ])
-                self.biologic_type_input.setCurrentText("Allograft")
-                self.biologic_type_input.currentTextChanged.connect(self._set_dynamic_membrane_type_widget)
-                self.biologic_type_input.currentTextChanged.connect(self._set_dynamic_sn_widget)
-            case "Osteogenics":
-                self.biologic_type_input = QComboBox()
-                self.biologic_type_input.addItems([
-                    "Xenograft",
-                    "Synthetic"
-                ])
-                self.biologic_type_input.setCurrentText("Xenograft")
-                self.biologic_type_input.currentTextChanged.connect(self._set_dynamic_membrane_type_widget)
-                self.biologic_type_input.currentTextChanged.connect(self._set_dynamic_sn_widget)
-            case _:
-                self.biologic_type_input = QLineEdit()
-        # Remove any existing row at this position before inserting to avoid
-        # accumulating rows (which causes the dialog to grow each time)
-        if self.layout_.rowCount() > 1:
-            self.layout_.removeRow(1)
-        self.layout_.insertRow(1, "Biologic Type", self.biologic_type_input)
-        self._set_dynamic_membrane_type_widget()
-        self._set_dynamic_sn_widget()
-    
-    def _set_dynamic_membrane_type_widget(self):
-        self.membrane_type_input.deleteLater() if self.membrane_type_input else None
-        if isinstance(self.biologic_type_input, QComboBox):
-            match self.biologic_type_input.currentText():
-                case "Allograft":
-                    self.membrane_type_input = QComboBox()
-                    self.membrane_type_input.addItems(["Pericardium"])
-                    self.membrane_type_input.setCurrentText("Pericardium")
-                    self.membrane_type_input.setDisabled(True)
-                    self.membrane_type_input.currentTextChanged.connect(self._set_dynamic_shape_widget)
-                case "Xenograft":
-                    self.membrane_type_input = QComboBox()
-                    self.membrane_type_input.addItems(["Collagen"])
-                    self.membrane_type_input.setCurrentText("Collagen")
-                    self.membrane_type_input.setDisabled(True)
-                    self.membrane_type_input.currentTextChanged.connect(self._set_dynamic_shape_widget)
-                case "Synthetic":
-                    self.membrane_type_input = QComboBox()
-                    self.membrane_type_input.addItems(["d-PTFE", "Ti-reinforced PTFE"])
-                    self.membrane_type_input.setCurrentText("d-PTFE")
-                    self.membrane_type_input.currentTextChanged.connect(self._set_dynamic_shape_widget)
-                case _:
-                    self.membrane_type_input = QLineEdit()
-        else:
-            self.membrane_type_input = QLineEdit()
-        # Ensure we don't duplicate the platform row
-        if self.layout_.rowCount() > 2:
-            self.layout_.removeRow(2)
-        self.layout_.insertRow(2, "Membrane Type", self.membrane_type_input)
-        self._set_dynamic_shape_widget()
-    
-    def _set_dynamic_shape_widget(self):
-        self.shape_input.deleteLater() if self.shape_input else None
-        # Add new widgets based on selection
-        if isinstance(self.membrane_type_input, QComboBox):
-            match self.membrane_type_input.currentText():
-                case "Pericardium" | "Collagen" | "d-PTFE":
-                    self.shape_input = QComboBox()
-                    self.shape_input.addItems(["Rectangular"])
-                    self.shape_input.setCurrentText("Rectangular")
-                    self.shape_input.setDisabled(True)
-                    self.shape_input.currentTextChanged.connect(self._set_dynamic_size_widget)
-                case "Ti-reinforced PTFE":
-                    self.shape_input = QComboBox()
-                    self.shape_input.addItems([
-                        "ANL",
-                        "ANL30",
-                        "AS",
-                        "BL",
-                        "BLL",
-                        "PS",
-                        "PST",
-                        "PL",
-                        "PLT",
-                        "XLK",
-                        "XL",
-                        "ATC",
-                        "PTC",
-                        "PD",
-                        "K2"
-                    ])
-                    self.shape_input.setCurrentText("ANL")
-                    self.shape_input.currentTextChanged.connect(self._set_dynamic_size_widget)
-                case _:
-                    self.shape_input = QLineEdit()
-        else:
-            self.shape_input = QLineEdit()
-        # Ensure single width row only
-        if self.layout_.rowCount() > 3:
-            self.layout_.removeRow(3)
-        self.layout_.insertRow(3, "Shape", self.shape_input)
-        self._set_dynamic_size_widget()
-
-    def _set_dynamic_size_widget(self):
-        self.size_input.deleteLater() if self.size_input else None
-        # Add new widgets based on selection
-        if isinstance(self.membrane_type_input, QComboBox) and isinstance(self.shape_input, QComboBox):
-            match self.membrane_type_input.currentText():
-                case "Pericardium":
-                    self.size_input = QComboBox()
-                    self.size_input.addItems([
-                        "10 x 10 mm",
-                        "15 x 20 mm",
-                        "20 x 30 mm"
-                    ])
-                    self.size_input.setCurrentText("10 x 10 mm")
-                    self.size_input.currentTextChanged.connect(self._set_dynamic_thickness_widget)
-                case "Collagen":
-                    self.size_input = QComboBox()
-                    self.size_input.addItems([
-                        "15 x 20 mm",
-                        "25 x 30 mm",
-                        "30 x 40 mm"
-                    ])
-                    self.size_input.setCurrentText("15 x 20 mm")
-                    self.size_input.currentTextChanged.connect(self._set_dynamic_thickness_widget)
-                case "d-PTFE":
-                    self.size_input = QComboBox()
-                    self.size_input.addItems([
-                        "12 x 24 mm",
-                        "12 x 30 mm",
-                        "25 x 30 mm"
-                    ])
-                    self.size_input.setCurrentText("12 x 24 mm")
-                    self.size_input.currentTextChanged.connect(self._set_dynamic_thickness_widget)
-                case "Ti-reinforced PTFE":
-                    match self.shape_input.currentText():
-                        case "ANL":
-                            self.size_input = QComboBox()
-                            self.size_input.addItems(["12 x 24 mm"])
-                            self.size_input.setCurrentText("12 x 24 mm")
-                            self.size_input.setDisabled(True)
-                            self.size_input.currentTextChanged.connect(self._set_dynamic_thickness_widget)
-                        case "ANL30":
-                            self.size_input = QComboBox()
-                            self.size_input.addItems(["12 x 30 mm"])
-                            self.size_input.setCurrentText("12 x 30 mm")
-                            self.size_input.setDisabled(True)
-                            self.size_input.currentTextChanged.connect(self._set_dynamic_thickness_widget)
-                        case "AS":
-                            self.size_input = QComboBox()
-                            self.size_input.addItems(["14 x 24 mm"])
-                            self.size_input.setCurrentText("14 x 24 mm")
-                            self.size_input.setDisabled(True)
-                            self.size_input.currentTextChanged.connect(self._set_dynamic_thickness_widget)
-                        case "BL":
-                            self.size_input = QComboBox()
-                            self.size_input.addItems(["17 x 25 mm"])
-                            self.size_input.setCurrentText("17 x 25 mm")
-                            self.size_input.setDisabled(True)
-                            self.size_input.currentTextChanged.connect(self._set_dynamic_thickness_widget)
-                        case "BLL":
-                            self.size_input = QComboBox()
-                            self.size_input.addItems(["17 x 30 mm"])
-                            self.size_input.setCurrentText("17 x 30 mm")
-                            self.size_input.setDisabled(True)
-                            self.size_input.currentTextChanged.connect(self._set_dynamic_thickness_widget)
-                        case "PS":
-                            self.size_input = QComboBox()
-                            self.size_input.addItems(["20 x 25 mm"])
-                            self.size_input.setCurrentText("20 x 25 mm")
-                            self.size_input.setDisabled(True)
-                            self.size_input.currentTextChanged.connect(self._set_dynamic_thickness_widget)
-                        case "PST":
-                            self.size_input = QComboBox()
-                            self.size_input.addItems(["36 x 25 mm"])
-                            self.size_input.setCurrentText("36 x 25 mm")
-                            self.size_input.setDisabled(True)
-                            self.size_input.currentTextChanged.connect(self._set_dynamic_thickness_widget)
-                        case "PL":
-                            self.size_input = QComboBox()
-                            self.size_input.addItems(["25 x 30 mm"])
-                            self.size_input.setCurrentText("25 x 30 mm")
-                            self.size_input.setDisabled(True)
-                            self.size_input.currentTextChanged.connect(self._set_dynamic_thickness_widget)
-                        case "PLT":
-                            self.size_input = QComboBox()
-                            self.size_input.addItems(["30 x 41 mm"])
-                            self.size_input.setCurrentText("30 x 41 mm")
-                            self.size_input.setDisabled(True)
-                            self.size_input.currentTextChanged.connect(self._set_dynamic_thickness_widget)
-                        case "XLK":
-                            self.size_input = QComboBox()
-                            self.size_input.addItems(["30 x 40 mm"])
-                            self.size_input.setCurrentText("30 x 40 mm")
-                            self.size_input.setDisabled(True)
-                            self.size_input.currentTextChanged.connect(self._set_dynamic_thickness_widget)
-                        case "XL":
-                            self.size_input = QComboBox()
-                            self.size_input.addItems(["30 x 40 mm"])
-                            self.size_input.setCurrentText("30 x 40 mm")
-                            self.size_input.setDisabled(True)
-                            self.size_input.currentTextChanged.connect(self._set_dynamic_thickness_widget)
-                        case "ATC":
-                            self.size_input = QComboBox()
-                            self.size_input.addItems(["24 x 38 mm"])
-                            self.size_input.setCurrentText("24 x 38 mm")
-                            self.size_input.setDisabled(True)
-                            self.size_input.currentTextChanged.connect(self._set_dynamic_thickness_widget)
-                        case "PTC":
-                            self.size_input = QComboBox()
-                            self.size_input.addItems(["38 x 38 mm"])
-                            self.size_input.setCurrentText("38 x 38 mm")
-                            self.size_input.setDisabled(True)
-                            self.size_input.currentTextChanged.connect(self._set_dynamic_thickness_widget)
-                        case "PD":
-                            self.size_input = QComboBox()
-                            self.size_input.addItems(["38 x 38 mm"])
-                            self.size_input.setCurrentText("38 x 38 mm")
-                            self.size_input.setDisabled(True)
-                            self.size_input.currentTextChanged.connect(self._set_dynamic_thickness_widget)
-                        case "K2":
-                            self.size_input = QComboBox()
-                            self.size_input.addItems(["40 x 50 mm"])
-                            self.size_input.setCurrentText("40 x 50 mm")
-                            self.size_input.setDisabled(True)
-                            self.size_input.currentTextChanged.connect(self._set_dynamic_thickness_widget)
-                        case _:
-                            self.size_input = QLineEdit()
-                case _:
-                    self.size_input = QLineEdit()
-        else:
-            self.size_input = QLineEdit()
-        # Ensure single width row only
-        if self.layout_.rowCount() > 4:
-            self.layout_.removeRow(4)
-        self.layout_.insertRow(4, "Size", self.size_input)
-        self._set_dynamic_thickness_widget()
-
-    def _set_dynamic_thickness_widget(self):
-        self.thickness_input.deleteLater() if self.thickness_input else None
-        # Add new widgets based on selection
-        if isinstance(self.membrane_type_input, QComboBox) and isinstance(self.shape_input, QComboBox):
-            match self.membrane_type_input.currentText():
-                case "Pericardium" | "Collagen" | "d-PTFE":
-                    self.thickness_input = QComboBox()
-                    self.thickness_input.addItems(["N/A"])
-                    self.thickness_input.setCurrentText("N/A")
-                    self.thickness_input.setDisabled(True)
-                case "Ti-reinforced PTFE":
-                    match self.shape_input.currentText():
-                        case (
-                            "ANL" |
-                            "AS" |
-                            "BL" |
-                            "BLL" |
-                            "PS" |
-                            "PST" |
-                            "PL" |
-                            "PLT" |
-                            "XLK" |
-                            "XL" |
-                            "ATC" |
-                            "PTC" |
-                            "PD" |
-                            "K2"
-                        ):
-                            self.thickness_input = QComboBox()
-                            self.thickness_input.addItems(["150 um", "250 um"])
-                            self.thickness_input.setCurrentText("150 um")
-                        case "ANL30":
-                            self.thickness_input = QComboBox()
-                            self.thickness_input.addItems(["250 um"])
-                            self.thickness_input.setCurrentText("250 um")
-                            self.thickness_input.setDisabled(True)
-                        case _:
-                            self.thickness_input = QLineEdit()
-                case _:
-                    self.thickness_input = QLineEdit()
-        else:
-            self.thickness_input = QLineEdit()
-        # Ensure we don't add multiple height rows
-        if self.layout_.rowCount() > 5:
-            self.layout_.removeRow(5)
-        self.layout_.insertRow(5, "Thickness", self.thickness_input)
+    def _set_cascade(self, index: int):
+        super()._set_cascade(index)
+        # Whether there is a serial number depends on the type, the input after the brand
+        if index <= 1:
+            self._set_dynamic_sn_widget()
 
     def _set_dynamic_sn_widget(self):
         if isinstance(self.biologic_type_input, QComboBox):
@@ -469,7 +144,8 @@ class MembraneInventory(Inventory):
             inventory_file: str,
             low_quantity: int=2,
             days_from_expiry: int=180,
-            days_from_expiry_warning: int=60
+            days_from_expiry_warning: int=60,
+            database: InventoryDatabase | None=None
             ):
         super().__init__(
             inventory_file=inventory_file,
@@ -477,14 +153,11 @@ class MembraneInventory(Inventory):
             AddDialogClass=AddMembraneDialog,
             EditDialogClass=EditMembraneDialog,
             RemoveDialogClass=RemoveMembraneDialog,
-            header_labels=[
-                "Brand", "Biologic Type", "Membrane Type", "Shape", "Size", "Thickness"
-            ],
-            attributes=[
-                "brand", "biologic_type", "membrane_type", "shape", "size", "thickness", "sn"
-            ],
-            item_name="membrane",
+            header_labels=MEMBRANES.header_labels,
+            attributes=MEMBRANES.attributes,
+            item_name=MEMBRANES.item_name,
             low_quantity=low_quantity,
             days_from_expiry=days_from_expiry,
-            days_from_expiry_warning=days_from_expiry_warning
+            days_from_expiry_warning=days_from_expiry_warning,
+            database=database
         )
\ No newline at end of file
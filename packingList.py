@@ -0,0 +1,135 @@
+import csv
+import os
+from baseItem import Item, parse_expiry
+from barcodeScanning import Product, ProductLookup
+from itemCategories import CATEGORIES
+from inventoryStore import InventoryStore
+
+# Column names a packing list may use for the fields every row needs, matched case-insensitively
+COLUMN_ALIASES = {
+    "category": ["category"],
+    "gtin": ["gtin", "(01)"],
+    "ref": ["ref", "reference", "item number"],
+    "lot": ["lot", "batch", "(10)"],
+    "expiry": ["expiry", "expiry date", "expiration", "exp", "(17)"],
+    "qty": ["qty", "quantity", "qty shipped"],
+    "sn": ["sn", "serial", "serial number", "(21)"],
+}
+
+class PackingList:
+    """The items of a supplier's packing list, by category, and the rows that could not be used."""
+    def __init__(self, packing_list_file: str):
+        self.packing_list_file = packing_list_file
+        self.rows_read = 0
+        self.items: dict[str, list[Item]] = {}
+        # (line number, reason) for every row that could not be used
+        self.rejected: list[tuple[int, str]] = []
+
+    @property
+    def item_count(self) -> int:
+        return sum(len(items) for items in self.items.values())
+
+def _find_category(value: str) -> str | None:
+    # Accepts the tab title (e.g. "Healing Abutments") or the item name (e.g. "healing abutment")
+    value = value.strip().lower()
+    for title, category in CATEGORIES.items():
+        if value in (title.lower(), category.item_name.lower()):
+            return title
+    return None
+
+def _get_attributes(title: str, row: dict[str, str]) -> dict[str, str] | None:
+    # Descriptive attributes from the row's own columns, by attribute name or header label
+    category = CATEGORIES[title]
+    fields = {field.name: field for field in category.ItemClass.fields}
+    attributes = {}
+    for name in category.attributes:
+        if name == "sn":
+            continue
+        value = row.get(name.lower()) or row.get(fields[name].header.lower())
+        if not value:
+            return None
+        attributes[name] = value
+    return attributes
+
+def _read_row(row: dict[str, str], lookup: ProductLookup) -> tuple[str, Item]:
+    # Resolves a row to (category title, item), raising ValueError if it cannot be
+    def get(name: str) -> str:
+        for alias in COLUMN_ALIASES[name]:
+            if row.get(alias):
+                return row[alias]
+        return ""
+
+    product = None
+    if get("gtin"):
+        product = lookup.find_gtin(get("gtin"))
+        if product is None:
+            raise ValueError(f"unknown GTIN {get('gtin')}")
+    else:
+        title = _find_category(get("category"))
+        if title is None:
+            raise ValueError(f"unknown category {get('category')!r}")
+        if not get("ref"):
+            raise ValueError("missing REF")
+        product = lookup.find_ref(title, get("ref"))
+        if product is None:
+            attributes = _get_attributes(title, row)
+            if attributes is None:
+                raise ValueError(f"REF {get('ref')} is not in the product catalog and the row does not describe it")
+            product = Product(title, get("ref"), attributes)
+    if not get("lot"):
+        raise ValueError("missing LOT")
+    try:
+        expiry = parse_expiry(get("expiry"))
+    except ValueError:
+        raise ValueError(f"invalid expiry {get('expiry')!r}") from None
+    try:
+        qty = int(get("qty") or 1)
+    except ValueError:
+        raise ValueError(f"invalid qty {get('qty')!r}") from None
+    if qty <= 0:
+        raise ValueError(f"invalid qty {qty}")
+    return product.category, product.make_item(get("lot"), expiry, qty, get("sn") or "N/A")
+
+def read_packing_list(packing_list_file: str, lookup: ProductLookup) -> PackingList:
+    """Reads a CSV or TSV packing list with a header row, resolving each row to an item of its category.
+
+    Rows are resolved by GTIN, or by category and REF through the lookup,
+    or else by the descriptive columns of the row itself.
+    """
+    packing_list = PackingList(packing_list_file)
+    with open(packing_list_file, "r", newline="", encoding="utf-8-sig") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        delimiter = "\t" if os.path.splitext(packing_list_file)[1].lower() == ".tsv" or "\t" in sample.split("\n")[0] else ","
+        reader = csv.reader(f, delimiter=delimiter)
+        header = [value.strip().lower() for value in next(reader, [])]
+        for row in reader:
+            if not any(value.strip() for value in row):
+                continue
+            packing_list.rows_read += 1
+            values = {name: value.strip() for name, value in zip(header, row)}
+            try:
+                title, item = _read_row(values, lookup)
+            except ValueError as e:
+                packing_list.rejected.append((reader.line_num, str(e)))
+                continue
+            packing_list.items.setdefault(title, []).append(item)
+    return packing_list
+
+def get_import_changes(stores: dict[str, InventoryStore], packing_list: PackingList) -> list[tuple[str, Item, int]]:
+    """Returns (title, item, qty already in stock) for every item of a packing list, without changing the stores.
+
+    The qty in stock includes earlier rows of the same lot, so the preview
+    matches what importing them one after another does.
+    """
+    changes = []
+    for title, items in packing_list.items.items():
+        store = stores[title]
+        pending: dict[tuple, int] = {}
+        for item in items:
+            key = store.schema.get_lot_key(item)
+            existing = store.inventory.get(key)
+            in_stock = pending.get(key, existing.qty if existing is not None else 0)
+            changes.append((title, item, in_stock))
+            pending[key] = in_stock + item.qty
+    return changes
@@ -0,0 +1,49 @@
+from PyQt6.QtWidgets import (
+    QDialog, QDialogButtonBox, QHeaderView, QLabel, QTableWidget, QTableWidgetItem, QVBoxLayout
+)
+from baseItem import Item
+from packingList import PackingList
+
+class PackingListDialog(QDialog):
+    """Previews every change an imported packing list makes, before any of them is applied."""
+    header_labels = ["Category", "REF", "LOT", "Expiry", "Qty", "In Stock", "After Import"]
+
+    def __init__(self, packing_list: PackingList, changes: list[tuple[str, Item, int]], parent=None, max_rejected_rows: int = 10):
+        super().__init__(parent)
+        self.setWindowTitle("Import Packing List")
+        self.setModal(True)
+        self.resize(900, 500)
+        layout = QVBoxLayout(self)
+
+        new_lots = sum(1 for _, _, in_stock in changes if in_stock == 0)
+        layout.addWidget(QLabel(
+            f"{len(changes)} rows of {packing_list.packing_list_file} will be imported: "
+            f"{new_lots} new lots and {len(changes) - new_lots} added to lots in stock."
+        ))
+
+        self.table = QTableWidget(len(changes), len(self.header_labels))
+        self.table.setHorizontalHeaderLabels(self.header_labels)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        for row, (title, item, in_stock) in enumerate(changes):
+            values = [title, item.ref, item.lot, item.expiry, str(item.qty), str(in_stock), str(in_stock + item.qty)]
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+        layout.addWidget(self.table)
+
+        if packing_list.rejected:
+            lines = [f"{len(packing_list.rejected)} rows will be skipped:"]
+            for line_number, reason in packing_list.rejected[:max_rejected_rows]:
+                lines.append(f"  Line {line_number}: {reason}")
+            if len(packing_list.rejected) > max_rejected_rows:
+                lines.append(f"  ...and {len(packing_list.rejected) - max_rejected_rows} more")
+            rejected_label = QLabel("\n".join(lines))
+            rejected_label.setWordWrap(True)
+            layout.addWidget(rejected_label)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        button_box.button(QDialogButtonBox.StandardButton.Ok).setText("Import")
+        button_box.button(QDialogButtonBox.StandardButton.Ok).setEnabled(bool(changes))
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
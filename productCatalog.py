@@ -0,0 +1,75 @@
+import json
+import os
+from itemCategories import CATEGORIES
+
+CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Inventory", "product_catalog.json")
+
+def get_levels(title: str) -> list[str]:
+    """Returns the attributes a category's products are described by, in cascade order (brand first, no sn)."""
+    return [name for name in CATEGORIES[title].attributes if name != "sn"]
+
+class CatalogNode:
+    """An option of a cascade: the options offered under it, by value, and the REF of the product it completes."""
+    __slots__ = ("children", "ref")
+
+    def __init__(self):
+        self.children: dict[str, CatalogNode] = {}
+        self.ref: str | None = None
+
+class ProductCatalog:
+    """Prefix tree of the products of each category, keyed by their descriptive attributes in order.
+
+    A path from a category's root spells a product, e.g. brand, type,
+    platform, width then length for implants, so the options under any
+    selection are one dict lookup away. Options keep the order of the
+    catalog file; a node without options leaves the remaining attributes
+    to free text.
+    """
+    def __init__(self):
+        self.roots: dict[str, CatalogNode] = {title: CatalogNode() for title in CATEGORIES}
+
+    @classmethod
+    def load(cls, catalog_file: str) -> "ProductCatalog":
+        """Reads a catalog file, returning an empty catalog if it does not exist.
+
+        The file maps each category title to nested {value: options} objects
+        following the category's attributes, ending in the product's REF, or
+        null if it is not known, e.g. {"Cover Screws": {"Nobel": {"NP": null}}}.
+        """
+        catalog = cls()
+        if not os.path.exists(catalog_file):
+            return catalog
+        with open(catalog_file, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        for title, options in entries.items():
+            if title not in CATEGORIES:
+                raise ValueError(f"Unknown category {title!r} in {catalog_file}")
+            catalog._add_options(title, catalog.roots[title], options, [])
+        return catalog
+
+    def _add_options(self, title: str, node: CatalogNode, options: dict, path: list[str]):
+        levels = get_levels(title)
+        if len(path) == len(levels):
+            raise ValueError(f"{title} {' '.join(path)} has more attributes than {', '.join(levels)}")
+        for value, child_options in options.items():
+            child = node.children[value] = CatalogNode()
+            if isinstance(child_options, dict):
+                self._add_options(title, child, child_options, path + [value])
+            elif child_options is not None:
+                if len(path) + 1 != len(levels):
+                    raise ValueError(f"{title} {' '.join(path + [value])} has a REF but is missing its {', '.join(levels[len(path) + 1:])}")
+                child.ref = str(child_options)
+
+    def get_root(self, title: str) -> CatalogNode:
+        return self.roots[title]
+
+_catalog: ProductCatalog | None = None
+
+def get_catalog() -> ProductCatalog:
+    """Returns the product catalog, reading the catalog file the first time."""
+    global _catalog
+    if _catalog is None:
+        # An unreadable file leaves an empty catalog, so its error is only raised once
+        _catalog = ProductCatalog()
+        _catalog = ProductCatalog.load(CATALOG_FILE)
+    return _catalog
@@ -0,0 +1,150 @@
+import heapq
+from baseItem import Item
+from inventoryStore import InventoryStore, LotListener
+
+# Terms shorter than this are matched by prefix, longer queries by the trigrams they contain
+GRAM_LENGTH = 3
+# Marks prefix grams, so "^ab" (terms starting with "ab") cannot collide with the trigram "ab"
+PREFIX_MARK = "^"
+
+def _get_terms(store: InventoryStore, item: Item) -> set[str]:
+    # The searchable words of a lot: its REF, LOT, SN and descriptive attributes
+    terms = set()
+    for value in (*store.schema.get_attributes(item), item.ref, item.lot):
+        for word in str(value).lower().split():
+            terms.add(word)
+    return terms
+
+def _get_grams(term: str) -> list[str]:
+    # Every short prefix of a term, and every trigram in it
+    grams = [PREFIX_MARK + term[:length] for length in range(1, min(len(term), GRAM_LENGTH - 1) + 1)]
+    grams.extend(term[i:i + GRAM_LENGTH] for i in range(len(term) - GRAM_LENGTH + 1))
+    return grams
+
+class SearchIndex(LotListener):
+    """Inverted index over the lots of several stores, for search-as-you-type across categories.
+
+    Lots are documents keyed by (category, lot key) and indexed under the
+    words of their REF, LOT, SN and descriptive attributes. Words are found
+    through a gram index: one or two letters match the start of a word,
+    anything longer matches anywhere in it through the trigrams it
+    contains. The index follows lot additions and removals as they happen;
+    a store that was (re)loaded is indexed again on the next search.
+    """
+    def __init__(self, stores: dict[str, InventoryStore]):
+        self.stores = stores
+        self._titles = {id(store): title for title, store in stores.items()}
+        # word -> documents containing it, and gram -> words containing it
+        self._documents: dict[str, set[tuple[str, tuple]]] = {}
+        self._words: dict[str, set[str]] = {}
+        # Stores whose lots changed wholesale since they were last indexed
+        self._stale: set[str] = set(stores)
+        for store in stores.values():
+            store.lot_listeners.append(self)
+
+    def _add(self, title: str, store: InventoryStore, key: tuple, item: Item):
+        document = (title, key)
+        for term in _get_terms(store, item):
+            documents = self._documents.get(term)
+            if documents is None:
+                documents = self._documents[term] = set()
+                for gram in _get_grams(term):
+                    self._words.setdefault(gram, set()).add(term)
+            documents.add(document)
+
+    def _remove(self, title: str, store: InventoryStore, key: tuple, item: Item):
+        document = (title, key)
+        for term in _get_terms(store, item):
+            documents = self._documents.get(term)
+            if documents is None:
+                continue
+            documents.discard(document)
+            if not documents:
+                del self._documents[term]
+                for gram in _get_grams(term):
+                    words = self._words[gram]
+                    words.discard(term)
+                    if not words:
+                        del self._words[gram]
+
+    def lot_added(self, store: InventoryStore, key: tuple, item: Item):
+        title = self._titles[id(store)]
+        if title not in self._stale:
+            self._add(title, store, key, item)
+
+    def lot_removed(self, store: InventoryStore, key: tuple, item: Item):
+        title = self._titles[id(store)]
+        if title not in self._stale:
+            self._remove(title, store, key, item)
+
+    def lots_reset(self, store: InventoryStore):
+        self._stale.add(self._titles[id(store)])
+
+    def _reindex(self, title: str):
+        # Drops every document of the category and indexes its current lots
+        for term in list(self._documents):
+            documents = self._documents[term]
+            stale = {document for document in documents if document[0] == title}
+            if stale:
+                documents -= stale
+                if not documents:
+                    del self._documents[term]
+                    for gram in _get_grams(term):
+                        words = self._words[gram]
+                        words.discard(term)
+                        if not words:
+                            del self._words[gram]
+        store = self.stores[title]
+        for key, item in store.inventory.items():
+            self._add(title, store, key, item)
+        self._stale.discard(title)
+
+    def _match_word(self, word: str) -> set[tuple[str, tuple]]:
+        # Documents with a word starting with (if short) or containing the query word
+        if len(word) < GRAM_LENGTH:
+            terms = self._words.get(PREFIX_MARK + word, set())
+        else:
+            grams = _get_grams(word)[GRAM_LENGTH - 1:]
+            terms = None
+            for gram in sorted(grams, key=lambda gram: len(self._words.get(gram, ()))):
+                words = self._words.get(gram)
+                if not words:
+                    return set()
+                terms = set(words) if terms is None else terms & words
+                if not terms:
+                    return set()
+            # Trigrams can all occur without the word itself, e.g. "abcab" for "cabc"
+            terms = {term for term in terms if word in term}
+        documents = set()
+        for term in terms:
+            documents |= self._documents[term]
+        return documents
+
+    def search(self, query: str, limit: int = 200) -> tuple[list[tuple[str, Item]], int]:
+        """Returns up to limit (category, lot) hits having every word of the query, and the total number of hits.
+
+        Hits are ordered by category, then by lot key.
+        """
+        for title in list(self._stale):
+            if self.stores[title].loaded:
+                self._reindex(title)
+        words = query.lower().split()
+        if not words:
+            return [], 0
+        # Intersect the rarest matches first
+        matches = sorted((self._match_word(word) for word in words), key=len)
+        documents = matches[0]
+        for match in matches[1:]:
+            documents = documents & match
+            if not documents:
+                break
+        keys_by_title: dict[str, list[tuple]] = {title: [] for title in self.stores}
+        for title, key in documents:
+            keys_by_title[title].append(key)
+        hits = []
+        for title, keys in keys_by_title.items():
+            if len(hits) >= limit:
+                break
+            inventory = self.stores[title].inventory
+            hits.extend((title, inventory[key]) for key in heapq.nsmallest(limit - len(hits), keys))
+        return hits, len(documents)
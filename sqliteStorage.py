@@ -0,0 +1,170 @@
+import os
+import sqlite3
+import sys
+import threading
+from typing import Iterable, Iterator
+from baseItem import Item
+from itemSchema import ItemSchema
+from storage import (
+    LOAD_BATCH_SIZE, InventoryStorage, LoadReport,
+    get_csv_row, read_csv_items, write_csv_rows
+)
+
+# Columns that get an index when a category has them, for point lookups and expiry queries
+INDEXED_COLUMNS = ["ref", "lot", "sn", "expiry"]
+# Seconds a connection waits for another one's write to finish, e.g. a save committing while
+# an inventory loads, before failing with "database is locked"
+BUSY_TIMEOUT = 300
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+class InventoryDatabase:
+    """SQLite database shared by the inventories, with one table of lots per category.
+
+    It uses SQLite's default rollback journal, as WAL mode does not work on
+    network filesystems, so the database can be kept on a shared drive.
+    """
+    def __init__(self, database_file: str):
+        self.database_file = database_file
+        # First-time CSV imports run one at a time, so loading workers do not wait on each other's writes
+        self.import_lock = threading.Lock()
+        self.connection = self.connect()
+        # Also switches back a database left in WAL mode, which is stored in the file
+        self.connection.execute("PRAGMA journal_mode=DELETE")
+
+    def connect(self) -> sqlite3.Connection:
+        """Opens another connection to the database, e.g. for a worker thread."""
+        return sqlite3.connect(self.database_file, timeout=BUSY_TIMEOUT)
+
+    def close(self):
+        self.connection.close()
+
+class SqliteStorage(InventoryStorage):
+    """Keeps an inventory in a table of an InventoryDatabase.
+
+    Every action is committed as one transaction that only touches the lots
+    it changed. The table is created and filled from the inventory's CSV
+    file in one transaction on the first load, so an interrupted import is
+    retried. Saving also rewrites the CSV file, which keeps it current for
+    anything still reading it.
+    """
+    def __init__(self, database: InventoryDatabase, inventory_file: str, schema: ItemSchema, ItemClass: type[Item]):
+        super().__init__(inventory_file, schema, ItemClass)
+        self.database = database
+        self.connection = database.connection
+        self.location = database.database_file
+        self.table = os.path.splitext(os.path.basename(inventory_file))[0]
+        self._columns = schema.attributes + ["ref", "lot", "expiry", "qty"]
+        self._key_columns = self._columns[:-1]
+        # Whether the table missed changes since the last save, so it has to be rewritten
+        self._stale = False
+
+        table = _quote(self.table)
+        columns = ", ".join(_quote(column) for column in self._columns)
+        key_columns = ", ".join(_quote(column) for column in self._key_columns)
+        self._select_sql = f"SELECT {columns} FROM {table}"
+        self._upsert_sql = (
+            f"INSERT INTO {table} ({columns}) VALUES ({', '.join('?' * len(self._columns))}) "
+            f"ON CONFLICT ({key_columns}) DO UPDATE SET qty = excluded.qty"
+        )
+        # Rows of the same lot in an imported file are merged, as on load
+        self._import_sql = (
+            f"INSERT INTO {table} ({columns}) VALUES ({', '.join('?' * len(self._columns))}) "
+            f"ON CONFLICT ({key_columns}) DO UPDATE SET qty = qty + excluded.qty"
+        )
+        self._delete_sql = f"DELETE FROM {table} WHERE " + " AND ".join(
+            f"{_quote(column)} = ?" for column in self._key_columns
+        )
+        # Whether the table is known to exist, so later loads skip the check
+        self._created = False
+
+    def _create_table(self, connection: sqlite3.Connection, report: LoadReport):
+        # Creates the table and carries over the existing CSV file in one transaction, so a
+        # failed or interrupted import leaves no table behind and is retried on the next load
+        connection.execute("BEGIN IMMEDIATE")
+        with connection:
+            exists = connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (self.table,)
+            ).fetchone() is not None
+            if exists:
+                return
+            column_types = {"qty": "INTEGER NOT NULL"}
+            connection.execute(
+                f"CREATE TABLE {_quote(self.table)} ("
+                + ", ".join(f"{_quote(column)} {column_types.get(column, 'TEXT NOT NULL')}" for column in self._columns)
+                + f", PRIMARY KEY ({', '.join(_quote(column) for column in self._key_columns)}))"
+            )
+            for column in INDEXED_COLUMNS:
+                if column in self._columns:
+                    connection.execute(
+                        f"CREATE INDEX {_quote(f'{self.table}_{column}')} ON {_quote(self.table)} ({_quote(column)})"
+                    )
+            if os.path.exists(self.inventory_file):
+                imported = LoadReport(self.inventory_file)
+                for batch in read_csv_items(self.inventory_file, self.schema, self.ItemClass, imported):
+                    connection.executemany(self._import_sql, (get_csv_row(self.schema, item) for item in batch))
+                # The imported rows are counted as they are read back from the table
+                report.rows_read += len(imported.rejected)
+                report.rejected.extend(imported.rejected)
+
+    def _make_item(self, row: tuple) -> Item:
+        # Descriptive columns repeat across lots, so share one string per value
+        args = {name: sys.intern(value) for name, value in zip(self.schema.attributes, row)}
+        return self.ItemClass(
+            **args,
+            ref=sys.intern(row[-4]),
+            lot=row[-3],
+            expiry=row[-2],
+            qty=row[-1]
+        )
+
+    def load(self, report: LoadReport) -> Iterator[list[Item]]:
+        # Loads may run on a worker thread, which cannot share the GUI thread's connection
+        connection = self.database.connect()
+        try:
+            if not self._created:
+                with self.database.import_lock:
+                    self._create_table(connection, report)
+                self._created = True
+            cursor = connection.execute(f"{self._select_sql} ORDER BY rowid")
+            while True:
+                rows = cursor.fetchmany(LOAD_BATCH_SIZE)
+                if not rows:
+                    break
+                report.rows_read += len(rows)
+                yield [self._make_item(row) for row in rows]
+        finally:
+            connection.close()
+
+    def record(self, op: str, item: Item):
+        if self._stale:
+            return
+        try:
+            if op == "del":
+                self.connection.execute(self._delete_sql, get_csv_row(self.schema, item)[:-1])
+            else:
+                self.connection.execute(self._upsert_sql, get_csv_row(self.schema, item))
+        except sqlite3.Error:
+            # Undo the rest of the action too, the next save rewrites the table
+            self.connection.rollback()
+            self._stale = True
+            raise
+
+    def commit(self, items: Iterable[Item]) -> bool:
+        if self._stale:
+            return False
+        self.connection.commit()
+        return True
+
+    def write_temp_file(self, items: Iterable[Item]) -> str:
+        items = list(items)
+        if self._stale:
+            with self.connection:
+                self.connection.execute(f"DELETE FROM {_quote(self.table)}")
+                self.connection.executemany(self._upsert_sql, (get_csv_row(self.schema, item) for item in items))
+            self._stale = False
+        else:
+            self.connection.commit()
+        # The CSV file is rewritten as well, it is only read again if the table is lost
+        return write_csv_rows(self.inventory_file, self.schema, (get_csv_row(self.schema, item) for item in items))
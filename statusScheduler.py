@@ -0,0 +1,38 @@
+from datetime import date, datetime, time, timedelta
+from PyQt6.QtCore import QObject, QTimer
+from inventoryStore import InventoryStore
+
+# Margin after midnight, so a timer that fires slightly early still sees the new date
+WAKE_DELAY_SECONDS = 1
+
+class StatusScheduler(QObject):
+    """Re-evaluates the stores' expiry statuses when the date changes, e.g. while left open overnight.
+
+    Statuses only change with the date at midnight, so the timer sleeps until
+    the next one. Each store then updates just the groups whose most recent
+    expiry crossed a threshold, found through its group expiry index.
+    """
+    def __init__(self, stores: list[InventoryStore], parent=None):
+        super().__init__(parent)
+        self.stores = stores
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.update_statuses)
+
+    def start(self):
+        self._schedule()
+
+    def stop(self):
+        self._timer.stop()
+
+    def _schedule(self):
+        now = datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), time())
+        self._timer.start(int(((midnight - now).total_seconds() + WAKE_DELAY_SECONDS) * 1000))
+
+    def update_statuses(self) -> int:
+        """Brings every store up to today's date and returns how many groups changed status."""
+        today = date.today().toordinal()
+        changed = sum(store.update_today(today) for store in self.stores)
+        self._schedule()
+        return changed
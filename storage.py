@@ -0,0 +1,421 @@
+import csv
+import json
+import os
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, Iterator
+from baseItem import Item, parse_expiry
+from itemSchema import ItemSchema
+
+LOAD_BATCH_SIZE = 1000
+# Journals are folded back into their inventory file once they hold this many entries
+JOURNAL_COMPACTION_ENTRIES = 500
+# Compactions write inventory files one at a time, off the GUI thread
+_compaction_executor = ThreadPoolExecutor(max_workers=1)
+
+class LoadReport:
+    """Summary of loading an inventory file: rows read, lots merged and rows rejected."""
+    def __init__(self, inventory_file: str):
+        self.inventory_file = inventory_file
+        self.rows_read = 0
+        self.merged = 0
+        # Journal entries applied on top of the inventory file
+        self.replayed = 0
+        # Why the inventory could not be loaded, if it could not
+        self.error: Exception | None = None
+        # (line number, reason) for every row that could not be loaded
+        self.rejected: list[tuple[int, str]] = []
+
+    @property
+    def loaded(self) -> int:
+        return self.rows_read - len(self.rejected)
+
+    def __str__(self):
+        return (
+            f"{self.inventory_file}: {self.rows_read} rows read, "
+            f"{self.merged} merged into existing lots, {len(self.rejected)} rejected, "
+            f"{self.replayed} journal entries replayed"
+        )
+
+def _get_column_indexes(row: list[str], names: list[str], schema: ItemSchema) -> list[int] | None:
+    # Maps each attribute to its column if the row is a header, matching either the
+    # attribute name (e.g. "type_") or its header label (e.g. "Type"), case-insensitively
+    columns = {value.strip().lower(): i for i, value in enumerate(row)}
+    indexes = []
+    for name in names:
+        index = columns.get(name.lower())
+        if index is None:
+            index = columns.get(schema.fields_by_name[name].header.lower())
+        if index is None:
+            return None
+        indexes.append(index)
+    return indexes
+
+def parse_csv_row(schema: ItemSchema, ItemClass: type[Item], values: list[str]) -> Item:
+    """Builds an item from the values of a row in column order, raising ValueError if any is invalid."""
+    try:
+        expiry = parse_expiry(values[-2])
+    except ValueError:
+        raise ValueError(f"invalid expiry {values[-2]!r}") from None
+    try:
+        qty = int(values[-1])
+    except ValueError:
+        qty = -1
+    if qty < 0:
+        raise ValueError(f"invalid qty {values[-1]!r}")
+
+    # Descriptive columns repeat across lots, so share one string per value
+    args = {name: sys.intern(value) for name, value in zip(schema.attributes, values)}
+    return ItemClass(
+        **args,
+        ref=sys.intern(values[-4]),
+        lot=values[-3],
+        expiry=expiry,
+        qty=qty
+    )
+
+def read_csv_items(
+        inventory_file: str,
+        schema: ItemSchema,
+        ItemClass: type[Item],
+        report: LoadReport,
+        batch_size: int = LOAD_BATCH_SIZE
+    ) -> Iterator[list[Item]]:
+    """Streams the items of a CSV inventory file in batches, recording rejected rows in the report."""
+    names = schema.attributes + ["ref", "lot", "expiry", "qty"]
+    with open(inventory_file, "r", newline="") as f:
+        reader = csv.reader(f)
+        indexes = None
+        width = len(names)
+        batch = []
+        for row in reader:
+            # Skip empty rows
+            if not any(value.strip() for value in row):
+                continue
+            if indexes is None:
+                indexes = _get_column_indexes(row, names, schema)
+                if indexes is not None:
+                    width = len(row)
+                    continue
+                # No header row, so expect the columns in the order they are saved in
+                indexes = list(range(len(names)))
+
+            report.rows_read += 1
+            if len(row) != width:
+                report.rejected.append((reader.line_num, f"expected {width} columns, found {len(row)}"))
+                continue
+            values = [row[i].strip() for i in indexes]
+            try:
+                batch.append(parse_csv_row(schema, ItemClass, values))
+            except ValueError as e:
+                report.rejected.append((reader.line_num, str(e)))
+                continue
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+def _fsync_directory(directory: str):
+    # Persists renames within a directory; not every platform (e.g. Windows) supports this
+    try:
+        fd = os.open(directory or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def get_csv_row(schema: ItemSchema, item: Item) -> list:
+    """Returns the values of an item in the column order of the inventory files."""
+    return list(schema.get_attributes(item)) + [item.ref, item.lot, item.expiry, item.qty]
+
+def write_csv_rows(inventory_file: str, schema: ItemSchema, rows) -> str:
+    """Writes rows to a fsynced temporary file next to the inventory file and returns its path."""
+    temp_file = f"{inventory_file}.tmp"
+    with open(temp_file, "w", newline="") as f:
+        writer = csv.writer(f)
+        # Write header
+        writer.writerow(schema.attributes + ["REF", "LOT", "Expiry", "Qty"])
+        writer.writerows(rows)
+        f.flush()
+        os.fsync(f.fileno())
+    return temp_file
+
+def replace_file(temp_file: str, inventory_file: str):
+    """Atomically replaces a file with a fully written temporary file."""
+    os.replace(temp_file, inventory_file)
+    _fsync_directory(os.path.dirname(inventory_file))
+
+class SaveTransaction:
+    """Replaces several files all-or-nothing.
+
+    Every file is first written to a temporary file. The manifest listing the
+    pending renames is only written once all of them are complete, so after a
+    crash recover() either finishes every rename (manifest present) or the old
+    files are left untouched (no manifest).
+    """
+    def __init__(self, manifest_file: str):
+        self.manifest_file = manifest_file
+        self._pending: list[tuple[str, str]] = []
+        self._manifest_written = False
+
+    def add(self, temp_file: str, inventory_file: str):
+        self._pending.append((temp_file, inventory_file))
+
+    def commit(self):
+        if not self._pending:
+            return
+        directory = os.path.dirname(self.manifest_file)
+        # Paths are stored relative to the manifest so a shared drive can be mounted anywhere
+        with open(self.manifest_file, "w") as f:
+            json.dump([
+                [os.path.relpath(temp_file, directory), os.path.relpath(inventory_file, directory)]
+                for temp_file, inventory_file in self._pending
+            ], f)
+            f.flush()
+            os.fsync(f.fileno())
+        self._manifest_written = True
+        _fsync_directory(directory)
+        for temp_file, inventory_file in self._pending:
+            replace_file(temp_file, inventory_file)
+        os.remove(self.manifest_file)
+        _fsync_directory(directory)
+
+    def abort(self):
+        """Discards the temporary files, unless the renames are already committed to."""
+        if self._manifest_written:
+            return
+        for temp_file, _ in self._pending:
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+
+    @staticmethod
+    def recover(manifest_file: str) -> list[str]:
+        """Finishes a save interrupted after its manifest was written, returning the files replaced."""
+        if not os.path.exists(manifest_file):
+            return []
+        directory = os.path.dirname(manifest_file)
+        with open(manifest_file, "r") as f:
+            pending = json.load(f)
+        replaced = []
+        for temp_file, inventory_file in pending:
+            temp_file = os.path.join(directory, temp_file)
+            inventory_file = os.path.join(directory, inventory_file)
+            # Files already renamed before the interruption have no temporary file left
+            if os.path.exists(temp_file):
+                replace_file(temp_file, inventory_file)
+                replaced.append(inventory_file)
+        os.remove(manifest_file)
+        _fsync_directory(directory)
+        return replaced
+
+class Journal:
+    """Append-only log of the lot changes made since the inventory file was last written.
+
+    Each entry is an op ("set" or "del") followed by the lot's row with its
+    qty after the change. Entries hold absolute values, so replaying some of
+    them twice (e.g. after a compaction was interrupted) gives the same result.
+    Entries are flushed to the OS as they are written and fsynced in batches
+    by sync().
+    """
+    def __init__(self, journal_file: str):
+        self.journal_file = journal_file
+        # Entries being folded into the inventory file by a compaction
+        self.compacting_file = f"{journal_file}.old"
+        self.entry_count = 0
+        self._file = None
+        self._writer = None
+        self._unsynced = False
+
+    def append(self, op: str, row: list):
+        if self._file is None:
+            # Terminate an entry left incomplete by a crash so the next one stays readable
+            incomplete = False
+            if os.path.exists(self.journal_file) and os.path.getsize(self.journal_file) > 0:
+                with open(self.journal_file, "rb") as f:
+                    f.seek(-1, os.SEEK_END)
+                    incomplete = f.read(1) != b"\n"
+            self._file = open(self.journal_file, "a", newline="")
+            self._writer = csv.writer(self._file)
+            if incomplete:
+                self._file.write(self._writer.dialect.lineterminator)
+        self._writer.writerow([op] + row)
+        self._file.flush()
+        self.entry_count += 1
+        self._unsynced = True
+
+    def sync(self):
+        """Makes every entry written so far durable."""
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = False
+
+    def read_entries(self) -> Iterator[tuple[str, list[str]]]:
+        """Yields the (op, row) entries not yet folded into the inventory file, oldest first."""
+        for journal_file in (self.compacting_file, self.journal_file):
+            if not os.path.exists(journal_file):
+                continue
+            with open(journal_file, "r", newline="") as f:
+                for row in csv.reader(f):
+                    if row and row[0] in ("set", "del"):
+                        yield row[0], row[1:]
+
+    def rotate(self):
+        """Moves the current entries aside for compaction, so new entries start a new file."""
+        self.close()
+        if os.path.exists(self.journal_file):
+            if os.path.exists(self.compacting_file):
+                # An earlier compaction did not finish, so it has to fold in both files
+                with open(self.compacting_file, "a", newline="") as dst, open(self.journal_file, "r", newline="") as src:
+                    dst.write(src.read())
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                os.remove(self.journal_file)
+            else:
+                os.replace(self.journal_file, self.compacting_file)
+            _fsync_directory(os.path.dirname(self.journal_file))
+        self.entry_count = 0
+
+    def finish_compaction(self):
+        """Drops the entries of a compaction once the inventory file holding them is written."""
+        if os.path.exists(self.compacting_file):
+            os.remove(self.compacting_file)
+
+    def discard(self):
+        """Drops every entry, e.g. once the whole inventory has been saved."""
+        self.close()
+        for journal_file in (self.compacting_file, self.journal_file):
+            if os.path.exists(journal_file):
+                os.remove(journal_file)
+        self.entry_count = 0
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+class InventoryStorage:
+    """Where an inventory keeps its lots between sessions.
+
+    The inventory records every lot change as it is made and commits them
+    once per action; the backend decides how much of that reaches disk
+    before the next save.
+    """
+    def __init__(self, inventory_file: str, schema: ItemSchema, ItemClass: type[Item]):
+        self.inventory_file = inventory_file
+        self.schema = schema
+        self.ItemClass = ItemClass
+        # Shown to the user as where the inventory is saved
+        self.location = inventory_file
+
+    def load(self, report: LoadReport) -> Iterator[list[Item]]:
+        """Streams the stored items in batches, recording rejected ones in the report."""
+        raise NotImplementedError
+
+    def read_changes(self) -> Iterator[tuple[str, Item]]:
+        """Yields the ("set" or "del", item) changes to apply on top of the loaded items."""
+        return iter(())
+
+    def record(self, op: str, item: Item):
+        """Records the new state of a lot: "set" for its current qty or "del" once it is removed."""
+        raise NotImplementedError
+
+    def commit(self, items: Iterable[Item]) -> bool:
+        """Makes the recorded changes durable, returning whether the stored lots now match items."""
+        raise NotImplementedError
+
+    def wait(self):
+        """Blocks until background work is done, raising its error if it failed."""
+
+    def write_temp_file(self, items: Iterable[Item]) -> str | None:
+        """Writes items to a temporary file to replace inventory_file with, or stores them directly and returns None."""
+        raise NotImplementedError
+
+    def saved(self):
+        """Called once the items passed to write_temp_file are in place."""
+
+    def close(self):
+        pass
+
+class CsvStorage(InventoryStorage):
+    """Keeps an inventory in a CSV file, journaling changes made since it was written."""
+    def __init__(
+            self,
+            inventory_file: str,
+            schema: ItemSchema,
+            ItemClass: type[Item],
+            compaction_entries: int = JOURNAL_COMPACTION_ENTRIES
+        ):
+        super().__init__(inventory_file, schema, ItemClass)
+        self.journal = Journal(f"{inventory_file}.journal")
+        self.compaction_entries = compaction_entries
+        self._compaction: Future | None = None
+
+    def load(self, report: LoadReport) -> Iterator[list[Item]]:
+        return read_csv_items(self.inventory_file, self.schema, self.ItemClass, report)
+
+    def read_changes(self) -> Iterator[tuple[str, Item]]:
+        width = len(self.schema.attributes) + 4
+        self.journal.entry_count = 0
+        for op, row in self.journal.read_entries():
+            self.journal.entry_count += 1
+            # Skip entries torn by a crash
+            if len(row) != width:
+                continue
+            try:
+                yield op, parse_csv_row(self.schema, self.ItemClass, row)
+            except ValueError:
+                continue
+
+    def record(self, op: str, item: Item):
+        self.journal.append(op, get_csv_row(self.schema, item))
+
+    def commit(self, items: Iterable[Item]) -> bool:
+        self.journal.sync()
+        if self.journal.entry_count >= self.compaction_entries:
+            self.compact(items)
+            return True
+        return False
+
+    def compact(self, items: Iterable[Item]):
+        """Folds the journal into the inventory file in the background."""
+        self.wait()
+        self.journal.rotate()
+        # Snapshot the rows here, as the items keep changing while the file is written
+        rows = [get_csv_row(self.schema, item) for item in items]
+        self._compaction = _compaction_executor.submit(self._write_compacted_file, rows)
+
+    def _write_compacted_file(self, rows: list[list]):
+        # Runs on the compaction thread
+        replace_file(write_csv_rows(self.inventory_file, self.schema, rows), self.inventory_file)
+        self.journal.finish_compaction()
+
+    def wait(self):
+        if self._compaction is None:
+            return
+        compaction, self._compaction = self._compaction, None
+        compaction.result()
+
+    def write_temp_file(self, items: Iterable[Item]) -> str:
+        # A running compaction writes the same temporary file
+        self.wait()
+        return write_csv_rows(
+            self.inventory_file,
+            self.schema,
+            (get_csv_row(self.schema, item) for item in items)
+        )
+
+    def saved(self):
+        # Journal entries are idempotent, so a crash before this only replays them onto the same lots
+        self.journal.discard()
+
+    def close(self):
+        self.journal.close()
@@ -0,0 +1,13 @@
+import os
+import sys
+
+# Dialogs are built without a display, and modules are imported from the repository root
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from PyQt6.QtWidgets import QApplication
+
+@pytest.fixture(scope="session")
+def app() -> QApplication:
+    return QApplication.instance() or QApplication([])
@@ -0,0 +1,70 @@
+import json
+import pytest
+from PyQt6.QtWidgets import QInputDialog
+import productCatalog
+from coverScrews import AddCoverScrewDialog
+from implants import AddImplantDialog
+from productCatalog import ProductCatalog
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch) -> ProductCatalog:
+    catalog_file = tmp_path / "product_catalog.json"
+    catalog_file.write_text(json.dumps({
+        "Implants": {"Nobel": {"NobelActive": {"NP": {"3.5": {"10.0": "34120", "13": None}}, "RP": {"4.3": {"10.0": "34140"}}}}},
+    }))
+    catalog = ProductCatalog.load(str(catalog_file))
+    monkeypatch.setattr(productCatalog, "_catalog", catalog)
+    return catalog
+
+def test_complete_selection_fills_ref(app, catalog):
+    dialog = AddImplantDialog()
+    dialog.type_input.setCurrentText("NobelActive")
+    dialog.platform_input.setCurrentText("NP")
+    dialog.width_input.setCurrentText("3.5")
+    dialog.length_input.setCurrentText("10.0")
+    assert dialog.ref_input.text() == "34120"
+    # Changing an earlier selection re-selects down the cascade
+    dialog.platform_input.setCurrentText("RP")
+    assert dialog.ref_input.text() == "34140"
+
+def test_selection_without_ref_clears_filled_ref(app, catalog):
+    dialog = AddImplantDialog()
+    dialog.platform_input.setCurrentText("NP")
+    dialog.length_input.setCurrentText("10.0")
+    assert dialog.ref_input.text() == "34120"
+    dialog.length_input.setCurrentText("13")
+    assert dialog.ref_input.text() == ""
+
+def test_typed_ref_is_kept(app, catalog):
+    dialog = AddImplantDialog()
+    dialog.platform_input.setCurrentText("NP")
+    dialog.ref_input.setText("99999")
+    dialog.length_input.setCurrentText("13")
+    dialog.length_input.setCurrentText("10.0")
+    assert dialog.ref_input.text() == "99999"
+
+def test_shipped_catalog_fills_ref(app, monkeypatch):
+    monkeypatch.setattr(productCatalog, "_catalog", ProductCatalog.load(productCatalog.CATALOG_FILE))
+    dialog = AddCoverScrewDialog()
+    dialog.platform_input.setCurrentText("NP")
+    assert dialog.ref_input.text() == "36649"
+    dialog.platform_input.setCurrentText("WP")
+    assert dialog.ref_input.text() == "37812"
+
+@pytest.mark.parametrize("entries", [{}, {"Cover Screws": {"Nobel": {"NP": "36649"}}}])
+def test_uncatalogued_category_is_free_text(app, tmp_path, monkeypatch, entries):
+    catalog_file = tmp_path / "product_catalog.json"
+    catalog_file.write_text(json.dumps(entries))
+    monkeypatch.setattr(productCatalog, "_catalog", ProductCatalog.load(str(catalog_file)))
+    # Offering only "Add another brand..." would ask for a brand as soon as the dialog opens
+    monkeypatch.setattr(QInputDialog, "getText", pytest.fail)
+    dialog = AddImplantDialog()
+    assert dialog.brand_input.isEditable() and dialog.brand_input.count() == 0
+    for name, value in [("type_input", "BLT"), ("platform_input", "RC"), ("width_input", "4.1"), ("length_input", "10")]:
+        getattr(dialog, name).setText(value)
+    # Typing the brand last keeps the attributes already typed
+    dialog.brand_input.setEditText("Straumann")
+    for name, value in [("ref_input", "021.5410"), ("lot_input", "X1"), ("expiry_input", "2030-01-01"), ("qty_input", "2")]:
+        getattr(dialog, name).setText(value)
+    item = dialog.get_data()
+    assert (item.brand, item.type_, item.platform, item.width, item.length, item.ref) == ("Straumann", "BLT", "RC", "4.1", "10", "021.5410")
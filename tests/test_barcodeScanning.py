@@ -0,0 +1,38 @@
+import json
+import pytest
+from barcodeScanning import ProductLookup, read_scan
+from exceptions import UnknownGtinError
+from productCatalog import CATALOG_FILE, ProductCatalog
+
+SCAN = "(01)07332747123456(17)290131(10)13194382"
+
+@pytest.fixture
+def lookup() -> ProductLookup:
+    return ProductLookup.from_catalog(ProductCatalog.load(CATALOG_FILE))
+
+def test_catalog_refs_are_products(lookup):
+    product = lookup.find_ref("Cover Screws", "36649")
+    assert product.attributes == {"brand": "Nobel", "platform": "NP"}
+    assert [product.category for product in lookup.find_refs("300304")] == ["Implants"]
+
+def test_unknown_gtin(lookup):
+    with pytest.raises(UnknownGtinError):
+        read_scan(SCAN, lookup)
+
+def test_linked_gtins_are_saved_and_loaded(lookup, tmp_path):
+    gtin_file = str(tmp_path / "gtins.json")
+    lookup.link_gtin("7332747123456", lookup.find_ref("Cover Screws", "36650"))
+    lookup.save_gtins(gtin_file)
+    with open(gtin_file, "r", encoding="utf-8") as f:
+        assert json.load(f) == {"07332747123456": {"category": "Cover Screws", "ref": "36650"}}
+
+    loaded = ProductLookup.from_catalog(ProductCatalog.load(CATALOG_FILE))
+    loaded.load_gtins(gtin_file)
+    item = read_scan(SCAN, loaded).item
+    assert (item.platform, item.ref, item.lot, item.expiry) == ("RP", "36650", "13194382", "2029-01-31")
+
+def test_gtin_of_uncatalogued_ref(lookup, tmp_path):
+    gtin_file = tmp_path / "gtins.json"
+    gtin_file.write_text(json.dumps({"07332747123456": {"category": "Cover Screws", "ref": "00000"}}))
+    with pytest.raises(ValueError):
+        lookup.load_gtins(str(gtin_file))
@@ -0,0 +1,81 @@
+import pytest
+from baseItem import EditItem, RemovalItem
+from coverScrews import CoverScrewInventory
+from itemCategories import CoverScrew
+
+LOTS = "brand,platform,REF,LOT,Expiry,Qty\nNobel,NP,36649,A1,2030-01-01,2\nNobel,RP,36650,B1,2030-01-01,3\nNobel,WP,37812,C1,2030-01-01,4\n"
+
+@pytest.fixture
+def inventory(app, tmp_path) -> CoverScrewInventory:
+    inventory_file = tmp_path / "cover_screws.csv"
+    inventory_file.write_text(LOTS)
+    inventory = CoverScrewInventory(inventory_file=str(inventory_file))
+    inventory.load_data()
+    inventory.wait_for_storage()
+    yield inventory
+    inventory.wait_for_storage()
+    inventory.store.storage.close()
+
+def _select(inventory: CoverScrewInventory, platform: str):
+    # Shows only one platform's group, and selects it
+    inventory.filter_inputs[inventory.attributes.index("platform")].setText(platform)
+    assert inventory.proxy_model.rowCount() == 1
+    inventory.table.selectRow(0)
+
+def _edited_group(inventory: CoverScrewInventory) -> set[str]:
+    # Opens the Edit dialog, returning the platforms of the lots it offers
+    dialogs = []
+    inventory._exec_dialog = lambda dialog: dialogs.append(dialog) or 0
+    inventory.edit_item()
+    return {item.platform for item in dialogs[0].inventory}
+
+def test_selection_follows_filtered_out_insert(inventory):
+    _select(inventory, "WP")
+    # A group sorting first, which the filter hides, shifts every source row down
+    inventory.store.add_item(CoverScrew(brand="Acme", platform="NP", ref="1", lot="D1", expiry="2030-01-01", qty=1))
+    assert inventory.store.get_group_key(inventory.selected_row) == ("Nobel", "WP")
+    assert _edited_group(inventory) == {"WP"}
+
+def test_selection_follows_filtered_out_removal(inventory):
+    _select(inventory, "WP")
+    lots = inventory.store.get_group_lots(0)
+    # Emptying the hidden first group shifts every source row up
+    inventory.store.remove_items(lots, [RemovalItem(lot.ref, lot.lot, lot.expiry_ordinal, lot.qty, 0) for lot in lots])
+    assert inventory.store.get_group_key(inventory.selected_row) == ("Nobel", "WP")
+    assert _edited_group(inventory) == {"WP"}
+
+def test_no_selection(inventory):
+    assert inventory.selected_row is None
+    assert not inventory.edit_btn.isEnabled()
+    _select(inventory, "RP")
+    assert inventory.edit_btn.isEnabled()
+    inventory.table.clearSelection()
+    assert inventory.selected_row is None
+    assert not inventory.remove_btn.isEnabled()
+
+def test_removing_selected_group_clears_selection(inventory):
+    _select(inventory, "WP")
+    lots = inventory.store.get_group_lots(inventory.selected_row)
+    inventory.store.remove_items(lots, [RemovalItem(lot.ref, lot.lot, lot.expiry_ordinal, lot.qty, 0) for lot in lots])
+    assert inventory.selected_row is None
+    assert not inventory.edit_btn.isEnabled()
+
+def test_qty_edit_keeps_selection(inventory):
+    _select(inventory, "WP")
+    removed = []
+    inventory.table_model.rowsAboutToBeRemoved.connect(lambda *args: removed.append(args))
+    lots = inventory.store.get_group_lots(inventory.selected_row)
+    new = CoverScrew(brand="Nobel", platform="WP", ref="37812", lot="C1", expiry="2030-01-01", qty=9)
+    inventory.store.edit_items(lots, [(EditItem(lots[0], 0), new)])
+    # The group's row is updated in place rather than removed and inserted again
+    assert not removed
+    assert inventory.store.get_group(inventory.selected_row)["total_qty"] == 9
+    assert inventory.edit_btn.isEnabled()
+
+def test_key_edit_moves_lot(inventory):
+    lots = inventory.store.get_group_lots(inventory.store.get_group_row(("Nobel", "WP")))
+    new = CoverScrew(brand="Nobel", platform="RP", ref="36650", lot="B1", expiry="2030-01-01", qty=4)
+    inventory.store.edit_items(lots, [(EditItem(lots[0], 0), new)])
+    # Editing onto an existing lot's key merges into it
+    assert inventory.store.get_group_row(("Nobel", "WP")) is None
+    assert [lot.qty for lot in inventory.store.get_group_lots(inventory.store.get_group_row(("Nobel", "RP")))] == [7]
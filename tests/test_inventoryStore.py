@@ -0,0 +1,95 @@
+from datetime import date, timedelta
+import pytest
+from exceptions import InsufficientStockError
+from inventoryStore import CaseLine, InventoryStore, consume_case
+from itemCategories import CATEGORIES, CoverScrew
+
+def _days(days: int) -> str:
+    return (date.today() + timedelta(days=days)).isoformat()
+
+def _create_store(tmp_path, title: str, rows: list[str]) -> InventoryStore:
+    # A loaded store of a category, from CSV rows after its header
+    category = CATEGORIES[title]
+    inventory_file = tmp_path / f"{title.replace(' ', '_').lower()}.csv"
+    inventory_file.write_text("\n".join([",".join(category.attributes + ["REF", "LOT", "Expiry", "Qty"]), *rows]) + "\n")
+    store = category.create_store(str(inventory_file))
+    store.load()
+    return store
+
+@pytest.fixture
+def stores(tmp_path) -> dict[str, InventoryStore]:
+    stores = {
+        "Cover Screws": _create_store(tmp_path, "Cover Screws", [
+            f"Nobel,NP,36649,EXPIRED,{_days(-10)},2",
+            f"Nobel,NP,36649,SOON,{_days(30)},1",
+            f"Nobel,NP,36649,LATER,{_days(60)},5",
+        ]),
+        "Implants": _create_store(tmp_path, "Implants", [
+            f"Nobel,NobelActive TiUltra,NP,3.5,10.0,34120,A1,{_days(90)},1",
+        ]),
+    }
+    yield stores
+    for store in stores.values():
+        store.wait_for_storage()
+        store.storage.close()
+
+def _lots(store: InventoryStore) -> dict[str, int]:
+    return {lot.lot: lot.qty for lot in store.inventory.values()}
+
+def test_case_skips_expired_lots(stores):
+    picks = consume_case(stores, [CaseLine("Cover Screws", ("Nobel", "NP"), 2)])
+    assert [(lot.lot, take) for lot, take in picks["Cover Screws"]] == [("SOON", 1), ("LATER", 1)]
+    assert _lots(stores["Cover Screws"]) == {"EXPIRED": 2, "LATER": 4}
+
+def test_case_takes_expired_lots_when_asked(stores):
+    consume_case(stores, [CaseLine("Cover Screws", ("Nobel", "NP"), 2)], skip_expired=False)
+    assert _lots(stores["Cover Screws"]) == {"SOON": 1, "LATER": 5}
+
+def test_short_line_leaves_every_store_unchanged(stores):
+    before = {title: _lots(store) for title, store in stores.items()}
+    lines = [
+        CaseLine("Cover Screws", ("Nobel", "NP"), 1),
+        # Only one implant is in stock
+        CaseLine("Implants", ("Nobel", "NobelActive TiUltra", "NP", "3.5", "10.0"), 2),
+    ]
+    with pytest.raises(InsufficientStockError):
+        consume_case(stores, lines)
+    assert {title: _lots(store) for title, store in stores.items()} == before
+    assert not any(store.dirty for store in stores.values())
+
+def test_lines_of_one_group_are_picked_together(stores):
+    # 6 unexpired screws cover either line alone, but not both
+    lines = [CaseLine("Cover Screws", ("Nobel", "NP"), 4), CaseLine("Cover Screws", ("Nobel", "NP"), 3)]
+    with pytest.raises(InsufficientStockError):
+        consume_case(stores, lines)
+    assert _lots(stores["Cover Screws"]) == {"EXPIRED": 2, "SOON": 1, "LATER": 5}
+
+def _picked(picks: list) -> list[tuple[str, int]]:
+    return [(lot.lot, take) for lot, take in picks]
+
+def test_fefo_skips_stale_entries_after_removals_and_re_adds(stores):
+    store = stores["Cover Screws"]
+    # Empties EXPIRED and SOON, then brings both back with later expiries
+    assert _picked(store.remove_fefo(("Nobel", "NP"), 3)) == [("EXPIRED", 2), ("SOON", 1)]
+    store.add_item(CoverScrew(brand="Nobel", platform="NP", ref="36649", lot="SOON", expiry=_days(90), qty=2))
+    store.add_item(CoverScrew(brand="Nobel", platform="NP", ref="36649", lot="EXPIRED", expiry=_days(20), qty=1))
+    assert _picked(store.pick_fefo(("Nobel", "NP"), 8)) == [("EXPIRED", 1), ("LATER", 5), ("SOON", 2)]
+    assert _picked(store.remove_fefo(("Nobel", "NP"), 6)) == [("EXPIRED", 1), ("LATER", 5)]
+    assert _lots(store) == {"SOON": 2}
+    with pytest.raises(InsufficientStockError):
+        store.pick_fefo(("Nobel", "NP"), 3)
+
+def test_fefo_skips_lots_expiring_by_the_given_day(stores):
+    store = stores["Cover Screws"]
+    assert _picked(store.pick_fefo(("Nobel", "NP"), 2, store.today)) == [("SOON", 1), ("LATER", 1)]
+    # Anything expiring within 30 days is skipped too
+    assert _picked(store.pick_fefo(("Nobel", "NP"), 2, store.today + 30)) == [("LATER", 2)]
+    assert _picked(store.pick_fefo(("Nobel", "NP"), 2)) == [("EXPIRED", 2)]
+
+def test_fefo_does_not_count_expired_stock(stores):
+    store = stores["Cover Screws"]
+    # 8 screws in stock, but only 6 unexpired
+    with pytest.raises(InsufficientStockError):
+        store.pick_fefo(("Nobel", "NP"), 7, store.today)
+    assert len(store.pick_fefo(("Nobel", "NP"), 7)) == 3
+    assert _lots(store) == {"EXPIRED": 2, "SOON": 1, "LATER": 5}
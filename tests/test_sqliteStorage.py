@@ -0,0 +1,83 @@
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import sqliteStorage
+from itemCategories import CATEGORIES, CoverScrew
+from inventoryStore import InventoryStore
+from sqliteStorage import InventoryDatabase
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from syntheticData import write_inventory_file
+
+LOTS = "brand,platform,REF,LOT,Expiry,Qty\nNobel,NP,36649,A1,2030-01-01,2\nNobel,RP,36650,B1,2030-01-01,3\nNobel,WP,37812,C1,2030-01-01,4\n"
+
+@pytest.fixture
+def inventory_file(tmp_path) -> str:
+    inventory_file = tmp_path / "cover_screws.csv"
+    inventory_file.write_text(LOTS)
+    return str(inventory_file)
+
+def _open_store(inventory_file: str) -> InventoryStore:
+    # A store on the database next to the inventory file, as a new session would open it
+    database = InventoryDatabase(inventory_file.replace("cover_screws.csv", "inventory.db"))
+    return CATEGORIES["Cover Screws"].create_store(inventory_file, database=database)
+
+def _lots(store: InventoryStore) -> dict[str, int]:
+    return {lot.lot: lot.qty for lot in store.inventory.values()}
+
+def test_first_load_imports_csv(inventory_file):
+    store = _open_store(inventory_file)
+    assert store.load().error is None
+    assert _lots(store) == {"A1": 2, "B1": 3, "C1": 4}
+
+def test_failed_import_is_retried(inventory_file, monkeypatch):
+    read_csv_items = sqliteStorage.read_csv_items
+    def fail_after_first_batch(*args, **kwargs):
+        yield next(read_csv_items(*args, **kwargs))
+        raise OSError("interrupted")
+    monkeypatch.setattr(sqliteStorage, "read_csv_items", fail_after_first_batch)
+    store = _open_store(inventory_file)
+    assert isinstance(store.load().error, OSError)
+    store.storage.database.close()
+
+    monkeypatch.setattr(sqliteStorage, "read_csv_items", read_csv_items)
+    store = _open_store(inventory_file)
+    assert store.load().error is None
+    assert _lots(store) == {"A1": 2, "B1": 3, "C1": 4}
+
+def test_save_rewrites_csv(inventory_file):
+    store = _open_store(inventory_file)
+    store.load()
+    store.add_item(CoverScrew(brand="Nobel", platform="NP", ref="36649", lot="D1", expiry="2031-01-01", qty=5))
+    store.save()
+    with open(inventory_file, "r", newline="") as f:
+        assert {row["LOT"]: int(row["Qty"]) for row in csv.DictReader(f)} == {"A1": 2, "B1": 3, "C1": 4, "D1": 5}
+    store.storage.database.close()
+
+    # The table, not the rewritten file, is what the next session loads
+    store = _open_store(inventory_file)
+    store.load()
+    assert _lots(store) == {"A1": 2, "B1": 3, "C1": 4, "D1": 5}
+
+def test_parallel_first_loads(tmp_path, monkeypatch):
+    # Every category's first load imports its CSV file at once, as the loading workers do
+    read_csv_items = sqliteStorage.read_csv_items
+    def slow_read_csv_items(*args, **kwargs):
+        # Imports outlast the busy timeout, so overlapping ones would fail with "database is locked"
+        time.sleep(0.5)
+        yield from read_csv_items(*args, **kwargs)
+    monkeypatch.setattr(sqliteStorage, "read_csv_items", slow_read_csv_items)
+    monkeypatch.setattr(sqliteStorage, "BUSY_TIMEOUT", 0.2)
+    database = InventoryDatabase(str(tmp_path / "inventory.db"))
+    stores = []
+    for title in CATEGORIES:
+        inventory_file = tmp_path / f"{title.replace(' ', '_').lower()}.csv"
+        write_inventory_file(title, str(inventory_file), 1000)
+        stores.append(CATEGORIES[title].create_store(str(inventory_file), database=database))
+    with ThreadPoolExecutor(max_workers=len(stores)) as executor:
+        reports = list(executor.map(lambda store: store.read_data()[0], stores))
+    assert [report.error for report in reports] == [None] * len(stores)
+    assert all(report.rows_read == 1000 for report in reports)
@@ -0,0 +1,135 @@
+import os
+import pytest
+import storage
+from baseItem import RemovalItem
+from inventoryStore import InventoryStore
+from itemCategories import CATEGORIES, CoverScrew
+from storage import SaveTransaction
+
+LOTS = "brand,platform,REF,LOT,Expiry,Qty\nNobel,NP,36649,A1,2030-01-01,2\nNobel,RP,36650,B1,2030-01-01,3\n"
+
+@pytest.fixture
+def inventory_file(tmp_path) -> str:
+    inventory_file = tmp_path / "cover_screws.csv"
+    inventory_file.write_text(LOTS)
+    return str(inventory_file)
+
+def _open_store(inventory_file: str) -> InventoryStore:
+    store = CATEGORIES["Cover Screws"].create_store(inventory_file)
+    store.load()
+    return store
+
+def _lots(store: InventoryStore) -> dict[str, int]:
+    return {lot.lot: lot.qty for lot in store.inventory.values()}
+
+def _change(store: InventoryStore, lot: str, qty: int):
+    # Adds to a lot of NP cover screws, or takes from it if qty is negative
+    if qty > 0:
+        store.add_item(CoverScrew(brand="Nobel", platform="NP", ref="36649", lot=lot, expiry="2030-01-01", qty=qty))
+    else:
+        lots = store.get_group_lots(store.get_group_row(("Nobel", "NP")))
+        index = [item.lot for item in lots].index(lot)
+        store.remove_items(lots, [RemovalItem("36649", lot, lots[index].expiry_ordinal, -qty, index)])
+
+def _exit_without_saving(store: InventoryStore):
+    store.wait_for_storage()
+    store.storage.close()
+
+def test_unsaved_changes_are_replayed(inventory_file):
+    store = _open_store(inventory_file)
+    _change(store, "A1", 5)
+    _change(store, "C1", 1)
+    _change(store, "A1", -7)
+    _exit_without_saving(store)
+
+    store = _open_store(inventory_file)
+    assert _lots(store) == {"B1": 3, "C1": 1}
+    assert store.dirty
+    # Saving folds the journal into the file
+    store.save()
+    assert not os.path.exists(f"{inventory_file}.journal")
+    _exit_without_saving(store)
+    assert _lots(_open_store(inventory_file)) == {"B1": 3, "C1": 1}
+
+@pytest.mark.parametrize("file_written", [False, True])
+def test_interrupted_compaction_is_replayed(inventory_file, file_written):
+    store = _open_store(inventory_file)
+    _change(store, "A1", 5)
+    _change(store, "C1", 1)
+    # A compaction moves the entries aside, then is interrupted before or after writing the file
+    store.storage.journal.rotate()
+    if file_written:
+        store.storage._write_compacted_file([storage.get_csv_row(store.schema, item) for item in store.inventory.values()])
+        with open(store.storage.journal.compacting_file, "w") as f:
+            f.write("set,Nobel,NP,36649,A1,2030-01-01,7\nset,Nobel,NP,36649,C1,2030-01-01,1\n")
+    _change(store, "C1", 2)
+    _exit_without_saving(store)
+    assert os.path.exists(f"{inventory_file}.journal.old") and os.path.exists(f"{inventory_file}.journal")
+
+    store = _open_store(inventory_file)
+    assert _lots(store) == {"A1": 7, "B1": 3, "C1": 3}
+    # The next compaction folds in both files
+    store.storage.compact(store.inventory.values())
+    store.wait_for_storage()
+    assert not os.path.exists(f"{inventory_file}.journal.old")
+    _exit_without_saving(store)
+    assert _lots(_open_store(inventory_file)) == {"A1": 7, "B1": 3, "C1": 3}
+
+def test_torn_last_entry_is_skipped(inventory_file):
+    store = _open_store(inventory_file)
+    _change(store, "A1", 5)
+    _exit_without_saving(store)
+    # A crash while writing an entry leaves it without its end
+    with open(f"{inventory_file}.journal", "a", newline="") as f:
+        f.write("set,Nobel,NP,36649,C1,20")
+
+    store = _open_store(inventory_file)
+    assert _lots(store) == {"A1": 7, "B1": 3}
+    # Entries written after the torn one stay readable
+    _change(store, "D1", 4)
+    _exit_without_saving(store)
+    assert _lots(_open_store(inventory_file)) == {"A1": 7, "B1": 3, "D1": 4}
+
+def _write_temp_files(tmp_path) -> tuple[list[str], SaveTransaction]:
+    # Two files with their new contents in temporary files, added to a save transaction
+    transaction = SaveTransaction(str(tmp_path / ".save_manifest.json"))
+    files = []
+    for name in ("a.csv", "b.csv"):
+        path = tmp_path / name
+        path.write_text("old")
+        (tmp_path / f"{name}.tmp").write_text("new")
+        transaction.add(f"{path}.tmp", str(path))
+        files.append(str(path))
+    return files, transaction
+
+def test_partial_save_is_completed_on_recovery(tmp_path, monkeypatch):
+    files, transaction = _write_temp_files(tmp_path)
+    replace_file = storage.replace_file
+    renamed = []
+    def crash_after_first_rename(temp_file, inventory_file):
+        if renamed:
+            raise OSError("crashed")
+        replace_file(temp_file, inventory_file)
+        renamed.append(inventory_file)
+    monkeypatch.setattr(storage, "replace_file", crash_after_first_rename)
+    with pytest.raises(OSError):
+        transaction.commit()
+    transaction.abort()
+    monkeypatch.setattr(storage, "replace_file", replace_file)
+    assert [open(path).read() for path in files] == ["new", "old"]
+
+    assert SaveTransaction.recover(str(tmp_path / ".save_manifest.json")) == files[1:]
+    assert [open(path).read() for path in files] == ["new", "new"]
+    assert not os.path.exists(tmp_path / ".save_manifest.json")
+
+def test_save_without_manifest_is_discarded(tmp_path, monkeypatch):
+    files, transaction = _write_temp_files(tmp_path)
+    # A crash before the manifest is written leaves every old file in place
+    monkeypatch.setattr(storage.json, "dump", lambda *args: (_ for _ in ()).throw(OSError("crashed")))
+    with pytest.raises(OSError):
+        transaction.commit()
+    transaction.abort()
+    os.remove(tmp_path / ".save_manifest.json")
+    assert SaveTransaction.recover(str(tmp_path / ".save_manifest.json")) == []
+    assert [open(path).read() for path in files] == ["old", "old"]
+    assert not any(os.path.exists(f"{path}.tmp") for path in files)